@@ -31,6 +31,8 @@ from django.utils.crypto import get_random_string
 from django.utils.encoding import force_str
 from django.utils.translation import gettext_lazy as _
 
+from asgiref.sync import sync_to_async
+
 from allauth import app_settings as allauth_app_settings
 from allauth.account import app_settings, signals
 from allauth.core import context
@@ -44,6 +46,13 @@ from allauth.core.internal.httpkit import (
 from allauth.utils import generate_unique_username, import_attribute
 
 
+try:
+    from django.contrib.auth import aauthenticate
+except ImportError:
+    # Django < 5.0
+    aauthenticate = sync_to_async(authenticate)
+
+
 class DefaultAccountAdapter(BaseAdapter):
     """The adapter class allows you to override various functionality of the
     ``allauth.account`` app.  To do so, point ``settings.ACCOUNT_ADAPTER`` to
@@ -167,28 +176,23 @@ class DefaultAccountAdapter(BaseAdapter):
         Renders an email to `email`.  `template_prefix` identifies the
         email that is to be sent, e.g. "account/email/email_confirmation"
         """
+        from allauth.account.internal import mailkit
+
+        templates = mailkit.get_templates(template_prefix)
         to = [email] if isinstance(email, str) else email
-        subject = render_to_string("{0}_subject.txt".format(template_prefix), context)
+        subject = templates.subject.render(context)
         # remove superfluous line breaks
         subject = " ".join(subject.splitlines()).strip()
         subject = self.format_email_subject(subject)
 
         from_email = self.get_from_email()
 
-        bodies = {}
+        request = globals()["context"].request
+        bodies = {
+            ext: template.render(context, request).strip()
+            for ext, template in templates.bodies.items()
+        }
         html_ext = app_settings.TEMPLATE_EXTENSION
-        for ext in [html_ext, "txt"]:
-            try:
-                template_name = "{0}_message.{1}".format(template_prefix, ext)
-                bodies[ext] = render_to_string(
-                    template_name,
-                    context,
-                    globals()["context"].request,
-                ).strip()
-            except TemplateDoesNotExist:
-                if ext == "txt" and not bodies:
-                    # We need at least one body
-                    raise
         if "txt" in bodies:
             msg = EmailMultiAlternatives(
                 subject, bodies["txt"], from_email, to, headers=headers
@@ -203,6 +207,8 @@ class DefaultAccountAdapter(BaseAdapter):
         return msg
 
     def send_mail(self, template_prefix: str, email: str, context: dict) -> None:
+        from allauth.account.internal import mailkit
+
         request = globals()["context"].request
         ctx = {
             "request": request,
@@ -211,7 +217,21 @@ class DefaultAccountAdapter(BaseAdapter):
         }
         ctx.update(context)
         msg = self.render_mail(template_prefix, email, ctx)
-        msg.send()
+        mailkit.deliver(msg)
+
+    def send_mails(
+        self, template_prefix: str, messages: typing.List[typing.Tuple[str, dict]]
+    ) -> None:
+        """
+        Sends the same email (``template_prefix``) to multiple recipients, given
+        as ``(email, context)`` tuples. The templates are loaded once, and the
+        emails are delivered together.
+        """
+        from allauth.account.internal import mailkit
+
+        with mailkit.batched_delivery():
+            for email, ctx in messages:
+                self.send_mail(template_prefix, email, ctx)
 
     def get_signup_redirect_url(self, request):
         """
@@ -688,7 +708,7 @@ class DefaultAccountAdapter(BaseAdapter):
         # on itself (e.g. sending of email etc.).
         ratelimit.clear(
             request,
-            config=app_settings.RATE_LIMITS,
+            config=ratelimit.get_config(),
             action="login_failed",
             key=cache_key,
         )
@@ -702,7 +722,7 @@ class DefaultAccountAdapter(BaseAdapter):
         cache_key = self._get_login_attempts_cache_key(request, **credentials)
         self._login_failed_rl_usage = ratelimit.consume(
             request,
-            config=app_settings.RATE_LIMITS,
+            config=ratelimit.get_config(),
             action="login_failed",
             key=cache_key,
         )
@@ -718,6 +738,10 @@ class DefaultAccountAdapter(BaseAdapter):
         user = authenticate(request, **credentials)
         alt_user = AuthenticationBackend.unstash_authenticated_user()
         user = user or alt_user
+        self._post_authenticate(request, user, **credentials)
+        return user
+
+    def _post_authenticate(self, request, user, **credentials) -> None:
         if user:
             # On a succesful login, we cannot just wipe the login failed rate
             # limit. That consists of 2 parts, a per IP limit, and, a per
@@ -727,8 +751,30 @@ class DefaultAccountAdapter(BaseAdapter):
             self._rollback_login_failed_rl_usage()
         else:
             self.authentication_failed(request, **credentials)
+
+    async def aauthenticate(self, request, **credentials):
+        """
+        The async counterpart of ``authenticate()``. Password hashing happens
+        off the event loop, by the allauth authentication backend.
+        """
+        await sync_to_async(self.pre_authenticate)(request, **credentials)
+        user = await self._aauthenticate(request, **credentials)
+        await sync_to_async(self._post_authenticate)(request, user, **credentials)
         return user
 
+    async def _aauthenticate(self, request, **credentials):
+        """
+        Runs the authentication backends only, leaving ``pre_authenticate()``
+        and ``_post_authenticate()`` up to the caller, so that these can be
+        combined with other synchronous work.
+        """
+        from allauth.account.auth_backends import AuthenticationBackend
+
+        AuthenticationBackend.unstash_authenticated_user()
+        user = await aauthenticate(request, **credentials)
+        alt_user = AuthenticationBackend.unstash_authenticated_user()
+        return user or alt_user
+
     def authentication_failed(self, request, **credentials):
         pass
 
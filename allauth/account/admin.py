@@ -3,7 +3,7 @@ from django.utils.translation import gettext_lazy as _
 
 from . import app_settings
 from .adapter import get_adapter
-from .models import EmailAddress, EmailConfirmation
+from .models import EmailAddress, EmailConfirmation, OutboxEmail
 
 
 class EmailAddressAdmin(admin.ModelAdmin):
@@ -29,6 +29,32 @@ class EmailConfirmationAdmin(admin.ModelAdmin):
     raw_id_fields = ("email_address",)
 
 
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "subject", "created", "attempts", "last_error")
+    list_filter = ("attempts",)
+    # The message itself is not exposed, as it contains credentials (e.g.
+    # password reset links) that would allow for taking over accounts.
+    fields = ("recipients", "subject", "created", "attempts", "last_error")
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def recipients(self, obj):
+        return str(obj)
+
+    recipients.short_description = _("recipients")  # type: ignore[attr-defined]
+
+    def subject(self, obj):
+        return obj.message.get("subject", "")
+
+    subject.short_description = _("subject")  # type: ignore[attr-defined]
+
+
 if not app_settings.EMAIL_CONFIRMATION_HMAC:
     admin.site.register(EmailConfirmation, EmailConfirmationAdmin)
 admin.site.register(EmailAddress, EmailAddressAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -310,6 +310,26 @@ class AppSettings:
         """
         return self._setting("EMAIL_SUBJECT_PREFIX", None)
 
+    @property
+    def EMAIL_DELIVERY_BACKEND(self):
+        from allauth.utils import import_attribute
+
+        path = self._setting(
+            "EMAIL_DELIVERY_BACKEND", "allauth.account.mail.SyncEmailDeliveryBackend"
+        )
+        cls = import_attribute(path)
+        return cls()
+
+    @property
+    def EMAIL_DELIVERY_MAX_WORKERS(self) -> int:
+        return self._setting("EMAIL_DELIVERY_MAX_WORKERS", 2)
+
+    @property
+    def PASSWORD_HASHING_MAX_WORKERS(self) -> int:
+        import os
+
+        return self._setting("PASSWORD_HASHING_MAX_WORKERS", os.cpu_count() or 1)
+
     @property
     def SIGNUP_FORM_CLASS(self):
         """
@@ -390,6 +410,10 @@ class AppSettings:
     def ADAPTER(self):
         return self._setting("ADAPTER", "allauth.account.adapter.DefaultAccountAdapter")
 
+    @property
+    def ASYNC_VIEWS(self) -> bool:
+        return self._setting("ASYNC_VIEWS", False)
+
     @property
     def CONFIRM_EMAIL_ON_GET(self):
         return self._setting("CONFIRM_EMAIL_ON_GET", False)
@@ -1,16 +1,21 @@
-from threading import local
+from contextvars import ContextVar
+from typing import Iterator
 
-from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 
+from asgiref.sync import sync_to_async
+
 from allauth.account.adapter import get_adapter
 from allauth.account.app_settings import LoginMethod
+from allauth.account.internal import passwordkit
 
 from . import app_settings
 from .utils import filter_users_by_email, filter_users_by_username
 
 
-_stash = local()
+# Context local, so that concurrent (async) logins do not see each other's
+# stashed user.
+_stash: ContextVar = ContextVar("allauth_stashed_user", default=None)
 
 
 class AuthenticationBackend(ModelBackend):
@@ -18,14 +23,42 @@ class AuthenticationBackend(ModelBackend):
         password = credentials.get("password")
         if not password:
             return None
-        self._did_check_password = False
-        user = self._authenticate(request, **credentials)
-        if not self._did_check_password:
+        did_check_password = False
+        for user in self._iter_users(**credentials):
+            did_check_password = True
+            if self._check_password(user, password):
+                return user
+        if not did_check_password:
             self._mitigate_timing_attack(password)
-        return user
+        return None
 
-    def _authenticate(self, request, **credentials):
+    async def aauthenticate(self, request, **credentials):
+        """
+        The async counterpart of ``authenticate()``, verifying the password
+        off the event loop, see ``ACCOUNT_PASSWORD_HASHING_MAX_WORKERS``.
+        """
         password = credentials.get("password")
+        if not password:
+            return None
+        # Users are looked up one by one, as needed, just like the sync path.
+        users = self._iter_users(**credentials)
+        next_user = sync_to_async(lambda: next(users, None))
+        did_check_password = False
+        while (user := await next_user()) is not None:
+            did_check_password = True
+            if await passwordkit.acheck_password(user, password):
+                if self.user_can_authenticate(user):
+                    return user
+                self._stash_user(user)
+        if not did_check_password:
+            await passwordkit.amitigate_timing_attack(password)
+        return None
+
+    def _iter_users(self, **credentials) -> Iterator:
+        """
+        Yields the users to check the password of, in order, looking them up
+        only when needed.
+        """
         username = credentials.get("username")
         if username:
             if LoginMethod.EMAIL in app_settings.LOGIN_METHODS:
@@ -34,63 +67,47 @@ class AuthenticationBackend(ModelBackend):
                 # when using django-tastypie basic authentication, the login is
                 # always passed as `username`.  So let's play nice with other apps
                 # and use username as fallback.
-                user = self._authenticate_by_email(username, password)
-                if user:
-                    return user
-            user = self._authenticate_by_username(username, password)
+                yield from self._get_users_by_email(username)
+            user = self._get_user_by_username(username)
             if user:
-                return user
+                yield user
 
         email = credentials.get("email")
         if email:
-            user = self._authenticate_by_email(email, password)
-            if user:
-                return user
+            yield from self._get_users_by_email(email)
 
         phone = credentials.get("phone")
         if phone:
-            user = self._authenticate_by_phone(phone, password)
+            user = self._get_user_by_phone(phone)
             if user:
-                return user
-        return None
+                yield user
 
-    def _authenticate_by_phone(self, phone: str, password: str):
+    def _get_user_by_phone(self, phone: str):
         if not phone or LoginMethod.PHONE not in app_settings.LOGIN_METHODS:
             return None
         adapter = get_adapter()
-        user = adapter.get_user_by_phone(phone)
-        return self._check_password(user, password)
+        return adapter.get_user_by_phone(phone)
 
-    def _authenticate_by_username(self, username: str, password: str):
+    def _get_user_by_username(self, username: str):
         if (
             (LoginMethod.USERNAME not in app_settings.LOGIN_METHODS)
             or (not app_settings.USER_MODEL_USERNAME_FIELD)
             or not username
         ):
             return None
-        user = filter_users_by_username(username).first()
-        return self._check_password(user, password)
-
-    def _authenticate_by_email(
-        self,
-        email: str,
-        password: str,
-    ):
+        return filter_users_by_username(username).first()
+
+    def _get_users_by_email(self, email: str):
         if not email or LoginMethod.EMAIL not in app_settings.LOGIN_METHODS:
-            return None
-        users = filter_users_by_email(email, prefer_verified=True)
-        for user in users:
-            if self._check_password(user, password):
-                return user
-        return None
+            return []
+        return filter_users_by_email(email, prefer_verified=True)
 
     def _mitigate_timing_attack(self, password):
-        get_user_model()().set_password(password)
+        passwordkit.mitigate_timing_attack(password)
 
     def _check_password(self, user, password):
         if not user:
             return None
-        self._did_check_password = True
         ok = user.check_password(password)
         if ok:
             ok = self.user_can_authenticate(user)
@@ -121,9 +138,8 @@ class AuthenticationBackend(ModelBackend):
         we can then unstash this user and proceed pointing the user to the
         account inactive page.
         """
-        global _stash  # noqa: F824
-        ret = getattr(_stash, "user", None)
-        _stash.user = user
+        ret = _stash.get()
+        _stash.set(user)
         return ret
 
     @classmethod
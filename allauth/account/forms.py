@@ -14,6 +14,8 @@ from django.urls import NoReverseMatch, reverse
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext, gettext_lazy as _, pgettext
 
+from asgiref.sync import sync_to_async
+
 from allauth.account.app_settings import LoginMethod
 from allauth.account.fields import EmailField, PasswordField, SetPasswordField
 from allauth.account.internal import flows
@@ -71,6 +73,8 @@ class LoginForm(forms.Form):
     remember = forms.BooleanField(label=_("Remember Me"), required=False)
 
     user = None
+    _defer_authentication = False
+    _deferred_credentials = None
 
     def __init__(self, *args, **kwargs):
         self.request = kwargs.pop("request", None)
@@ -184,6 +188,10 @@ class LoginForm(forms.Form):
             return
         credentials = self.user_credentials()
         if "password" in credentials:
+            if self._defer_authentication:
+                # See `_begin_async_validation()`.
+                self._deferred_credentials = credentials
+                return self.cleaned_data
             return self._clean_with_password(credentials)
         return self._clean_without_password(
             credentials.get("email"), credentials.get("phone")
@@ -212,9 +220,56 @@ class LoginForm(forms.Form):
                 self.user = form._user  # type: ignore
         return self.cleaned_data
 
+    async def ais_valid(self) -> bool:
+        """
+        The async counterpart of ``is_valid()``, authenticating by means of
+        ``DefaultAccountAdapter.aauthenticate()`` so that the password is
+        verified off the event loop.
+        """
+        credentials = await sync_to_async(self._begin_async_validation)()
+        if not credentials:
+            return self.is_bound and not self.errors
+        user = await get_adapter(self.request)._aauthenticate(
+            self.request, **credentials
+        )
+        return await sync_to_async(self._end_async_validation)(user, credentials)
+
+    def _begin_async_validation(self) -> Optional[dict]:
+        """
+        Validates the form, up until verifying the password. Returns the
+        credentials that are still to be authenticated, if any.
+        """
+        self._defer_authentication = True
+        try:
+            is_valid = self.is_valid()
+        finally:
+            self._defer_authentication = False
+        credentials = self._deferred_credentials
+        self._deferred_credentials = None
+        if not is_valid or not credentials:
+            return None
+        try:
+            get_adapter(self.request).pre_authenticate(self.request, **credentials)
+        except forms.ValidationError as e:
+            self.add_error(None, e)
+            return None
+        return credentials
+
+    def _end_async_validation(self, user, credentials: dict) -> bool:
+        get_adapter(self.request)._post_authenticate(self.request, user, **credentials)
+        try:
+            self._clean_authenticated_user(user, credentials)
+        except forms.ValidationError as e:
+            self.add_error(None, e)
+        return self.is_bound and not self.errors
+
     def _clean_with_password(self, credentials: dict):
         adapter = get_adapter(self.request)
         user = adapter.authenticate(self.request, **credentials)
+        return self._clean_authenticated_user(user, credentials)
+
+    def _clean_authenticated_user(self, user, credentials: dict):
+        adapter = get_adapter(self.request)
         if user:
             login = Login(user=user, email=credentials.get("email"))
             if flows.login.is_login_rate_limited(context.request, login):
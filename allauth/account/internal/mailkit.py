@@ -0,0 +1,324 @@
+"""
+Rendering and delivery of the emails sent by the account adapter. The
+delivery strategy is pluggable, see ``ACCOUNT_EMAIL_DELIVERY_BACKEND``.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.core.mail import (
+    EmailMessage,
+    EmailMultiAlternatives,
+    get_connection,
+)
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.autoreload import file_changed
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MailTemplates:
+    subject: Any
+    # The message templates that exist, by extension ("txt" and/or the
+    # ``ACCOUNT_TEMPLATE_EXTENSION``).
+    bodies: Dict[str, Any]
+
+
+_templates: Dict[Tuple[str, str], MailTemplates] = {}
+
+
+def get_templates(template_prefix: str) -> MailTemplates:
+    """
+    Returns the (compiled) templates of the given email, recording which of
+    the message variants exist, so that subsequent emails do not need to look
+    them up again.
+    """
+    from allauth.account import app_settings
+
+    html_ext = app_settings.TEMPLATE_EXTENSION
+    key = (template_prefix, html_ext)
+    templates = _templates.get(key)
+    if templates is None:
+        subject = get_template("{0}_subject.txt".format(template_prefix))
+        bodies = {}
+        for ext in [html_ext, "txt"]:
+            try:
+                template_name = "{0}_message.{1}".format(template_prefix, ext)
+                bodies[ext] = get_template(template_name)
+            except TemplateDoesNotExist:
+                if ext == "txt" and not bodies:
+                    # We need at least one body
+                    raise
+        templates = _templates[key] = MailTemplates(subject=subject, bodies=bodies)
+    return templates
+
+
+@receiver(setting_changed)
+@receiver(file_changed)
+def _clear_templates(**kwargs) -> None:
+    _templates.clear()
+
+
+class BaseEmailDeliveryBackend:
+    def deliver(self, msg: EmailMessage) -> None:
+        raise NotImplementedError
+
+    def deliver_many(self, msgs: List[EmailMessage]) -> None:
+        for msg in msgs:
+            self.deliver(msg)
+
+
+class SyncEmailDeliveryBackend(BaseEmailDeliveryBackend):
+    """
+    Sends the email right away, as part of the request.
+    """
+
+    def deliver(self, msg: EmailMessage) -> None:
+        msg.send()
+
+    def deliver_many(self, msgs: List[EmailMessage]) -> None:
+        get_connection().send_messages(msgs)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    from allauth.account import app_settings
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app_settings.EMAIL_DELIVERY_MAX_WORKERS,
+                thread_name_prefix="allauth-mail",
+            )
+        return _executor
+
+
+def shutdown(wait: bool = True) -> None:
+    """
+    Stops the threads of the ``ThreadedEmailDeliveryBackend``, waiting for the
+    queued emails to be sent.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _send(msgs: List[EmailMessage]) -> None:
+    try:
+        get_connection().send_messages(msgs)
+    except Exception:
+        logger.exception("Error sending email to %s", [msg.to for msg in msgs])
+
+
+class ThreadedEmailDeliveryBackend(BaseEmailDeliveryBackend):
+    """
+    Hands the email over to a pool of threads, once the current transaction
+    is committed. Emails that are still queued are lost in case the process
+    is killed.
+    """
+
+    def deliver(self, msg: EmailMessage) -> None:
+        self.deliver_many([msg])
+
+    def deliver_many(self, msgs: List[EmailMessage]) -> None:
+        transaction.on_commit(lambda: _get_executor().submit(_send, msgs))
+
+
+def serialize_message(msg: EmailMessage) -> dict:
+    return {
+        "subject": msg.subject,
+        "body": msg.body,
+        "from_email": msg.from_email,
+        "to": msg.to,
+        "cc": msg.cc,
+        "bcc": msg.bcc,
+        "reply_to": msg.reply_to,
+        "headers": msg.extra_headers,
+        "alternatives": [
+            [content, mimetype]
+            for content, mimetype in getattr(msg, "alternatives", [])
+        ],
+        "content_subtype": msg.content_subtype,
+    }
+
+
+def deserialize_message(data: dict) -> EmailMessage:
+    msg = EmailMultiAlternatives(
+        subject=data["subject"],
+        body=data["body"],
+        from_email=data["from_email"],
+        to=data["to"],
+        cc=data["cc"],
+        bcc=data["bcc"],
+        reply_to=data["reply_to"],
+        headers=data["headers"],
+    )
+    for content, mimetype in data["alternatives"]:
+        msg.attach_alternative(content, mimetype)
+    msg.content_subtype = data["content_subtype"]
+    return msg
+
+
+class OutboxEmailDeliveryBackend(BaseEmailDeliveryBackend):
+    """
+    Stores the email in the outbox, as part of the current transaction. The
+    outbox is processed by the ``account_sendmail`` management command.
+    """
+
+    def deliver(self, msg: EmailMessage) -> None:
+        self.deliver_many([msg])
+
+    def deliver_many(self, msgs: List[EmailMessage]) -> None:
+        from allauth.account.models import OutboxEmail
+
+        emails = []
+        for msg in msgs:
+            if msg.attachments:
+                # Not serializable, and not something allauth itself sends.
+                msg.send()
+            else:
+                emails.append(OutboxEmail(message=serialize_message(msg)))
+        OutboxEmail.objects.bulk_create(emails)
+
+
+_batch_var: ContextVar[Optional[List[EmailMessage]]] = ContextVar(
+    "allauth_mail_batch", default=None
+)
+
+
+@contextmanager
+def batched_delivery() -> Iterator[None]:
+    """
+    Collects the emails delivered within the block, handing them over to the
+    backend at once (e.g. over one mail server connection) when the block
+    completes.
+    """
+    if _batch_var.get() is not None:
+        yield
+        return
+    msgs: List[EmailMessage] = []
+    token = _batch_var.set(msgs)
+    try:
+        yield
+    finally:
+        _batch_var.reset(token)
+    if msgs:
+        from allauth.account import app_settings
+
+        app_settings.EMAIL_DELIVERY_BACKEND.deliver_many(msgs)
+
+
+def deliver(msg: EmailMessage) -> None:
+    from allauth.account import app_settings
+
+    batch = _batch_var.get()
+    if batch is not None:
+        batch.append(msg)
+    else:
+        app_settings.EMAIL_DELIVERY_BACKEND.deliver(msg)
+
+
+@dataclass
+class OutboxResult:
+    sent: int = 0
+    failed: int = 0
+    # Emails given up on, after failing ``max_attempts`` times.
+    dropped: int = 0
+
+
+def send_outbox(*, batch_size: int = 100, max_attempts: int = 5) -> OutboxResult:
+    """
+    Sends the emails in the outbox, in batches, reusing one mail server
+    connection per batch. Emails that could not be sent are retried on a
+    subsequent run, until ``max_attempts`` is reached, after which they are
+    dropped: they contain live credentials (e.g. password reset links) that
+    should not be retained. Concurrent workers skip each other's batches where
+    the database supports it.
+    """
+    from allauth.account.models import OutboxEmail
+
+    result = OutboxResult()
+    result.dropped = _drop(OutboxEmail.objects.filter(attempts__gte=max_attempts))
+    qs = OutboxEmail.objects.filter(attempts__lt=max_attempts).order_by("pk")
+    if connection.features.has_select_for_update_skip_locked:
+        qs = qs.select_for_update(skip_locked=True)
+    last_pk = None
+    while True:
+        with transaction.atomic():
+            page = qs if last_pk is None else qs.filter(pk__gt=last_pk)
+            emails = list(page[:batch_size])
+            if not emails:
+                return result
+            last_pk = emails[-1].pk
+            sent, failed = _send_batch(emails)
+            exhausted = [email for email in failed if email.attempts >= max_attempts]
+            failed = [email for email in failed if email.attempts < max_attempts]
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in sent]).delete()
+            OutboxEmail.objects.bulk_update(failed, ["attempts", "last_error"])
+            dropped = _drop(
+                OutboxEmail.objects.filter(pk__in=[email.pk for email in exhausted])
+            )
+        result.sent += len(sent)
+        result.failed += len(failed)
+        result.dropped += dropped
+
+
+def _drop(qs) -> int:
+    dropped = 0
+    for email in qs:
+        logger.error(
+            "Giving up on outbox email %s to %s after %s attempts: %s",
+            email.pk,
+            email,
+            email.attempts,
+            email.last_error,
+        )
+        dropped += 1
+    if dropped:
+        qs.delete()
+    return dropped
+
+
+def _send_batch(emails: List) -> Tuple[List, List]:
+    sent: List = []
+    failed: List = []
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as e:
+        logger.exception("Error connecting to the mail server")
+        for email in emails:
+            email.attempts += 1
+            email.last_error = str(e)
+        return sent, emails
+    try:
+        for email in emails:
+            try:
+                mail_connection.send_messages([deserialize_message(email.message)])
+            except Exception as e:
+                logger.warning("Error sending outbox email %s: %s", email.pk, e)
+                email.attempts += 1
+                email.last_error = str(e)
+                failed.append(email)
+            else:
+                sent.append(email)
+    finally:
+        mail_connection.close()
+    return sent, failed
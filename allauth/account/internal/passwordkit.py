@@ -0,0 +1,86 @@
+"""
+Password verification, off the event loop when authenticating asynchronously.
+Password hashers are deliberately slow, so hashing runs on a bounded pool of
+threads (see ``ACCOUNT_PASSWORD_HASHING_MAX_WORKERS``), limiting the number of
+concurrent hashes to what the CPUs can handle.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+from django.utils.crypto import get_random_string
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    from allauth.account import app_settings
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app_settings.PASSWORD_HASHING_MAX_WORKERS,
+                thread_name_prefix="allauth-hash",
+            )
+        return _executor
+
+
+@functools.lru_cache(maxsize=None)
+def get_dummy_hash() -> str:
+    """
+    A hash of a random password, using the preferred hasher, to verify
+    against when there is no user to check the password of.
+    """
+    return make_password(get_random_string(32))
+
+
+@receiver(setting_changed)
+def _clear_dummy_hash(setting, **kwargs) -> None:
+    if setting == "PASSWORD_HASHERS":
+        get_dummy_hash.cache_clear()
+
+
+def mitigate_timing_attack(password: str) -> None:
+    """
+    Takes as long as verifying the password of an existing user, so that
+    the response time does not tell whether or not the user exists.
+    """
+    check_password(password, get_dummy_hash())
+
+
+async def amitigate_timing_attack(password: str) -> None:
+    await _run(mitigate_timing_attack, password)
+
+
+async def acheck_password(user, password: str) -> bool:
+    """
+    The async counterpart of ``user.check_password()``, run on the hashing
+    pool. Custom user models overriding ``check_password()`` are respected,
+    as is the upgrading of the stored hash in case the hasher changed.
+    """
+    return await _run(_check_password, user, password)
+
+
+def _check_password(user, password: str) -> bool:
+    try:
+        return user.check_password(password)
+    finally:
+        # Upgrading the hash saves the user. Do not leave database connections
+        # lingering in the pool threads.
+        connections.close_all()
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_executor(), func, *args
+    )
@@ -0,0 +1,6 @@
+from allauth.account.internal.mailkit import (  # noqa
+    BaseEmailDeliveryBackend,
+    OutboxEmailDeliveryBackend,
+    SyncEmailDeliveryBackend,
+    ThreadedEmailDeliveryBackend,
+)
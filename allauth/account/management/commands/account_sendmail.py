@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from allauth.account.internal import mailkit
+
+
+class Command(BaseCommand):
+    help = "Sends the emails queued in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="The number of emails sent over one mail server connection.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Drop emails that failed to send this many times.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep running, polling the outbox every this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = mailkit.send_outbox(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            if (
+                result.sent
+                or result.failed
+                or result.dropped
+                or not options["interval"]
+            ):
+                self.stdout.write(
+                    f"Sent: {result.sent}, failed: {result.failed}, "
+                    f"dropped: {result.dropped}"
+                )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -26,6 +26,7 @@ def AccountMiddleware(get_response):
                 response = await get_response(request)
                 if _should_redirect_accounts(request, response):
                     response = await _aredirect_accounts(request)
+                _process_response(request, response)
                 return response
 
     else:
@@ -36,6 +37,7 @@ def AccountMiddleware(get_response):
                 response = get_response(request)
                 if _should_redirect_accounts(request, response):
                     response = _redirect_accounts(request)
+                _process_response(request, response)
                 return response
 
     def process_exception(request, exception):
@@ -52,6 +54,14 @@ def AccountMiddleware(get_response):
     return middleware
 
 
+def _process_response(request, response) -> None:
+    if getattr(request.allauth, "states_browser_id", None) is not None:
+        # Social login state is stored in the cache, bound to the browser.
+        from allauth.socialaccount.internal import statekit
+
+        statekit.process_response(request, response)
+
+
 def _should_redirect_accounts(request, response) -> bool:
     """
     URLs should be hackable. Yet, assuming allauth is included like this...
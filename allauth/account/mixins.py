@@ -41,6 +41,12 @@ class RedirectAuthenticatedUserMixin:
     @method_decorator(login_not_required)
     @method_decorator(never_cache)
     def dispatch(self, request, *args, **kwargs):
+        response = self._redirect_authenticated_user(request)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return response
+
+    def _redirect_authenticated_user(self, request):
         if app_settings.AUTHENTICATED_LOGIN_REDIRECTS:
             if request.user.is_authenticated:
                 redirect_to = self.get_authenticated_redirect_url()
@@ -50,8 +56,7 @@ class RedirectAuthenticatedUserMixin:
                 stage = get_pending_stage(request)
                 if stage and stage.is_resumable(request):
                     return redirect_to_pending_stage(request, stage)
-        response = super().dispatch(request, *args, **kwargs)
-        return response
+        return None
 
     def get_authenticated_redirect_url(self):
         redirect_field_name = self.redirect_field_name
@@ -78,7 +83,10 @@ class AjaxCapableProcessFormViewMixin:
     def post(self, request, *args, **kwargs):
         form_class = self.get_form_class()
         form = self.get_form(form_class)
-        if form.is_valid():
+        return self._respond_to_form(form, form.is_valid())
+
+    def _respond_to_form(self, form, is_valid: bool):
+        if is_valid:
             response = self.form_valid(form)
         else:
             response = self.form_invalid(form)
@@ -222,6 +222,25 @@ class EmailConfirmationHMAC(EmailConfirmationMixin):
         return False
 
 
+class OutboxEmail(models.Model):
+    """
+    An email that is queued for delivery by the ``account_sendmail`` management
+    command, see ``ACCOUNT_EMAIL_DELIVERY_BACKEND``.
+    """
+
+    created = models.DateTimeField(verbose_name=_("created"), default=timezone.now)
+    message = models.JSONField(verbose_name=_("message"))
+    attempts = models.PositiveSmallIntegerField(verbose_name=_("attempts"), default=0)
+    last_error = models.TextField(verbose_name=_("last error"), blank=True)
+
+    class Meta:
+        verbose_name = _("outbox email")
+        verbose_name_plural = _("outbox emails")
+
+    def __str__(self):
+        return ", ".join(self.message.get("to", []))
+
+
 class Login:
     """
     Represents a user that is in the process of logging in.
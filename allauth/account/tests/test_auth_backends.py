@@ -1,12 +1,14 @@
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 
 import pytest
+from asgiref.sync import sync_to_async
 
 from allauth.account import app_settings
+from allauth.account.adapter import get_adapter
 from allauth.account.auth_backends import AuthenticationBackend
 
 
@@ -88,9 +90,11 @@ class AuthenticationBackendTests(TestCase):
 )
 def test_account_enumeration_timing_attack(user, db, rf, settings, login_methods):
     settings.ACCOUNT_LOGIN_METHODS = login_methods
-    with patch("django.contrib.auth.models.User.set_password") as set_password_mock:
+    with patch(
+        "allauth.account.internal.passwordkit.check_password"
+    ) as check_password_mock:
         with patch(
-            "django.contrib.auth.models.User.check_password", new=set_password_mock
+            "django.contrib.auth.models.User.check_password", new=check_password_mock
         ):
             backend = AuthenticationBackend()
             backend.authenticate(
@@ -99,12 +103,73 @@ def test_account_enumeration_timing_attack(user, db, rf, settings, login_methods
                 username="not-known",
                 password="secret",
             )
-            set_password_mock.assert_called_once()
-            set_password_mock.reset_mock()
+            check_password_mock.assert_called_once()
+            check_password_mock.reset_mock()
             backend.authenticate(rf.get("/"), username=user.username, password="secret")
-            set_password_mock.assert_called_once()
-            set_password_mock.reset_mock()
+            check_password_mock.assert_called_once()
+            check_password_mock.reset_mock()
             backend.authenticate(
                 rf.get("/"), email=user.email, username="not-known", password="secret"
             )
-            set_password_mock.assert_called_once()
+            check_password_mock.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_aauthenticate(user, user_password, settings):
+    settings.ACCOUNT_LOGIN_METHODS = {app_settings.LoginMethod.EMAIL}
+    backend = AuthenticationBackend()
+    assert await backend.aauthenticate(None, email=user.email, password="wrong") is None
+    authed_user = await backend.aauthenticate(
+        None, email=user.email, password=user_password
+    )
+    assert authed_user.pk == user.pk
+    with patch(
+        "allauth.account.internal.passwordkit.check_password"
+    ) as check_password_mock:
+        await backend.aauthenticate(None, email="not@known.org", password="secret")
+    check_password_mock.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_adapter_aauthenticate_inactive(user, user_password, settings):
+    settings.ACCOUNT_LOGIN_METHODS = {app_settings.LoginMethod.EMAIL}
+    user.is_active = False
+    await sync_to_async(user.save)()
+    request = RequestFactory().post("/")
+    authed_user = await get_adapter().aauthenticate(
+        request, email=user.email, password=user_password
+    )
+    assert authed_user.pk == user.pk
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_aauthenticate_custom_check_password(user, settings):
+    settings.ACCOUNT_LOGIN_METHODS = {app_settings.LoginMethod.EMAIL}
+    with patch.object(
+        type(user), "check_password", autospec=True, return_value=True
+    ) as check_password_mock:
+        authed_user = await AuthenticationBackend().aauthenticate(
+            None, email=user.email, password="verified-elsewhere"
+        )
+    assert authed_user.pk == user.pk
+    assert check_password_mock.call_args.args[1] == "verified-elsewhere"
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_aauthenticate_looks_up_lazily(user, user_password, settings):
+    settings.ACCOUNT_LOGIN_METHODS = {
+        app_settings.LoginMethod.EMAIL,
+        app_settings.LoginMethod.USERNAME,
+    }
+    with patch.object(
+        AuthenticationBackend, "_get_user_by_username"
+    ) as get_user_by_username:
+        authed_user = await AuthenticationBackend().aauthenticate(
+            None, username=user.email, password=user_password
+        )
+    assert authed_user.pk == user.pk
+    get_user_by_username.assert_not_called()
@@ -6,8 +6,12 @@ from django.contrib.auth import get_user_model
 from django.core import mail
 from django.test import TestCase
 from django.test.utils import override_settings
-from django.urls import NoReverseMatch, reverse
+from django.urls import NoReverseMatch, resolve, reverse
 
+from asgiref.sync import (
+    iscoroutinefunction,
+    sync_to_async as orig_sync_to_async,
+)
 from pytest_django.asserts import assertTemplateUsed
 
 from allauth.account import app_settings
@@ -346,3 +350,52 @@ def test_login_page(client, db):
     resp = client.get(reverse("account_login"))
     assert resp.status_code == 200
     assertTemplateUsed(resp, "account/login.html")
+
+
+def test_async_login(client, settings, settings_impacting_urls, user, user_password):
+    settings.ACCOUNT_LOGIN_METHODS = {app_settings.LoginMethod.USERNAME}
+    with settings_impacting_urls(ACCOUNT_ASYNC_VIEWS=True):
+        login_url = reverse("account_login")
+        assert iscoroutinefunction(resolve(login_url).func)
+        resp = client.get(login_url)
+        assert resp.status_code == 200
+        assert "no-cache" in resp["Cache-Control"]
+        resp = client.post(login_url, {"login": user.username, "password": "wrong"})
+        assert resp.status_code == 200
+        assert resp.context["form"].non_field_errors()
+        resp = client.post(
+            login_url, {"login": user.username, "password": user_password}
+        )
+        assert resp.status_code == 302
+        assert resp["location"] == settings.LOGIN_REDIRECT_URL
+        assert client.session["_auth_user_id"] == str(user.pk)
+        # Authenticated users are redirected.
+        resp = client.get(login_url)
+        assert resp.status_code == 302
+
+
+def test_async_login_thread_hops(
+    client, settings, settings_impacting_urls, user, user_password
+):
+    settings.ACCOUNT_LOGIN_METHODS = {app_settings.LoginMethod.USERNAME}
+    hops = []
+
+    def counting(module):
+        def sync_to_async(func, *args, **kwargs):
+            hops.append((module, func.__name__))
+            return orig_sync_to_async(func, *args, **kwargs)
+
+        return patch(f"allauth.account.{module}.sync_to_async", sync_to_async)
+
+    with settings_impacting_urls(ACCOUNT_ASYNC_VIEWS=True):
+        login_url = reverse("account_login")
+        with counting("views"), counting("forms"), counting("adapter"):
+            resp = client.get(login_url)
+            assert resp.status_code == 200
+            assert hops == [("views", "_dispatch")]
+            hops.clear()
+            resp = client.post(
+                login_url, {"login": user.username, "password": user_password}
+            )
+            assert resp.status_code == 302
+    assert hops == [("views", "_begin_post"), ("views", "_end_post")]
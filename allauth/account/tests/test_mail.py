@@ -0,0 +1,175 @@
+import json
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+
+import pytest
+
+from allauth.account.adapter import get_adapter
+from allauth.account.internal import mailkit
+from allauth.account.models import OutboxEmail
+
+
+def request_password_reset(client, user):
+    resp = client.post(reverse("account_reset_password"), data={"email": user.email})
+    assert resp.status_code == 302
+
+
+def test_threaded_delivery(client, user, settings, django_capture_on_commit_callbacks):
+    settings.ACCOUNT_EMAIL_DELIVERY_BACKEND = (
+        "allauth.account.mail.ThreadedEmailDeliveryBackend"
+    )
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        request_password_reset(client, user)
+    assert len(mail.outbox) == 0
+    for callback in callbacks:
+        callback()
+    mailkit.shutdown()
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == [user.email]
+
+
+def test_outbox_delivery(client, user, settings):
+    settings.ACCOUNT_EMAIL_DELIVERY_BACKEND = (
+        "allauth.account.mail.OutboxEmailDeliveryBackend"
+    )
+    request_password_reset(client, user)
+    request_password_reset(client, user)
+    assert len(mail.outbox) == 0
+    assert OutboxEmail.objects.count() == 2
+
+    call_command("account_sendmail")
+    assert len(mail.outbox) == 2
+    assert not OutboxEmail.objects.exists()
+    msg = mail.outbox[0]
+    assert msg.to == [user.email]
+    assert "Password Reset" in msg.subject
+
+
+def test_serialize_message():
+    msg = mail.EmailMultiAlternatives(
+        "Subject", "Body", "from@example.com", ["to@example.com"], headers={"X": "1"}
+    )
+    msg.attach_alternative("<p>Body</p>", "text/html")
+    data = mailkit.serialize_message(msg)
+    restored = mailkit.deserialize_message(json.loads(json.dumps(data)))
+    assert mailkit.serialize_message(restored) == data
+    assert restored.alternatives[0].mimetype == "text/html"
+
+
+def test_outbox_retries(db, settings):
+    OutboxEmail.objects.create(
+        message=mailkit.serialize_message(
+            mail.EmailMessage("Subject", "Body", to=["john@example.com"])
+        )
+    )
+    with patch.object(
+        mail.get_connection().__class__,
+        "send_messages",
+        side_effect=OSError("Connection refused"),
+    ):
+        result = mailkit.send_outbox(max_attempts=2)
+    assert (result.sent, result.failed) == (0, 1)
+    email = OutboxEmail.objects.get()
+    assert (email.attempts, email.last_error) == (1, "Connection refused")
+
+    with patch.object(
+        mail.get_connection().__class__,
+        "send_messages",
+        side_effect=OSError("Connection refused"),
+    ):
+        result = mailkit.send_outbox(max_attempts=2)
+    # Given up on, the message contains credentials.
+    assert (result.sent, result.failed, result.dropped) == (0, 0, 1)
+    assert not OutboxEmail.objects.exists()
+    assert len(mail.outbox) == 0
+
+
+def test_outbox_retried(db):
+    OutboxEmail.objects.create(
+        message=mailkit.serialize_message(
+            mail.EmailMessage("Subject", "Body", to=["john@example.com"])
+        ),
+        attempts=1,
+    )
+    result = mailkit.send_outbox(max_attempts=2)
+    assert (result.sent, result.failed) == (1, 0)
+    assert len(mail.outbox) == 1
+
+
+def test_outbox_exhausted_dropped(db):
+    OutboxEmail.objects.create(message={}, attempts=5)
+    result = mailkit.send_outbox(max_attempts=5)
+    assert result.dropped == 1
+    assert not OutboxEmail.objects.exists()
+
+
+def test_outbox_admin_hides_message(admin_client):
+    email = OutboxEmail.objects.create(
+        message=mailkit.serialize_message(
+            mail.EmailMessage(
+                "Password Reset", "https://example.com/reset/secret/", to=["a@b.org"]
+            )
+        )
+    )
+    resp = admin_client.get(
+        reverse("admin:account_outboxemail_change", args=[email.pk])
+    )
+    assert resp.status_code == 200
+    content = resp.content.decode()
+    assert "Password Reset" in content
+    assert "reset/secret" not in content
+
+
+@pytest.mark.parametrize("batch_size", [1, 100])
+def test_outbox_batches(db, batch_size):
+    for i in range(3):
+        mailkit.OutboxEmailDeliveryBackend().deliver(
+            mail.EmailMessage("Subject", "Body", to=[f"user{i}@example.com"])
+        )
+    with patch.object(
+        mail.get_connection().__class__, "open", autospec=True
+    ) as open_connection:
+        result = mailkit.send_outbox(batch_size=batch_size)
+    assert result.sent == 3
+    assert open_connection.call_count == (3 if batch_size == 1 else 1)
+    assert [msg.to for msg in mail.outbox] == [
+        [f"user{i}@example.com"] for i in range(3)
+    ]
+
+
+def test_templates_cached(rf, settings):
+    settings.ACCOUNT_EMAIL_SUBJECT_PREFIX = ""
+    adapter = get_adapter(rf.get("/"))
+    context = {"user": None, "password_reset_url": "https://example.com/reset"}
+    with patch.object(
+        mailkit, "get_template", wraps=mailkit.get_template
+    ) as get_template:
+        adapter.render_mail(
+            "account/email/password_reset_key", "a@example.com", context
+        )
+        adapter.render_mail(
+            "account/email/password_reset_key", "b@example.com", context
+        )
+    # Subject, html (missing) and txt, looked up only once.
+    assert get_template.call_count == 3
+
+
+def test_password_reset_delivered_together(client, user_factory):
+    user_factory(email="shared@example.com", email_verified=False)
+    user_factory(email="shared@example.com", email_verified=False)
+    backend_class = mail.get_connection().__class__
+    with patch.object(
+        backend_class,
+        "send_messages",
+        autospec=True,
+        side_effect=backend_class.send_messages,
+    ) as send_messages:
+        resp = client.post(
+            reverse("account_reset_password"), data={"email": "shared@example.com"}
+        )
+    assert resp.status_code == 302
+    assert len(mail.outbox) == 2
+    assert send_messages.call_count == 1
@@ -18,6 +18,8 @@ import allauth.app_settings
 from allauth.account.adapter import get_adapter
 from allauth.account.models import EmailAddress
 from allauth.account.utils import (
+    filter_users_by_email,
+    filter_users_by_emails,
     filter_users_by_username,
     url_str_to_user_pk,
     user_pk_to_url_str,
@@ -133,3 +135,26 @@ def test_redirect_noreversematch(auth_client):
     # `NoReverseMatch`, resulting in 500s.
     resp = auth_client.post(reverse("account_logout") + "?next=badurlname")
     assert resp["location"] == "/badurlname"
+
+
+def test_filter_users_by_emails(db, user_factory, django_assert_num_queries):
+    verified = user_factory(email="verified@example.com", email_verified=True)
+    unverified = user_factory(email="unverified@example.com", email_verified=False)
+    # Some other user also claims the verified address.
+    user_factory(email="verified@example.com", email_verified=False)
+    with django_assert_num_queries(1):
+        users = filter_users_by_emails(
+            [
+                "Verified@example.com",
+                "unverified@example.com",
+                "unknown@example.com",
+            ],
+            prefer_verified=True,
+        )
+    assert users == {
+        "Verified@example.com": [verified],
+        "unverified@example.com": [unverified],
+        "unknown@example.com": [],
+    }
+    for email, email_users in users.items():
+        assert filter_users_by_email(email, prefer_verified=True) == email_users
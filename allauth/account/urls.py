@@ -7,8 +7,12 @@ from allauth.account import app_settings
 from . import views
 
 
+login_view = views.login
+if app_settings.ASYNC_VIEWS:
+    login_view = views.AsyncLoginView.as_view()
+
 urlpatterns = [
-    path("login/", views.login, name="account_login"),
+    path("login/", login_view, name="account_login"),
     path("logout/", views.logout, name="account_logout"),
     path("inactive/", views.account_inactive, name="account_inactive"),
 ]
@@ -1,11 +1,11 @@
 import logging
 import unicodedata
 from collections import OrderedDict
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from django.contrib.auth import REDIRECT_FIELD_NAME, get_user_model
 from django.db import models
-from django.db.models import Q
+from django.db.models import F, Q, Value
 from django.utils.http import base36_to_int, int_to_base36
 
 from allauth.account import app_settings
@@ -270,9 +270,9 @@ def filter_users_by_email(
 ) -> List:
     """Return list of users by email address
 
-    Typically one, at most just a few in length.  First we look through
-    EmailAddress table, than customisable User model table. Add results
-    together avoiding SQL joins and deduplicate.
+    Typically one, at most just a few in length. Both the EmailAddress table
+    and the customisable User model table are looked through, see
+    ``filter_users_by_emails()``.
 
     `prefer_verified`: When looking up users by email, there can be cases where
     users with verified email addresses are preferable above users who did not
@@ -280,35 +280,76 @@ def filter_users_by_email(
     there is a user with a verified email than that user should be returned, not
     one of the other users.
     """
-    from .models import EmailAddress
-
     logger.info("In allauth/account/utils.py - filter_users_by_email")
-
+    return filter_users_by_emails(
+        [email], is_active=is_active, prefer_verified=prefer_verified
+    )[email]
+
+
+def filter_users_by_emails(
+    emails: Iterable[str],
+    is_active: Optional[bool] = None,
+    prefer_verified: bool = False,
+) -> Dict[str, List]:
+    """Bulk variant of ``filter_users_by_email()``, returning the users by
+    email address (as passed). All addresses are looked up using a single
+    query: the users having a matching ``EmailAddress`` (using its index),
+    combined (``UNION ALL``) with the users whose email field matches.
+
+    Email addresses are stored in lower case, so that the lookup can use the
+    index. Rows only matching due to the database collation (e.g. accent
+    insensitivity) are ignored.
+    """
     User = get_user_model()
-    email = email.lower()
-    mails = list(EmailAddress.objects.filter(email=email).select_related("user"))
-    logger.info("Emails found: %s", len(mails))
-    is_verified = False
-    if prefer_verified:
-        logger.info("Prefer verified emails")
-        verified_mails = list(filter(lambda e: e.verified, mails))
-        if verified_mails:
-            mails = verified_mails
-            is_verified = True
-    users = []
-    for e in mails:
-        if _unicode_ci_compare(e.email, email):
-            users.append(e.user)
-    if app_settings.USER_MODEL_EMAIL_FIELD and not is_verified:
-        q_dict = {app_settings.USER_MODEL_EMAIL_FIELD: email}
-        user_qs = User.objects.filter(**q_dict)
-        for user in user_qs.iterator(2000):
-            user_email = getattr(user, app_settings.USER_MODEL_EMAIL_FIELD)
-            if _unicode_ci_compare(user_email, email):
-                users.append(user)
-    if is_active is not None:
-        users = [u for u in set(users) if u.is_active == is_active]
-    return list(set(users))
+    lower_emails = {email: email.lower() for email in emails}
+    addresses = set(lower_emails.values())
+    # Per address: the users having an unverified, verified email address
+    # record, and, those having a matching email field.
+    matches: Dict[str, Tuple[list, list, list]] = {
+        email: ([], [], []) for email in addresses
+    }
+    if addresses:
+        user_qs = (
+            User.objects.filter(emailaddress__email__in=addresses)
+            .annotate(
+                _allauth_email=F("emailaddress__email"),
+                _allauth_verified=F("emailaddress__verified"),
+            )
+            .order_by()
+        )
+        if app_settings.USER_MODEL_EMAIL_FIELD:
+            user_qs = user_qs.union(
+                User.objects.filter(
+                    **{app_settings.USER_MODEL_EMAIL_FIELD + "__in": addresses}
+                )
+                .annotate(
+                    _allauth_email=F(app_settings.USER_MODEL_EMAIL_FIELD),
+                    _allauth_verified=Value(None, output_field=models.BooleanField()),
+                )
+                .order_by(),
+                all=True,
+            )
+        for user in user_qs:
+            match = matches.get(user._allauth_email.lower())
+            if match is None:
+                continue
+            if user._allauth_verified is None:
+                match[2].append(user)
+            else:
+                match[int(user._allauth_verified)].append(user)
+    logger.info("Users found: %s", sum(len(sum(m, [])) for m in matches.values()))
+    ret = {}
+    for email, address in lower_emails.items():
+        unverified, verified, by_field = matches[address]
+        if prefer_verified and verified:
+            users = verified
+        else:
+            users = unverified + verified + by_field
+        users = list(set(users))
+        if is_active is not None:
+            users = [u for u in users if u.is_active == is_active]
+        ret[email] = users
+    return ret
 
 
 def passthrough_next_redirect_url(request, url, redirect_field_name):
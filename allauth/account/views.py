@@ -6,13 +6,16 @@ from django.core.validators import validate_email
 from django.forms import Form, ValidationError
 from django.http import Http404, HttpResponse, HttpResponseRedirect
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import add_never_cache_headers
 from django.utils.decorators import method_decorator
 from django.utils.functional import cached_property
 from django.views.decorators.cache import never_cache
 from django.views.decorators.debug import sensitive_post_parameters
-from django.views.generic.base import TemplateView
+from django.views.generic.base import TemplateView, View
 from django.views.generic.edit import FormView
 
+from asgiref.sync import sync_to_async
+
 from allauth import app_settings as allauth_app_settings
 from allauth.account import app_settings
 from allauth.account.adapter import get_adapter
@@ -146,6 +149,65 @@ class LoginView(
 login = LoginView.as_view()
 
 
+class AsyncLoginView(LoginView):
+    """
+    Async variant of the login view, for ASGI deployments, see
+    ``ACCOUNT_ASYNC_VIEWS``. The password is verified off the event loop. All
+    other work is done in one thread before, and one thread after, verifying
+    the password.
+    """
+
+    view_is_async = True
+
+    @method_decorator(login_not_required)
+    async def dispatch(self, request, *args, **kwargs):
+        request.sensitive_post_parameters = "__ALL__"
+        if request.method == "POST":
+            response = await self._apost(request)
+        else:
+            response = await sync_to_async(self._dispatch)(request, *args, **kwargs)
+        add_never_cache_headers(response)
+        return response
+
+    def _pre_dispatch(self, request):
+        response = ratelimit.consume_or_429(request, action="login")
+        if response:
+            return response
+        if allauth_app_settings.SOCIALACCOUNT_ONLY and request.method != "GET":
+            raise PermissionDenied()
+        return self._redirect_authenticated_user(request)
+
+    def _dispatch(self, request, *args, **kwargs):
+        response = self._pre_dispatch(request)
+        if response is None:
+            response = View.dispatch(self, request, *args, **kwargs)
+        return response
+
+    async def _apost(self, request):
+        form, credentials, response = await sync_to_async(self._begin_post)(request)
+        if response is not None:
+            return response
+        user = None
+        if credentials:
+            adapter = get_adapter(request)
+            user = await adapter._aauthenticate(request, **credentials)
+        return await sync_to_async(self._end_post)(form, user, credentials)
+
+    def _begin_post(self, request):
+        response = self._pre_dispatch(request)
+        if response is not None:
+            return None, None, response
+        form = self.get_form()
+        return form, form._begin_async_validation(), None
+
+    def _end_post(self, form, user, credentials):
+        if credentials:
+            is_valid = form._end_async_validation(user, credentials)
+        else:
+            is_valid = form.is_bound and not form.errors
+        return self._respond_to_form(form, is_valid)
+
+
 class SignupView(
     RedirectAuthenticatedUserMixin,
     CloseableSignupMixin,
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from django.apps import apps
 
 
@@ -46,6 +48,24 @@ class AppSettings:
     def DEFAULT_AUTO_FIELD(self):
         return self._setting("DEFAULT_AUTO_FIELD", None)
 
+    @property
+    def RATE_LIMIT_BACKEND(self):
+        from allauth.utils import import_attribute
+
+        path = self._setting(
+            "RATE_LIMIT_BACKEND", "allauth.core.ratelimit.HistoryRateLimitBackend"
+        )
+        cls = import_attribute(path)
+        return cls()
+
+    @property
+    def RATE_LIMIT_COLLECTOR(self) -> Optional[str]:
+        return self._setting("RATE_LIMIT_COLLECTOR", None)
+
+    @property
+    def RATE_LIMIT_BLOCKED_KEYS_CACHE_SIZE(self) -> int:
+        return self._setting("RATE_LIMIT_BLOCKED_KEYS_CACHE_SIZE", 0)
+
 
 _app_settings = AppSettings("ALLAUTH_")
 
@@ -20,7 +20,7 @@ import pytest
 from allauth.account.models import EmailAddress
 from allauth.account.utils import user_email, user_pk_to_url_str, user_username
 from allauth.core import context
-from allauth.socialaccount.internal import statekit
+from allauth.socialaccount.internal import httpkit, statekit
 from allauth.socialaccount.providers.base.constants import AuthProcess
 
 
@@ -222,6 +222,13 @@ def clear_context_request():
     context._request_var.set(None)
 
 
+@pytest.fixture(autouse=True)
+def clear_document_caches():
+    yield
+    httpkit.openid_configurations.clear()
+    httpkit.key_sets.clear()
+
+
 @pytest.fixture
 def enable_cache(settings):
     from django.core.cache import cache
@@ -402,7 +409,13 @@ def settings_impacting_urls(settings):
     def f(**kv):
         def reload_urlconf():
             clear_url_caches()
-            for urlconf in [
+            provider_urlconfs = [
+                name
+                for name in sys.modules
+                if name.startswith("allauth.socialaccount.providers.")
+                and name.endswith(".urls")
+            ]
+            for urlconf in provider_urlconfs + [
                 settings.ROOT_URLCONF,
                 "allauth.account.urls",
                 "allauth.urls",
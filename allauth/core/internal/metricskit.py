@@ -0,0 +1,140 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from allauth import app_settings as allauth_settings
+from allauth.utils import import_attribute
+
+
+class BaseRateLimitCollector:
+    """
+    Receives rate limit instrumentation events. Subclass and override the
+    methods you are interested in, e.g. to forward the events to a metrics
+    library of your choice.
+    """
+
+    def increment(self, *, action: str, per: str, outcome: str) -> None:
+        """
+        Called for each rate of an action that is checked. The outcome is one
+        of ``"allowed"``, ``"denied"`` or ``"rolled_back"``.
+        """
+        pass
+
+    def observe(self, *, operation: str, duration: float) -> None:
+        """
+        Called with the duration (in seconds) of the cache operations involved
+        in ``"consume"``, ``"rollback"`` and ``"clear"``.
+        """
+        pass
+
+
+class InMemoryRateLimitCollector(BaseRateLimitCollector):
+    """
+    Keeps counters and latency histograms in memory. Note that the metrics are
+    per process.
+    """
+
+    buckets: Tuple[float, ...] = (
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+    )
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.histograms: Dict[str, List[int]] = {}
+        self.sums: Dict[str, float] = defaultdict(float)
+
+    def increment(self, *, action: str, per: str, outcome: str) -> None:
+        with self._lock:
+            self.counters[(action, per, outcome)] += 1
+
+    def observe(self, *, operation: str, duration: float) -> None:
+        idx = bisect.bisect_left(self.buckets, duration)
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                # One extra bucket for +Inf.
+                histogram = self.histograms[operation] = [0] * (len(self.buckets) + 1)
+            histogram[idx] += 1
+            self.sums[operation] += duration
+
+    def render_text(self) -> str:
+        """
+        Renders the metrics using the Prometheus text exposition format.
+        """
+        lines = [
+            "# HELP allauth_ratelimit_total Rate limit checks.",
+            "# TYPE allauth_ratelimit_total counter",
+        ]
+        with self._lock:
+            for (action, per, outcome), value in sorted(self.counters.items()):
+                lines.append(
+                    f'allauth_ratelimit_total{{action="{action}",per="{per}",'
+                    f'outcome="{outcome}"}} {value}'
+                )
+            lines.extend(
+                [
+                    "# HELP allauth_ratelimit_cache_seconds Time spent in the cache.",
+                    "# TYPE allauth_ratelimit_cache_seconds histogram",
+                ]
+            )
+            for operation, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram):
+                    cumulative += count
+                    lines.append(
+                        "allauth_ratelimit_cache_seconds_bucket"
+                        f'{{operation="{operation}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    "allauth_ratelimit_cache_seconds_sum"
+                    f'{{operation="{operation}"}} {self.sums[operation]}'
+                )
+                lines.append(
+                    "allauth_ratelimit_cache_seconds_count"
+                    f'{{operation="{operation}"}} {cumulative}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+_collectors: Dict[str, BaseRateLimitCollector] = {}
+_collectors_lock = threading.Lock()
+
+
+def get_collector() -> Optional[BaseRateLimitCollector]:
+    path = allauth_settings.RATE_LIMIT_COLLECTOR
+    if not path:
+        return None
+    collector = _collectors.get(path)
+    if collector is None:
+        with _collectors_lock:
+            collector = _collectors.get(path)
+            if collector is None:
+                collector = _collectors[path] = import_attribute(path)()
+    return collector
+
+
+@contextmanager
+def measure(collector: Optional[BaseRateLimitCollector], operation: str):
+    if collector is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        collector.observe(operation=operation, duration=time.perf_counter() - start)
@@ -1,42 +1,71 @@
 """
-Rate limiting in this implementation relies on a cache and uses non-atomic
-operations, making it vulnerable to race conditions. As a result, users may
-occasionally bypass the intended rate limit due to concurrent access. However,
-such race conditions are rare in practice. For example, if the limit is set to
-10 requests per minute and a large number of parallel processes attempt to test
-that limit, you may occasionally observe slight overruns—such as 11 or 12
-requests slipping through. Nevertheless, exceeding the limit by a large margin
-is highly unlikely due to the low probability of many processes entering the
-critical non-atomic code section simultaneously.
+Rate limiting relies on a cache. The storage strategy is pluggable, see
+``ALLAUTH_RATE_LIMIT_BACKEND``.
+
+The default (history) backend uses non-atomic operations, making it vulnerable
+to race conditions. As a result, users may occasionally bypass the intended
+rate limit due to concurrent access. However, such race conditions are rare in
+practice. For example, if the limit is set to 10 requests per minute and a
+large number of parallel processes attempt to test that limit, you may
+occasionally observe slight overruns—such as 11 or 12 requests slipping
+through. Nevertheless, exceeding the limit by a large margin is highly unlikely
+due to the low probability of many processes entering the critical non-atomic
+code section simultaneously.
+
+The counter based backends only use ``cache.add()`` and ``cache.incr()``, which
+are atomic on caches such as Redis and Memcached, and store a single integer
+per window instead of a list of timestamps.
 """
 
+import abc
+import functools
 import hashlib
+import threading
 import time
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 
 from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 
 from allauth.core.exceptions import RateLimited
+from allauth.core.internal.metricskit import get_collector, measure
 
 
 Rate = namedtuple("Rate", "amount duration per")
 
+_denied_rate: ContextVar[Optional[Rate]] = ContextVar(
+    "allauth_ratelimit_denied_rate", default=None
+)
+
 
 @dataclass
 class SingleRateLimitUsage:
     cache_key: str
     cache_duration: Union[float, int]
     timestamp: float
+    rate: Optional[Rate] = None
+    backend: Optional["BaseRateLimitBackend"] = None
+    action: Optional[str] = None
 
     def rollback(self) -> None:
-        history = cache.get(self.cache_key, [])
-        history = [ts for ts in history if ts != self.timestamp]
-        cache.set(self.cache_key, history, self.cache_duration)
+        backend = self.backend or get_backend()
+        collector = get_collector()
+        with measure(collector, "rollback"):
+            backend.rollback(self)
+        if collector and self.action and self.rate:
+            collector.increment(
+                action=self.action, per=self.rate.per, outcome="rolled_back"
+            )
+        blocked_keys = get_blocked_keys()
+        if blocked_keys is not None:
+            blocked_keys.discard(self.cache_key)
 
 
 @dataclass
@@ -88,12 +117,179 @@ def parse_rates(rates: Optional[str]) -> List[Rate]:
     return ret
 
 
-def get_cache_key(request, *, action: str, rate: Rate, key=None, user=None):
+class CompiledConfig(Mapping[str, Tuple[Rate, ...]]):
+    """
+    An immutable, parsed rate limit configuration, mapping actions to their
+    rates. The cache key prefix of each action is precomputed as well.
+    """
+
+    def __init__(self, config: Mapping):
+        self._rates: Dict[str, Tuple[Rate, ...]] = {
+            action: tuple(parse_rates(rates)) for action, rates in config.items()
+        }
+        self._key_prefixes: Dict[str, str] = {
+            action: _key_prefix(action) for action in self._rates
+        }
+
+    def __getitem__(self, action: str) -> Tuple[Rate, ...]:
+        return self._rates[action]
+
+    def __iter__(self):
+        return iter(self._rates)
+
+    def __len__(self) -> int:
+        return len(self._rates)
+
+    def key_prefix(self, action: str) -> str:
+        prefix = self._key_prefixes.get(action)
+        if prefix is None:
+            prefix = _key_prefix(action)
+        return prefix
+
+
+def _key_prefix(action: str) -> str:
+    return f"allauth:rl:{action}:"
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_config(
+    items: Tuple[Tuple[str, Optional[str]], ...],
+) -> CompiledConfig:
+    return CompiledConfig(dict(items))
+
+
+def compile_config(config: Mapping) -> CompiledConfig:
+    """
+    Parses a rate limit configuration (action -> rates string) into an
+    immutable mapping of action -> rates. Compilation results are cached by
+    configuration contents, so parsing only happens once per configuration.
+    """
+    if isinstance(config, CompiledConfig):
+        return config
+    return _compile_config(tuple(config.items()))
+
+
+def get_config() -> CompiledConfig:
+    """
+    Returns the compiled ``ACCOUNT_RATE_LIMITS``. Compiled once, up until the
+    settings change.
+    """
+    global _config
+    config = _config
+    if config is None:
+        from allauth.account import app_settings
+
+        config = _config = compile_config(app_settings.RATE_LIMITS)
+    return config
+
+
+class BlockedKeys:
+    """
+    A bounded, in-process LRU of cache keys that are known to be rate limited
+    up until a given point in time. Consulted before the shared cache, so that
+    requests that are going to be denied anyway do not cause any cache traffic.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_blocked(self, cache_key: str) -> bool:
+        with self._lock:
+            until = self._entries.get(cache_key)
+            if until is None:
+                return False
+            if until <= time.time():
+                del self._entries[cache_key]
+                return False
+            self._entries.move_to_end(cache_key)
+            return True
+
+    def add(self, cache_key: str, until: float) -> None:
+        with self._lock:
+            self._entries[cache_key] = until
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, cache_key: str) -> None:
+        with self._lock:
+            self._entries.pop(cache_key, None)
+
+
+_blocked_keys: Optional[BlockedKeys] = None
+_config: Optional[CompiledConfig] = None
+_backend: Optional["BaseRateLimitBackend"] = None
+_blocked_keys_lock = threading.Lock()
+
+
+def get_blocked_keys() -> Optional[BlockedKeys]:
+    global _blocked_keys
+    from allauth import app_settings as allauth_app_settings
+
+    maxsize = allauth_app_settings.RATE_LIMIT_BLOCKED_KEYS_CACHE_SIZE
+    if not maxsize:
+        return None
+    with _blocked_keys_lock:
+        if _blocked_keys is None or _blocked_keys.maxsize != maxsize:
+            _blocked_keys = BlockedKeys(maxsize)
+        return _blocked_keys
+
+
+@receiver(setting_changed)
+def _clear_compiled_config(**kwargs) -> None:
+    global _backend, _blocked_keys, _config
+    _compile_config.cache_clear()
+    _backend = None
+    _blocked_keys = None
+    _config = None
+
+
+def _get_request_memo(request) -> Dict[str, str]:
+    """
+    Client IP and key hashes are shared by all rate checks within a request,
+    and are memoized on ``request.allauth`` (if present).
+    """
+    namespace = getattr(request, "allauth", None)
+    if namespace is None:
+        return {}
+    memo = getattr(namespace, "ratelimit", None)
+    if memo is None:
+        memo = namespace.ratelimit = {}
+    return memo
+
+
+def _get_client_ip(request, memo: Dict[str, str]) -> str:
     from allauth.account.adapter import get_adapter
 
+    ip = memo.get("ip")
+    if ip is None:
+        ip = memo["ip"] = get_adapter().get_client_ip(request)
+    return ip
+
+
+def _get_key_hash(key: str, memo: Dict[str, str]) -> str:
+    memo_key = "key:" + key
+    key_hash = memo.get(memo_key)
+    if key_hash is None:
+        key_hash = memo[memo_key] = hashlib.sha256(key.encode("utf8")).hexdigest()
+    return key_hash
+
+
+def get_cache_key(
+    request,
+    *,
+    action: str,
+    rate: Rate,
+    key=None,
+    user=None,
+    prefix: Optional[str] = None,
+):
+    memo = _get_request_memo(request)
     source: Tuple[str, ...]
     if rate.per == "ip":
-        source = ("ip", get_adapter().get_client_ip(request))
+        source = ("ip", _get_client_ip(request, memo))
     elif rate.per == "user":
         if user is None:
             if not request.user.is_authenticated:
@@ -107,76 +303,392 @@ def get_cache_key(request, *, action: str, rate: Rate, key=None, user=None):
             raise ImproperlyConfigured(
                 "ratelimit configured per key but no key specified"
             )
-        key_hash = hashlib.sha256(key.encode("utf8")).hexdigest()
-        source = (key_hash,)
+        source = (_get_key_hash(key, memo),)
     else:
         raise ValueError(rate.per)
-    keys = ["allauth", "rl", action, *source]
-    return ":".join(keys)
+    if prefix is None:
+        prefix = _key_prefix(action)
+    return prefix + ":".join(source)
 
 
-def _consume_single_rate(
-    request,
-    *,
-    action: str,
-    rate: Rate,
-    key=None,
-    user=None,
-    dry_run: bool = False,
-    raise_exception: bool = False
-) -> Optional[SingleRateLimitUsage]:
-    cache_key = get_cache_key(request, action=action, rate=rate, key=key, user=user)
-    history = cache.get(cache_key, [])
-    now = time.time()
-    while history and history[-1] <= now - rate.duration:
-        history.pop()
-    allowed = len(history) < rate.amount
-    if allowed:
-        usage = SingleRateLimitUsage(
-            cache_key=cache_key, timestamp=now, cache_duration=rate.duration
+class BaseRateLimitBackend(abc.ABC):
+    """
+    Stores the rate limit state for a single cache key. All state is kept in
+    the Django cache, a single backend instance is shared by all threads.
+    """
+
+    @property
+    def denied_rate(self) -> Optional[Rate]:
+        """
+        The rate that caused the last denial (in the current context), if known.
+        """
+        return _denied_rate.get()
+
+    @denied_rate.setter
+    def denied_rate(self, rate: Optional[Rate]) -> None:
+        _denied_rate.set(rate)
+
+    @abc.abstractmethod
+    def consume(
+        self, cache_key: str, rate: Rate, *, dry_run: bool = False
+    ) -> Optional[SingleRateLimitUsage]:
+        """
+        Consumes one unit of the rate for the given key. Returns ``None`` in
+        case the rate limit is exceeded. In dry-run mode the usage is checked,
+        but not recorded.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def rollback(self, usage: SingleRateLimitUsage) -> None:
+        """
+        Undoes a previous (non dry-run) consumption.
+        """
+        raise NotImplementedError
+
+    def consume_many(
+        self, items: List[Tuple[str, Rate]], *, dry_run: bool = False
+    ) -> Optional[List[SingleRateLimitUsage]]:
+        """
+        Consumes all of the given ``(cache_key, rate)`` pairs, or none at all.
+        Backends that can, override this to check all rates using a single
+        cache round trip.
+        """
+        usages: List[SingleRateLimitUsage] = []
+        for cache_key, rate in items:
+            usage = self.consume(cache_key, rate, dry_run=dry_run)
+            if not usage:
+                if not dry_run:
+                    for prior_usage in usages:
+                        self.rollback(prior_usage)
+                return None
+            usages.append(usage)
+        return usages
+
+    def clear(self, cache_key: str, rate: Rate) -> None:
+        cache.delete(cache_key)
+
+    def _deny(self, cache_key: str, rate: Rate, until: float) -> None:
+        """
+        Backends call this when denying, passing the point in time up until
+        the key is known to remain rate limited.
+        """
+        self.denied_rate = rate
+        blocked_keys = get_blocked_keys()
+        if blocked_keys is not None:
+            blocked_keys.add(cache_key, until)
+        return None
+
+    def _usage(self, cache_key: str, rate: Rate, now: float) -> SingleRateLimitUsage:
+        return SingleRateLimitUsage(
+            cache_key=cache_key,
+            cache_duration=rate.duration,
+            timestamp=now,
+            rate=rate,
+            backend=self,
         )
-    else:
-        usage = None
-    if allowed and not dry_run:
-        history.insert(0, now)
-        cache.set(cache_key, history, rate.duration)
-    if not allowed and raise_exception:
-        raise RateLimited
-    return usage
+
+
+class HistoryRateLimitBackend(BaseRateLimitBackend):
+    """
+    Keeps a list of timestamps per key, resulting in an exact sliding window.
+    Storage grows with the rate amount, and updates are not atomic.
+    """
+
+    def consume(
+        self, cache_key: str, rate: Rate, *, dry_run: bool = False
+    ) -> Optional[SingleRateLimitUsage]:
+        usages = self.consume_many([(cache_key, rate)], dry_run=dry_run)
+        return usages[0] if usages else None
+
+    def consume_many(
+        self, items: List[Tuple[str, Rate]], *, dry_run: bool = False
+    ) -> Optional[List[SingleRateLimitUsage]]:
+        histories = cache.get_many([cache_key for cache_key, rate in items])
+        now = time.time()
+        usages = []
+        for cache_key, rate in items:
+            history = histories.get(cache_key, [])
+            while history and history[-1] <= now - rate.duration:
+                history.pop()
+            if len(history) >= rate.amount:
+                if rate.amount <= 0:
+                    return self._deny(cache_key, rate, now + rate.duration)
+                # Allowed again once the oldest timestamp that counts expires.
+                return self._deny(
+                    cache_key, rate, history[rate.amount - 1] + rate.duration
+                )
+            history.insert(0, now)
+            histories[cache_key] = history
+            usages.append(self._usage(cache_key, rate, now))
+        if not dry_run:
+            cache.set_many(
+                {cache_key: histories[cache_key] for cache_key, rate in items},
+                max(rate.duration for cache_key, rate in items),
+            )
+        return usages
+
+    def rollback(self, usage: SingleRateLimitUsage) -> None:
+        history = cache.get(usage.cache_key, [])
+        history = [ts for ts in history if ts != usage.timestamp]
+        cache.set(usage.cache_key, history, usage.cache_duration)
+
+
+class FixedWindowRateLimitBackend(BaseRateLimitBackend):
+    """
+    Keeps a single counter per key per time window. The counter is created
+    using ``cache.add()`` and bumped using ``cache.incr()``, so concurrent
+    requests cannot overrun the limit on caches with atomic increments.
+    """
+
+    sliding = False
+
+    def _window(self, now: float, rate: Rate) -> int:
+        return int(now // rate.duration)
+
+    def _window_key(self, cache_key: str, window: int) -> str:
+        return f"{cache_key}:{window}"
+
+    def _estimate(self, current: int, previous: int, now: float, rate: Rate) -> float:
+        if not self.sliding:
+            return current
+        elapsed = (now % rate.duration) / rate.duration
+        return previous * (1 - elapsed) + current
+
+    def _blocked_until(
+        self, window: int, current: int, previous: int, rate: Rate
+    ) -> float:
+        """
+        Returns when a next request would be allowed, given the ``current``
+        count (excluding that request).
+        """
+        end = (window + 1) * rate.duration
+        room = rate.amount - current - 1
+        if not self.sliding or previous <= 0 or room < 0:
+            return end
+        return min(end, (window + 1 - room / previous) * rate.duration)
+
+    def consume(
+        self, cache_key: str, rate: Rate, *, dry_run: bool = False
+    ) -> Optional[SingleRateLimitUsage]:
+        if dry_run:
+            usages = self.consume_many([(cache_key, rate)], dry_run=True)
+            return usages[0] if usages else None
+        now = time.time()
+        window = self._window(now, rate)
+        current_key = self._window_key(cache_key, window)
+        previous_key = self._window_key(cache_key, window - 1)
+        # The window key needs to outlive its own window, as it is used as the
+        # previous window when sliding.
+        cache.add(current_key, 0, rate.duration * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Key got evicted in between, or, a dummy cache is in use.
+            return self._usage(cache_key, rate, now)
+        previous = cache.get(previous_key, 0) if self.sliding else 0
+        if self._estimate(current, previous, now, rate) > rate.amount:
+            self._decr(current_key)
+            until = self._blocked_until(window, current - 1, previous, rate)
+            return self._deny(cache_key, rate, until)
+        return self._usage(cache_key, rate, now)
+
+    def consume_many(
+        self, items: List[Tuple[str, Rate]], *, dry_run: bool = False
+    ) -> Optional[List[SingleRateLimitUsage]]:
+        if not dry_run:
+            # Increments cannot be batched without losing atomicity.
+            return super().consume_many(items)
+        now = time.time()
+        windows = []
+        for cache_key, rate in items:
+            window = self._window(now, rate)
+            windows.append(
+                (
+                    window,
+                    self._window_key(cache_key, window),
+                    self._window_key(cache_key, window - 1),
+                )
+            )
+        counts = cache.get_many(
+            [key for window, *keys in windows for key in keys],
+        )
+        usages = []
+        for (cache_key, rate), (window, current_key, previous_key) in zip(
+            items, windows
+        ):
+            current = counts.get(current_key, 0)
+            previous = counts.get(previous_key, 0)
+            if self._estimate(current + 1, previous, now, rate) > rate.amount:
+                until = self._blocked_until(window, current, previous, rate)
+                return self._deny(cache_key, rate, until)
+            usages.append(self._usage(cache_key, rate, now))
+        return usages
+
+    def _decr(self, key: str) -> None:
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+
+    def rollback(self, usage: SingleRateLimitUsage) -> None:
+        rate = usage.rate
+        if rate is None:
+            return
+        window = self._window(usage.timestamp, rate)
+        self._decr(self._window_key(usage.cache_key, window))
+
+    def clear(self, cache_key: str, rate: Rate) -> None:
+        window = self._window(time.time(), rate)
+        cache.delete_many(
+            [
+                self._window_key(cache_key, window),
+                self._window_key(cache_key, window - 1),
+            ]
+        )
+
+
+class SlidingWindowRateLimitBackend(FixedWindowRateLimitBackend):
+    """
+    Approximates a sliding window by weighing the counter of the previous
+    window by the fraction of it that still overlaps with the sliding window.
+    """
+
+    sliding = True
+
+
+class GCRARateLimitBackend(BaseRateLimitBackend):
+    """
+    Generic cell rate algorithm: a token bucket that only stores the
+    theoretical arrival time (a single float) per key. A burst of the full
+    rate amount is allowed, after which requests are admitted at an even pace.
+    """
+
+    def consume(
+        self, cache_key: str, rate: Rate, *, dry_run: bool = False
+    ) -> Optional[SingleRateLimitUsage]:
+        usages = self.consume_many([(cache_key, rate)], dry_run=dry_run)
+        return usages[0] if usages else None
+
+    def _tat_key(self, cache_key: str, rate: Rate) -> str:
+        # Rates sharing the same ``per`` share the cache key, yet each needs
+        # its own arrival time.
+        return f"{cache_key}:{rate.amount}/{rate.duration}"
+
+    def consume_many(
+        self, items: List[Tuple[str, Rate]], *, dry_run: bool = False
+    ) -> Optional[List[SingleRateLimitUsage]]:
+        tat_keys = [self._tat_key(cache_key, rate) for cache_key, rate in items]
+        tats = cache.get_many(tat_keys)
+        now = time.time()
+        usages = []
+        for (cache_key, rate), tat_key in zip(items, tat_keys):
+            if rate.amount <= 0:
+                return self._deny(cache_key, rate, now + rate.duration)
+            interval = rate.duration / rate.amount
+            tat = max(tats.get(tat_key) or now, now)
+            new_tat = tat + interval
+            if new_tat - now > rate.duration:
+                return self._deny(cache_key, rate, new_tat - rate.duration)
+            tats[tat_key] = new_tat
+            usages.append(self._usage(cache_key, rate, now))
+        if not dry_run:
+            cache.set_many(
+                {tat_key: tats[tat_key] for tat_key in tat_keys},
+                max(tats[tat_key] for tat_key in tat_keys) - now,
+            )
+        return usages
+
+    def rollback(self, usage: SingleRateLimitUsage) -> None:
+        rate = usage.rate
+        if rate is None:
+            return
+        tat_key = self._tat_key(usage.cache_key, rate)
+        tat = cache.get(tat_key)
+        if tat is None:
+            return
+        now = time.time()
+        tat -= rate.duration / rate.amount
+        if tat > now:
+            cache.set(tat_key, tat, tat - now)
+        else:
+            cache.delete(tat_key)
+
+    def clear(self, cache_key: str, rate: Rate) -> None:
+        cache.delete(self._tat_key(cache_key, rate))
+
+
+def get_backend() -> BaseRateLimitBackend:
+    global _backend
+    backend = _backend
+    if backend is None:
+        from allauth import app_settings as allauth_app_settings
+
+        backend = _backend = allauth_app_settings.RATE_LIMIT_BACKEND
+    return backend
 
 
 def consume(
     request: HttpRequest,
     *,
     action: str,
-    config: Dict[str, str],
+    config: Mapping,
     key=None,
     user=None,
     dry_run: bool = False,
-    raise_exception: bool = False
+    raise_exception: bool = False,
 ) -> Optional[RateLimitUsage]:
     usage = RateLimitUsage(usage=[])
     if request.method == "GET":
         return usage
-    rates = parse_rates(config.get(action))
+    compiled = compile_config(config)
+    rates = compiled.get(action)
     if not rates:
         return usage
-    allowed = True
-    for rate in rates:
-        single_usage = _consume_single_rate(
-            request,
-            action=action,
-            rate=rate,
-            key=key,
-            user=user,
-            dry_run=dry_run,
-            raise_exception=raise_exception,
+    prefix = compiled.key_prefix(action)
+    items = [
+        (
+            get_cache_key(
+                request, action=action, rate=rate, key=key, user=user, prefix=prefix
+            ),
+            rate,
         )
-        if not single_usage:
-            allowed = False
-            break
-        usage.usage.append(single_usage)
-    return usage if allowed else None
+        for rate in rates
+    ]
+    collector = get_collector()
+    blocked_keys = get_blocked_keys()
+    denied_rate = None
+    if blocked_keys is not None:
+        for cache_key, rate in items:
+            if blocked_keys.is_blocked(cache_key):
+                denied_rate = rate
+                break
+    if denied_rate:
+        usages = None
+    else:
+        backend = get_backend()
+        backend.denied_rate = None
+        with measure(collector, "consume"):
+            usages = backend.consume_many(items, dry_run=dry_run)
+        denied_rate = backend.denied_rate
+    if collector and not dry_run:
+        if usages is None:
+            collector.increment(
+                action=action,
+                per=denied_rate.per if denied_rate else "",
+                outcome="denied",
+            )
+        else:
+            for rate in rates:
+                collector.increment(action=action, per=rate.per, outcome="allowed")
+    if usages is None:
+        if raise_exception:
+            raise RateLimited
+        return None
+    for single_usage in usages:
+        single_usage.action = action
+    usage.usage.extend(usages)
+    return usage
 
 
 def handler429(request) -> HttpResponse:
@@ -185,8 +697,18 @@ def handler429(request) -> HttpResponse:
     return render(request, "429." + app_settings.TEMPLATE_EXTENSION, status=429)
 
 
-def clear(request, *, config: dict, action: str, key=None, user=None):
-    rates = parse_rates(config.get(action))
+def clear(request, *, config: Mapping, action: str, key=None, user=None):
+    compiled = compile_config(config)
+    rates = compiled.get(action, ())
+    prefix = compiled.key_prefix(action)
+    backend = get_backend()
+    blocked_keys = get_blocked_keys()
+    collector = get_collector()
     for rate in rates:
-        cache_key = get_cache_key(request, action=action, rate=rate, key=key, user=user)
-        cache.delete(cache_key)
+        cache_key = get_cache_key(
+            request, action=action, rate=rate, key=key, user=user, prefix=prefix
+        )
+        with measure(collector, "clear"):
+            backend.clear(cache_key, rate)
+        if blocked_keys is not None:
+            blocked_keys.discard(cache_key)
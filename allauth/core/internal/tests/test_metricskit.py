@@ -0,0 +1,58 @@
+from django.http import Http404
+
+import pytest
+
+from allauth.core import ratelimit
+from allauth.core.internal import ratelimit as ratelimit_impl
+from allauth.core.internal.metricskit import get_collector
+
+
+@pytest.fixture
+def collector(settings):
+    settings.ALLAUTH_RATE_LIMIT_COLLECTOR = (
+        "allauth.core.ratelimit.InMemoryRateLimitCollector"
+    )
+    collector = get_collector()
+    collector.counters.clear()
+    collector.histograms.clear()
+    collector.sums.clear()
+    return collector
+
+
+def test_counters(rf, enable_cache, collector):
+    config = {"foo": "1/m/ip,5/m/key"}
+    request = rf.post("/")
+    usage = ratelimit_impl.consume(request, config=config, action="foo", key="k")
+    assert not ratelimit_impl.consume(request, config=config, action="foo", key="k")
+    usage.rollback()
+    assert ratelimit_impl.consume(
+        request, config=config, action="foo", key="k", dry_run=True
+    )
+    assert collector.counters == {
+        ("foo", "ip", "allowed"): 1,
+        ("foo", "key", "allowed"): 1,
+        ("foo", "ip", "denied"): 1,
+        ("foo", "ip", "rolled_back"): 1,
+        ("foo", "key", "rolled_back"): 1,
+    }
+    assert sum(collector.histograms["consume"]) == 3
+    assert sum(collector.histograms["rollback"]) == 2
+
+
+def test_metrics_view(rf, enable_cache, collector):
+    request = rf.post("/")
+    ratelimit_impl.consume(request, config={"foo": "1/m/ip"}, action="foo")
+    resp = ratelimit.metrics(rf.get("/metrics"))
+    assert resp.status_code == 200
+    body = resp.content.decode("utf8")
+    assert 'allauth_ratelimit_total{action="foo",per="ip",outcome="allowed"} 1' in body
+    assert (
+        'allauth_ratelimit_cache_seconds_bucket{operation="consume",le="+Inf"} 1'
+        in body
+    )
+    assert 'allauth_ratelimit_cache_seconds_count{operation="consume"} 1' in body
+
+
+def test_metrics_view_disabled(rf):
+    with pytest.raises(Http404):
+        ratelimit.metrics(rf.get("/metrics"))
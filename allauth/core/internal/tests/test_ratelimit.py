@@ -1,9 +1,42 @@
+from unittest.mock import patch
+
 import pytest
 
 from allauth.core.internal import ratelimit
 
 
-def test_rollback_consume(rf, enable_cache):
+BACKENDS = [
+    "allauth.core.ratelimit.HistoryRateLimitBackend",
+    "allauth.core.ratelimit.FixedWindowRateLimitBackend",
+    "allauth.core.ratelimit.SlidingWindowRateLimitBackend",
+    "allauth.core.ratelimit.GCRARateLimitBackend",
+]
+
+
+@pytest.fixture(params=BACKENDS)
+def rate_limit_backend(request, settings):
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = request.param
+    return request.param
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        # Tick, so that consecutive timestamps differ.
+        self.now += 0.001
+        return self.now
+
+
+@pytest.fixture
+def frozen_time():
+    clock = Clock(1_000_020.0)
+    with patch("allauth.core.internal.ratelimit.time", clock):
+        yield clock
+
+
+def test_rollback_consume(rf, enable_cache, rate_limit_backend, frozen_time):
     def consume():
         request = rf.post("/")
         config = {"foo": "2/m/ip"}
@@ -20,6 +53,85 @@ def test_rollback_consume(rf, enable_cache):
     assert not consume()
 
 
+def test_dry_run(rf, enable_cache, rate_limit_backend, frozen_time):
+    config = {"foo": "1/m/ip"}
+
+    def consume(dry_run):
+        request = rf.post("/")
+        return ratelimit.consume(request, config=config, action="foo", dry_run=dry_run)
+
+    assert consume(dry_run=True)
+    assert consume(dry_run=True)
+    assert consume(dry_run=False)
+    assert not consume(dry_run=True)
+    assert not consume(dry_run=False)
+
+
+def test_clear(rf, enable_cache, rate_limit_backend, frozen_time):
+    config = {"foo": "1/m/ip"}
+    request = rf.post("/")
+    assert ratelimit.consume(request, config=config, action="foo")
+    assert not ratelimit.consume(request, config=config, action="foo")
+    ratelimit.clear(request, config=config, action="foo")
+    assert ratelimit.consume(request, config=config, action="foo")
+
+
+@pytest.mark.parametrize(
+    "backend,elapsed,allowed",
+    [
+        # Fixed window: a new window starts with a clean slate.
+        ("allauth.core.ratelimit.FixedWindowRateLimitBackend", 20, True),
+        # Sliding: 2 * (1 - 19 / 60) + 1 > 2 -- still blocked.
+        ("allauth.core.ratelimit.SlidingWindowRateLimitBackend", 20, False),
+        ("allauth.core.ratelimit.SlidingWindowRateLimitBackend", 60, True),
+        # GCRA: one slot frees up every 30 seconds.
+        ("allauth.core.ratelimit.GCRARateLimitBackend", 20, False),
+        ("allauth.core.ratelimit.GCRARateLimitBackend", 30, True),
+    ],
+)
+def test_window_expiry(
+    rf, settings, enable_cache, frozen_time, backend, elapsed, allowed
+):
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = backend
+    config = {"foo": "2/m/ip"}
+    # Window boundary: 1_000_020 is a multiple of 60.
+    frozen_time.now = 1_000_020.0 + 58
+    assert ratelimit.consume(rf.post("/"), config=config, action="foo")
+    assert ratelimit.consume(rf.post("/"), config=config, action="foo")
+    assert not ratelimit.consume(rf.post("/"), config=config, action="foo")
+    frozen_time.now = 1_000_020.0 + 58 + elapsed
+    usage = ratelimit.consume(rf.post("/"), config=config, action="foo")
+    assert bool(usage) == allowed
+
+
+def test_gcra_stores_single_float(rf, settings, enable_cache, frozen_time):
+    from django.core.cache import cache
+
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = "allauth.core.ratelimit.GCRARateLimitBackend"
+    request = rf.post("/")
+    config = {"foo": "10/m/ip"}
+    usage = ratelimit.consume(request, config=config, action="foo")
+    ratelimit.consume(request, config=config, action="foo")
+    tat_key = f"{usage.usage[0].cache_key}:10/60"
+    assert cache.get(tat_key) == pytest.approx(1_000_020.0 + 12)
+
+
+def test_gcra_zero_rate(rf, settings, enable_cache, frozen_time):
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = "allauth.core.ratelimit.GCRARateLimitBackend"
+    config = {"foo": "0/m/ip"}
+    assert not ratelimit.consume(rf.post("/"), config=config, action="foo")
+
+
+def test_gcra_rates_sharing_per(rf, settings, enable_cache, frozen_time):
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = "allauth.core.ratelimit.GCRARateLimitBackend"
+    config = {"foo": "5/m/ip,100/d/ip"}
+    allowed = [
+        bool(ratelimit.consume(rf.post("/"), config=config, action="foo"))
+        for _ in range(10)
+    ]
+    assert allowed == [True] * 5 + [False] * 5
+
+
 @pytest.mark.parametrize(
     "rate,values",
     [
@@ -38,3 +150,156 @@ def test_parse(rate, values):
         assert rate.amount == values[i][0]
         assert rate.duration == values[i][1]
         assert rate.per == values[i][2]
+
+
+def test_consume_is_all_or_nothing(rf, enable_cache, rate_limit_backend, frozen_time):
+    config = {"foo": "2/m/ip,1/m/key"}
+    request = rf.post("/")
+    assert ratelimit.consume(request, config=config, action="foo", key="a")
+    assert not ratelimit.consume(request, config=config, action="foo", key="a")
+    # The denied attempt did not count against the IP rate.
+    assert ratelimit.consume(request, config=config, action="foo", key="b")
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        "allauth.core.ratelimit.HistoryRateLimitBackend",
+        "allauth.core.ratelimit.GCRARateLimitBackend",
+    ],
+)
+@pytest.mark.parametrize("dry_run,round_trips", [(False, 2), (True, 1)])
+def test_consume_round_trips(
+    rf, settings, enable_cache, frozen_time, backend, dry_run, round_trips
+):
+    from django.core.cache import cache
+
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = backend
+    config = {"foo": "10/m/ip,5/5m/key"}
+    request = rf.post("/")
+    with patch("allauth.core.internal.ratelimit.cache", wraps=cache) as mock_cache:
+        assert ratelimit.consume(
+            request, config=config, action="foo", key="k", dry_run=dry_run
+        )
+    assert len(mock_cache.method_calls) == round_trips
+
+
+def test_compile_config():
+    config = {"foo": "5/m/ip,1/m/key", "bar": None}
+    compiled = ratelimit.compile_config(config)
+    assert compiled["foo"] == (
+        ratelimit.Rate(5, 60, "ip"),
+        ratelimit.Rate(1, 60, "key"),
+    )
+    assert compiled["bar"] == ()
+    assert ratelimit.compile_config(dict(config)) is compiled
+    assert ratelimit.compile_config(compiled) is compiled
+    with pytest.raises(TypeError):
+        compiled["foo"] = ()
+
+
+def test_request_memo(rf, enable_cache):
+    from types import SimpleNamespace
+
+    from allauth.account.adapter import DefaultAccountAdapter
+
+    request = rf.post("/")
+    request.allauth = SimpleNamespace()
+    config = {"foo": "5/m/ip,1/m/key", "bar": "5/m/ip"}
+    with patch.object(
+        DefaultAccountAdapter, "get_client_ip", return_value="1.2.3.4"
+    ) as get_client_ip:
+        ratelimit.consume(request, config=config, action="foo", key="k")
+        ratelimit.consume(request, config=config, action="bar")
+    assert get_client_ip.call_count == 1
+    assert request.allauth.ratelimit["ip"] == "1.2.3.4"
+
+
+@pytest.mark.parametrize(
+    "backend,blocked_for",
+    [
+        ("allauth.core.ratelimit.HistoryRateLimitBackend", 60),
+        ("allauth.core.ratelimit.FixedWindowRateLimitBackend", 40),
+        ("allauth.core.ratelimit.GCRARateLimitBackend", 30),
+    ],
+)
+def test_blocked_keys_skip_cache(
+    rf, settings, enable_cache, frozen_time, backend, blocked_for
+):
+    from django.core.cache import cache
+
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = backend
+    settings.ALLAUTH_RATE_LIMIT_BLOCKED_KEYS_CACHE_SIZE = 10
+    config = {"foo": "2/m/ip"}
+    frozen_time.now = 1_000_020.0 + 20
+    assert ratelimit.consume(rf.post("/"), config=config, action="foo")
+    assert ratelimit.consume(rf.post("/"), config=config, action="foo")
+    assert not ratelimit.consume(rf.post("/"), config=config, action="foo")
+    with patch("allauth.core.internal.ratelimit.cache", wraps=cache) as mock_cache:
+        assert not ratelimit.consume(rf.post("/"), config=config, action="foo")
+        assert mock_cache.method_calls == []
+        frozen_time.now = 1_000_020.0 + 20 + blocked_for - 1
+        assert not ratelimit.consume(rf.post("/"), config=config, action="foo")
+        assert mock_cache.method_calls == []
+        frozen_time.now = 1_000_020.0 + 20 + blocked_for
+        assert ratelimit.consume(rf.post("/"), config=config, action="foo")
+
+
+def test_blocked_keys_cleared(rf, settings, enable_cache, frozen_time):
+    settings.ALLAUTH_RATE_LIMIT_BLOCKED_KEYS_CACHE_SIZE = 10
+    config = {"foo": "1/m/ip"}
+    request = rf.post("/")
+    assert ratelimit.consume(request, config=config, action="foo")
+    assert not ratelimit.consume(request, config=config, action="foo")
+    ratelimit.clear(request, config=config, action="foo")
+    assert ratelimit.consume(request, config=config, action="foo")
+
+
+def test_blocked_keys_lru(frozen_time):
+    blocked_keys = ratelimit.BlockedKeys(maxsize=2)
+    blocked_keys.add("a", frozen_time.now + 10)
+    blocked_keys.add("b", frozen_time.now + 10)
+    assert blocked_keys.is_blocked("a")
+    blocked_keys.add("c", frozen_time.now + 10)
+    assert blocked_keys.is_blocked("a")
+    assert not blocked_keys.is_blocked("b")
+    assert blocked_keys.is_blocked("c")
+    frozen_time.now += 10
+    assert not blocked_keys.is_blocked("a")
+
+
+def test_backend_reused_until_settings_change(settings):
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = "allauth.core.ratelimit.GCRARateLimitBackend"
+    backend = ratelimit.get_backend()
+    assert isinstance(backend, ratelimit.GCRARateLimitBackend)
+    assert ratelimit.get_backend() is backend
+    settings.ALLAUTH_RATE_LIMIT_BACKEND = (
+        "allauth.core.ratelimit.HistoryRateLimitBackend"
+    )
+    assert isinstance(ratelimit.get_backend(), ratelimit.HistoryRateLimitBackend)
+
+
+def test_config_compiled_once_per_settings(settings):
+    settings.ACCOUNT_RATE_LIMITS = {"foo": "5/m/ip"}
+    config = ratelimit.get_config()
+    assert config["foo"] == (ratelimit.Rate(5, 60, "ip"),)
+    assert config.key_prefix("foo") == "allauth:rl:foo:"
+    assert ratelimit.get_config() is config
+    settings.ACCOUNT_RATE_LIMITS = {"foo": "1/m/ip"}
+    assert ratelimit.get_config()["foo"] == (ratelimit.Rate(1, 60, "ip"),)
+
+
+def test_denied_rate_is_not_shared_between_threads(rf, enable_cache, frozen_time):
+    import threading
+
+    config = {"foo": "1/m/ip"}
+    request = rf.post("/")
+    backend = ratelimit.get_backend()
+    assert ratelimit.consume(request, config=config, action="foo")
+    assert not ratelimit.consume(request, config=config, action="foo")
+    assert backend.denied_rate == ratelimit.Rate(1, 60, "ip")
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(backend.denied_rate))
+    thread.start()
+    thread.join()
+    assert seen == [None]
@@ -1,21 +1,31 @@
 from typing import Optional
 
 from django.conf import settings
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 
 from allauth import app_settings
 from allauth.core.exceptions import RateLimited  # noqa
 from allauth.core.internal import ratelimit as _impl
-from allauth.core.internal.ratelimit import Rate  # noqa
+from allauth.core.internal.metricskit import (  # noqa
+    BaseRateLimitCollector,
+    InMemoryRateLimitCollector,
+    get_collector,
+)
+from allauth.core.internal.ratelimit import (  # noqa
+    BaseRateLimitBackend,
+    FixedWindowRateLimitBackend,
+    GCRARateLimitBackend,
+    HistoryRateLimitBackend,
+    Rate,
+    SlidingWindowRateLimitBackend,
+)
 from allauth.utils import import_callable
 
 
 def clear(request, *, action, key=None, user=None):
-    from allauth.account import app_settings
-
     _impl.clear(
         request=request,
-        config=app_settings.RATE_LIMITS,
+        config=_impl.get_config(),
         action=action,
         key=key,
         user=user,
@@ -31,11 +41,9 @@ def consume(
     dry_run: bool = False,
     raise_exception: bool = False
 ) -> bool:
-    from allauth.account import app_settings
-
     usage = _impl.consume(
         request=request,
-        config=app_settings.RATE_LIMITS,
+        config=_impl.get_config(),
         action=action,
         key=key,
         user=user,
@@ -65,3 +73,17 @@ def consume_or_429(request, *args, **kwargs) -> Optional[HttpResponse]:
     if not consume(request, *args, **kwargs):
         return respond_429(request)
     return None
+
+
+def metrics(request) -> HttpResponse:
+    """
+    Exposes the metrics gathered by the ``InMemoryRateLimitCollector`` in the
+    Prometheus text format. Not routed by default, and, not protected in any
+    way -- it is up to you to include it in your URLconf appropriately.
+    """
+    collector = get_collector()
+    if not isinstance(collector, InMemoryRateLimitCollector):
+        raise Http404()
+    return HttpResponse(
+        collector.render_text(), content_type="text/plain; version=0.0.4"
+    )
@@ -1,11 +1,11 @@
 import functools
 import warnings
+from typing import Dict, Optional
 
 from django.core.exceptions import (
     ImproperlyConfigured,
     MultipleObjectsReturned,
 )
-from django.db.models import Q
 from django.urls import reverse
 from django.utils.crypto import get_random_string
 from django.utils.translation import gettext_lazy as _
@@ -185,27 +185,44 @@ class DefaultSocialAccountAdapter(BaseAdapter):
     def list_providers(self, request):
         from allauth.socialaccount.providers import registry
 
+        memo = _get_provider_memo(request)
+        if memo is not None and "list" in memo:
+            return list(memo["list"])
         ret = []
-        provider_classes = registry.get_class_list()
         apps = self.list_apps(request)
         apps_map = {}
         for app in apps:
             apps_map.setdefault(app.provider, []).append(app)
-        for provider_class in provider_classes:
-            provider_apps = apps_map.get(provider_class.id, [])
+        # Only import the providers that are actually in use.
+        for spec in registry.get_spec_list():
+            provider_apps = apps_map.get(spec.id, [])
             if not provider_apps:
-                if provider_class.uses_apps:
+                if spec.uses_apps:
                     continue
                 provider_apps = [None]
+            provider_class = registry.get_class(spec.id)
             for app in provider_apps:
                 provider = provider_class(request=request, app=app)
                 ret.append(provider)
+        if memo is not None:
+            memo["list"] = list(ret)
+            _seed_provider_memo(memo, ret)
         return ret
 
     def get_provider(self, request, provider, client_id=None):
         """Looks up a `provider`, supporting subproviders by looking up by
         `provider_id`.
         """
+        memo = _get_provider_memo(request)
+        key = ("get", provider, client_id)
+        if memo is not None and key in memo:
+            return memo[key]
+        instance = self._get_provider(request, provider, client_id=client_id)
+        if memo is not None:
+            memo[key] = instance
+        return instance
+
+    def _get_provider(self, request, provider, client_id=None):
         from allauth.socialaccount.providers import registry
 
         provider_class = registry.get_class(provider)
@@ -231,20 +248,14 @@ class DefaultSocialAccountAdapter(BaseAdapter):
         (db/settings) sources of data.
         """
         # NOTE: Avoid loading models at top due to registry boot...
+        from allauth.socialaccount.internal import appkit
         from allauth.socialaccount.models import SocialApp
 
         # Map provider to the list of apps.
         provider_to_apps = {}
 
         # First, populate it with the DB backed apps.
-        if request:
-            db_apps = SocialApp.objects.on_site(request)
-        else:
-            db_apps = SocialApp.objects.all()
-        if provider:
-            db_apps = db_apps.filter(Q(provider=provider) | Q(provider_id=provider))
-        if client_id:
-            db_apps = db_apps.filter(client_id=client_id)
+        db_apps = appkit.list_db_apps(request, provider=provider, client_id=client_id)
         for app in db_apps:
             apps = provider_to_apps.setdefault(app.provider, [])
             apps.append(app)
@@ -306,13 +317,28 @@ class DefaultSocialAccountAdapter(BaseAdapter):
     def send_notification_mail(self, *args, **kwargs):
         return get_account_adapter().send_notification_mail(*args, **kwargs)
 
-    def get_requests_session(self):
+    def get_requests_session(self, provider=None):
+        """
+        Returns the ``requests`` session used to talk to the providers. If
+        ``SOCIALACCOUNT_REQUESTS_POOL`` is configured, a process wide session is
+        returned so that connections are reused across logins. If a
+        ``provider`` is passed, its ``"REQUESTS_TIMEOUT"`` setting, if any, is
+        respected.
+        """
         import requests
 
+        from allauth.socialaccount.internal import httpkit
+
+        timeout = httpkit.get_requests_timeout(provider)
+        pool_config = app_settings.REQUESTS_POOL
+        if pool_config is not None:
+            return httpkit.get_pooled_session(
+                timeout=timeout,
+                config=pool_config,
+                provider_id=provider.id if provider is not None else None,
+            )
         session = requests.Session()
-        session.request = functools.partial(
-            session.request, timeout=app_settings.REQUESTS_TIMEOUT
-        )
+        session.request = functools.partial(session.request, timeout=timeout)
         return session
 
     def is_email_verified(self, provider, email):
@@ -373,5 +399,48 @@ class DefaultSocialAccountAdapter(BaseAdapter):
         return get_random_string(STATE_ID_LENGTH)
 
 
+def _get_provider_memo(request) -> Optional[dict]:
+    """
+    Providers are looked up repeatedly while handling a single request, hence,
+    they are memoized on ``request.allauth`` (if present).
+    """
+    namespace = getattr(request, "allauth", None)
+    if namespace is None:
+        return None
+    memo = getattr(namespace, "providers", None)
+    if memo is None:
+        memo = namespace.providers = {}
+    return memo
+
+
+def _seed_provider_memo(memo: dict, providers: list) -> None:
+    """
+    Makes the providers listed available to ``get_provider()`` lookups, for
+    those lookups that unambiguously resolve to one of them.
+    """
+    from allauth.socialaccount.providers import registry
+
+    candidates: Dict[str, list] = {}
+    for provider in providers:
+        if not provider.uses_apps and provider.app:
+            # Looked up without app.
+            continue
+        keys = {provider.id}
+        if provider.app and provider.app.provider_id:
+            keys.add(provider.app.provider_id)
+        for key in keys:
+            candidates.setdefault(key, []).append(provider)
+    for key, matches in candidates.items():
+        if len(matches) > 1:
+            matches = [
+                p for p in matches if not (p.app and p.app.settings.get("hidden"))
+            ]
+        if len(matches) != 1:
+            continue
+        provider_class = registry.get_class(key)
+        if provider_class is None or type(matches[0]) is provider_class:
+            memo.setdefault(("get", key, None), matches[0])
+
+
 def get_adapter(request=None):
     return import_attribute(app_settings.ADAPTER)(request)
@@ -150,6 +150,46 @@ class AppSettings:
     def REQUESTS_TIMEOUT(self):
         return self._setting("REQUESTS_TIMEOUT", 5)
 
+    @property
+    def LAZY_PROVIDERS(self):
+        return self._setting("LAZY_PROVIDERS", False)
+
+    @property
+    def DISPATCH_URLS(self):
+        return self._setting("DISPATCH_URLS", False)
+
+    @property
+    def STATE_STORE(self):
+        return self._setting("STATE_STORE", "session")
+
+    @property
+    def STATE_TIMEOUT(self):
+        return self._setting("STATE_TIMEOUT", 60 * 60)
+
+    @property
+    def REQUESTS_MAX_WORKERS(self):
+        return self._setting("REQUESTS_MAX_WORKERS", 0)
+
+    @property
+    def HTTP_CACHE_MIN_TIMEOUT(self):
+        return self._setting("HTTP_CACHE_MIN_TIMEOUT", 5 * 60)
+
+    @property
+    def HTTP_CACHE_MAX_TIMEOUT(self):
+        return self._setting("HTTP_CACHE_MAX_TIMEOUT", 24 * 60 * 60)
+
+    @property
+    def REQUESTS_POOL(self):
+        return self._setting("REQUESTS_POOL", None)
+
+    @property
+    def APPS_INDEX_TIMEOUT(self):
+        return self._setting("APPS_INDEX_TIMEOUT", None)
+
+    @property
+    def ASYNC_VIEWS(self):
+        return self._setting("ASYNC_VIEWS", False)
+
     @property
     def OPENID_CONNECT_URL_PREFIX(self):
         return self._setting("OPENID_CONNECT_URL_PREFIX", "oidc")
@@ -11,6 +11,7 @@ class SocialAccountConfig(AppConfig):
 
     def ready(self):
         from allauth.socialaccount import checks  # noqa
+        from allauth.socialaccount.internal import appkit  # noqa
         from allauth.socialaccount.providers import registry
 
         registry.load()
@@ -0,0 +1,160 @@
+import copy
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from allauth import app_settings as allauth_settings
+from allauth.socialaccount import app_settings
+from allauth.socialaccount.models import SocialApp
+
+
+GENERATION_CACHE_KEY = "allauth:socialapps:generation"
+
+
+@dataclass(frozen=True)
+class AppIndex:
+    generation: str
+    built_at: float
+    field_names: Tuple[str, ...]
+    rows: Tuple[tuple, ...]
+    # Maps each site ID to the indices of the rows of the apps on that site.
+    site_rows: Dict[int, Tuple[int, ...]]
+
+
+_index: Optional[AppIndex] = None
+_index_lock = threading.Lock()
+
+
+def _get_generation() -> Optional[str]:
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(GENERATION_CACHE_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(GENERATION_CACHE_KEY)
+    return generation
+
+
+def _build_index(generation: str) -> AppIndex:
+    field_names = tuple(f.attname for f in SocialApp._meta.concrete_fields)
+    rows = tuple(SocialApp.objects.order_by("pk").values_list(*field_names))
+    pk_idx = field_names.index(SocialApp._meta.pk.attname)
+    row_by_pk = {row[pk_idx]: idx for idx, row in enumerate(rows)}
+    site_rows: Dict[int, List[int]] = {}
+    if allauth_settings.SITES_ENABLED:
+        for app_id, site_id in SocialApp.sites.through.objects.values_list(
+            "socialapp_id", "site_id"
+        ):
+            site_rows.setdefault(site_id, []).append(row_by_pk[app_id])
+    return AppIndex(
+        generation=generation,
+        built_at=time.monotonic(),
+        field_names=field_names,
+        rows=rows,
+        site_rows={site_id: tuple(sorted(idxs)) for site_id, idxs in site_rows.items()},
+    )
+
+
+def _is_current(index: Optional[AppIndex], generation: str, timeout: int) -> bool:
+    return (
+        index is not None
+        and index.generation == generation
+        and time.monotonic() - index.built_at < timeout
+    )
+
+
+def _get_index() -> Optional[AppIndex]:
+    global _index
+    timeout = app_settings.APPS_INDEX_TIMEOUT
+    if not timeout:
+        return None
+    generation = _get_generation()
+    if generation is None:
+        # No (working) cache, no means to invalidate.
+        return None
+    index = _index
+    if not _is_current(index, generation, timeout):
+        with _index_lock:
+            index = _index
+            if not _is_current(index, generation, timeout):
+                index = _index = _build_index(generation)
+    return index
+
+
+def list_db_apps(request, provider=None, client_id=None) -> List[SocialApp]:
+    """
+    Returns the database backed apps (on the current site, in case a request
+    is passed). If ``SOCIALACCOUNT_APPS_INDEX_TIMEOUT`` is set, these are
+    served from a process wide index. The index is rebuilt when any app or
+    site changes, as signalled by means of a generation stored in the cache,
+    and in any case once it is older than the timeout.
+    """
+    index = _get_index()
+    if index is None:
+        if request:
+            db_apps = SocialApp.objects.on_site(request)
+        else:
+            db_apps = SocialApp.objects.all()
+        if provider:
+            db_apps = db_apps.filter(Q(provider=provider) | Q(provider_id=provider))
+        if client_id:
+            db_apps = db_apps.filter(client_id=client_id)
+        return list(db_apps)
+    if request and allauth_settings.SITES_ENABLED:
+        site = get_current_site(request)
+        row_idxs = index.site_rows.get(site.id, ())
+    else:
+        row_idxs = range(len(index.rows))
+    fields = {name: idx for idx, name in enumerate(index.field_names)}
+    db = SocialApp.objects.db
+    apps = []
+    for row_idx in row_idxs:
+        row = index.rows[row_idx]
+        if not _matches(
+            row[fields["provider"]],
+            row[fields["provider_id"]],
+            row[fields["client_id"]],
+            provider,
+            client_id,
+        ):
+            continue
+        # Hand out copies, the apps are mutable.
+        apps.append(SocialApp.from_db(db, index.field_names, copy.deepcopy(row)))
+    return apps
+
+
+def _matches(app_provider, app_provider_id, app_client_id, provider, client_id):
+    if provider and provider not in (app_provider, app_provider_id):
+        return False
+    if client_id and app_client_id != client_id:
+        return False
+    return True
+
+
+def invalidate() -> None:
+    global _index
+    _index = None
+    cache.set(GENERATION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def _on_change(sender, **kwargs) -> None:
+    invalidate()
+    # Processes that rebuilt their index before the change was committed
+    # need another nudge.
+    transaction.on_commit(invalidate)
+
+
+post_save.connect(_on_change, sender=SocialApp)
+post_delete.connect(_on_change, sender=SocialApp)
+if allauth_settings.SITES_ENABLED:
+    from django.contrib.sites.models import Site
+
+    post_save.connect(_on_change, sender=Site)
+    post_delete.connect(_on_change, sender=Site)
+    m2m_changed.connect(_on_change, sender=SocialApp.sites.through)
@@ -0,0 +1,369 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import requests
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from typing import Any, Callable, Dict, Mapping, Optional, Set, Tuple
+
+from django.core.cache import cache
+from django.utils.http import parse_http_date_safe
+
+from asgiref.sync import sync_to_async
+from urllib3.util.retry import Retry
+
+from allauth.socialaccount import app_settings
+
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_POOL_CONFIG = {
+    "POOL_CONNECTIONS": 10,
+    "POOL_MAXSIZE": 10,
+    "MAX_RETRIES": 0,
+    "BACKOFF_FACTOR": 0,
+}
+
+
+class NullCookieJar(RequestsCookieJar):
+    def set_cookie(self, cookie, *args, **kwargs):
+        pass
+
+
+class PooledSession(requests.Session):
+    """
+    A session that is shared across threads and logins, so that connections
+    to the provider are kept alive and reused. As the session is shared, it
+    must not carry any state: cookies are never stored.
+    """
+
+    def __init__(self, timeout, *, pool_connections, pool_maxsize, max_retries):
+        super().__init__()
+        self.timeout = timeout
+        self.cookies = NullCookieJar()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+_sessions: Dict[Tuple, PooledSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_pooled_session(
+    *, timeout, config: dict, provider_id: Optional[str] = None
+) -> PooledSession:
+    """
+    Returns the process wide session for the given provider (or, for all
+    providers in case none is passed). Sessions are keyed by their
+    configuration as well, so that configuration changes take effect.
+    """
+    config = {**DEFAULT_POOL_CONFIG, **config}
+    key = (provider_id, timeout, tuple(sorted(config.items())))
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                # Retry, by default, only covers idempotent methods. This is
+                # intentional: an authorization code can only be used once.
+                max_retries = Retry(
+                    total=config["MAX_RETRIES"],
+                    backoff_factor=config["BACKOFF_FACTOR"],
+                    raise_on_status=False,
+                )
+                session = _sessions[key] = PooledSession(
+                    timeout,
+                    pool_connections=config["POOL_CONNECTIONS"],
+                    pool_maxsize=config["POOL_MAXSIZE"],
+                    max_retries=max_retries,
+                )
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts_provider(get_requests_session) -> bool:
+    try:
+        parameters = inspect.signature(get_requests_session).parameters
+    except (TypeError, ValueError):
+        return False
+    return "provider" in parameters or any(
+        p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values()
+    )
+
+
+def get_requests_session(provider=None):
+    """
+    Returns the session of the adapter, passing the ``provider`` along, so that
+    its ``"REQUESTS_TIMEOUT"`` is respected. Adapters that override
+    ``get_requests_session()`` without accepting a ``provider`` are called
+    without it.
+    """
+    from allauth.socialaccount.adapter import get_adapter
+
+    adapter = get_adapter()
+    if provider is not None and _accepts_provider(type(adapter).get_requests_session):
+        return adapter.get_requests_session(provider=provider)
+    return adapter.get_requests_session()
+
+
+def get_requests_timeout(provider=None):
+    timeout = app_settings.REQUESTS_TIMEOUT
+    if provider is not None:
+        timeout = provider.get_settings().get("REQUESTS_TIMEOUT", timeout)
+    return timeout
+
+
+# Exceptions that can result from performing upstream requests, either
+# synchronously or asynchronously.
+REQUEST_EXCEPTIONS: Tuple[type, ...] = (requests.RequestException,)
+if httpx is not None:
+    REQUEST_EXCEPTIONS += (httpx.HTTPError,)
+
+
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Returns the ``httpx.AsyncClient`` for the running event loop, or ``None``
+    in case ``httpx`` is not installed. A client is bound to the event loop it
+    is created on, hence, clients are kept per event loop. The connection pool
+    is configured by means of ``SOCIALACCOUNT_REQUESTS_POOL``.
+    """
+    if httpx is None:
+        return None
+    config = {**DEFAULT_POOL_CONFIG, **(app_settings.REQUESTS_POOL or {})}
+    key = tuple(sorted(config.items()))
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(key)
+    if client is None:
+        # Note that httpx only retries failed connection attempts, which is
+        # safe for exchanging authorization codes as well.
+        client = clients[key] = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=config["POOL_MAXSIZE"],
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=config["MAX_RETRIES"]),
+            # Same as ``requests``.
+            follow_redirects=True,
+        )
+    return client
+
+
+async def arequest(method: str, url: str, *, provider=None, **kwargs):
+    """
+    Performs an upstream request without blocking the event loop. Uses
+    ``httpx``, if installed. Otherwise, the ``requests`` session is used from
+    a worker thread.
+    """
+    client = get_async_client()
+    if client is None:
+        session = get_requests_session(provider)
+        return await sync_to_async(session.request, thread_sensitive=False)(
+            method, url, **kwargs
+        )
+    auth = kwargs.get("auth")
+    if isinstance(auth, requests.auth.HTTPBasicAuth):
+        kwargs["auth"] = (auth.username, auth.password)
+    kwargs.setdefault("timeout", get_requests_timeout(provider))
+    return await client.request(method, url, **kwargs)
+
+
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def fetch_concurrently(calls: Mapping[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Performs the given independent calls, returning their results by name. The
+    calls are run concurrently on a process wide thread pool, sized by
+    ``SOCIALACCOUNT_REQUESTS_MAX_WORKERS``. If not configured, the calls are
+    run sequentially.
+    """
+    max_workers = app_settings.REQUESTS_MAX_WORKERS
+    if not max_workers or len(calls) < 2:
+        return {name: call() for name, call in calls.items()}
+    executor = _executors.get(max_workers)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(max_workers)
+            if executor is None:
+                executor = _executors[max_workers] = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="allauth"
+                )
+    futures = {name: executor.submit(call) for name, call in calls.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def get_cache_timeout(headers: Mapping[str, str]) -> float:
+    """
+    Determines how long a response may be cached based on its
+    ``Cache-Control`` and ``Expires`` headers, bounded by
+    ``SOCIALACCOUNT_HTTP_CACHE_MIN_TIMEOUT`` and
+    ``SOCIALACCOUNT_HTTP_CACHE_MAX_TIMEOUT``.
+    """
+    headers = {k.lower(): v for k, v in headers.items()}
+    timeout: Optional[float] = None
+    directives = {}
+    for directive in headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        timeout = 0
+    elif "max-age" in directives:
+        try:
+            timeout = int(directives["max-age"]) - int(headers.get("age", 0))
+        except ValueError:
+            pass
+    elif "expires" in headers:
+        expires = parse_http_date_safe(headers["expires"])
+        date = parse_http_date_safe(headers.get("date", "")) or time.time()
+        timeout = (expires - date) if expires else 0
+    if timeout is None:
+        timeout = app_settings.HTTP_CACHE_MIN_TIMEOUT
+    return min(
+        max(timeout, app_settings.HTTP_CACHE_MIN_TIMEOUT),
+        app_settings.HTTP_CACHE_MAX_TIMEOUT,
+    )
+
+
+@dataclass(frozen=True)
+class CachedDocument:
+    data: Any
+    fetched_at: float
+    expires_at: float
+
+
+class DocumentCache:
+    """
+    Caches JSON documents fetched from providers (e.g. OpenID Connect discovery
+    documents), honoring the HTTP caching headers. Documents are cached
+    in-process, backed by the Django cache so that they are shared between
+    processes. Expired documents are served while being refreshed in the
+    background, and, remain in use in case refreshing fails.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._documents: Dict[str, CachedDocument] = {}
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, url: str) -> str:
+        url_hash = hashlib.sha256(url.encode("utf8")).hexdigest()
+        return f"allauth:{self.namespace}:{url_hash}"
+
+    def get(self, url: str, *, provider=None) -> Any:
+        return self.fetch(url, provider=provider).data
+
+    def fetch(self, url: str, *, provider=None) -> CachedDocument:
+        document = self.get_document(url)
+        if document is None:
+            document = self.refresh(url, provider=provider)
+        elif document.expires_at <= time.time():
+            self._refresh_in_background(url, provider)
+        return document
+
+    def get_document(self, url: str) -> Optional[CachedDocument]:
+        document = self._documents.get(url)
+        if document is None or document.expires_at <= time.time():
+            stored = cache.get(self._cache_key(url))
+            if stored is not None:
+                stored = CachedDocument(*stored)
+                if document is None or stored.fetched_at > document.fetched_at:
+                    document = self._documents[url] = stored
+        return document
+
+    def refresh(self, url: str, *, provider=None) -> CachedDocument:
+        response = get_requests_session(provider).get(url)
+        response.raise_for_status()
+        now = time.time()
+        document = CachedDocument(
+            data=response.json(),
+            fetched_at=now,
+            expires_at=now + get_cache_timeout(response.headers),
+        )
+        self.store(url, document)
+        return document
+
+    def store(self, url: str, document: CachedDocument) -> None:
+        self._documents[url] = document
+        # Keep expired documents around for a while, for when refreshing fails.
+        timeout = (
+            document.expires_at - time.time() + app_settings.HTTP_CACHE_MAX_TIMEOUT
+        )
+        cache.set(
+            self._cache_key(url),
+            (document.data, document.fetched_at, document.expires_at),
+            timeout,
+        )
+
+    def clear(self) -> None:
+        self._documents.clear()
+
+    def _refresh_in_background(self, url: str, provider) -> None:
+        lock_key = self._cache_key(url) + ":refresh"
+        with self._lock:
+            if url in self._refreshing:
+                return
+            # Single flight across processes as well.
+            if not cache.add(lock_key, True, app_settings.REQUESTS_TIMEOUT * 2):
+                return
+            self._refreshing.add(url)
+        thread = threading.Thread(
+            target=self._background_refresh,
+            args=(url, provider, lock_key),
+            daemon=True,
+        )
+        thread.start()
+
+    def _background_refresh(self, url: str, provider, lock_key: str) -> None:
+        try:
+            self.refresh(url, provider=provider)
+        except Exception:
+            logger.warning(
+                "Error refreshing %s, serving stale copy", url, exc_info=True
+            )
+            document = self._documents.get(url)
+            if document is not None:
+                # Back off before retrying.
+                self.store(
+                    url,
+                    CachedDocument(
+                        data=document.data,
+                        fetched_at=document.fetched_at,
+                        expires_at=time.time() + app_settings.HTTP_CACHE_MIN_TIMEOUT,
+                    ),
+                )
+        finally:
+            with self._lock:
+                self._refreshing.discard(url)
+            cache.delete(lock_key)
+
+
+openid_configurations = DocumentCache("oidc")
+key_sets = DocumentCache("jwks")
@@ -1,5 +1,7 @@
+import hashlib
 import json
 import time
+from typing import Any, Dict, Tuple
 
 from django.core.cache import cache
 
@@ -7,10 +9,19 @@ import jwt
 from cryptography.hazmat.backends import default_backend
 from cryptography.x509 import load_pem_x509_certificate
 
-from allauth.socialaccount.adapter import get_adapter
+from allauth.socialaccount.internal.httpkit import CachedDocument, key_sets
 from allauth.socialaccount.providers.oauth2.client import OAuth2Error
 
 
+# When a key ID is not found in the key set, the key set is refetched, as the
+# provider may have rotated its keys. This is done at most once per interval.
+KID_MISS_REFETCH_INTERVAL = 60
+
+# Per keys URL: the time the key set was fetched, and, the keys parsed so far
+# (only those that were found).
+_parsed_keys: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
 def lookup_kid_pem_x509_certificate(keys_data, kid):
     """
     Looks up the key given keys data of the form:
@@ -47,15 +58,40 @@ def lookup_kid_jwk(keys_data, kid):
             return public_key
 
 
+def _lookup_key(keys_url: str, document: CachedDocument, kid, lookup):
+    fetched_at, keys = _parsed_keys.get(keys_url, (None, {}))
+    if fetched_at != document.fetched_at:
+        keys = {}
+        _parsed_keys[keys_url] = (document.fetched_at, keys)
+    key = keys.get(kid)
+    if key is None:
+        key = lookup(document.data, kid)
+        # Misses are not remembered: the key ID comes from the (untrusted)
+        # token, and caching it would allow for growing this dict unbounded.
+        if key is not None:
+            keys[kid] = key
+    return key
+
+
+def _may_refetch(keys_url: str, document: CachedDocument) -> bool:
+    if document.fetched_at > time.time() - KID_MISS_REFETCH_INTERVAL:
+        return False
+    url_hash = hashlib.sha256(keys_url.encode("utf8")).hexdigest()
+    return cache.add(
+        f"allauth:jwks:{url_hash}:refetch", True, KID_MISS_REFETCH_INTERVAL
+    )
+
+
 def fetch_key(credential, keys_url, lookup):
     header = jwt.get_unverified_header(credential)
     # {'alg': 'RS256', 'kid': '0ad1fec78504f447bae65bcf5afaedb65eec9e81', 'typ': 'JWT'}
     kid = header["kid"]
     alg = header["alg"]
-    response = get_adapter().get_requests_session().get(keys_url)
-    response.raise_for_status()
-    keys_data = response.json()
-    key = lookup(keys_data, kid)
+    document = key_sets.fetch(keys_url)
+    key = _lookup_key(keys_url, document, kid, lookup)
+    if not key and _may_refetch(keys_url, document):
+        document = key_sets.refresh(keys_url)
+        key = _lookup_key(keys_url, document, kid, lookup)
     if not key:
         raise OAuth2Error(f"Invalid 'kid': '{kid}'")
     return alg, key
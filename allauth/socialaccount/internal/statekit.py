@@ -1,12 +1,21 @@
 import time
 from typing import Any, Dict, Optional, Tuple
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signing import BadSignature, Signer
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import get_random_string
+
+from allauth.socialaccount import app_settings
 from allauth.socialaccount.adapter import get_adapter
 
 
 STATE_ID_LENGTH = 16
 MAX_STATES = 10
 STATES_SESSION_KEY = "socialaccount_states"
+STATES_COOKIE_NAME = "socialaccount_states"
+BROWSER_ID_LENGTH = 16
 
 
 def get_oldest_state(
@@ -41,16 +50,21 @@ def get_states(request) -> Dict[str, Tuple[Dict[str, Any], float]]:
 
 
 def stash_state(request, state: Dict[str, Any], state_id: Optional[str] = None) -> str:
-    states = get_states(request)
-    gc_states(states)
     if state_id is None:
         state_id = get_adapter().generate_state_param(state)
+    if app_settings.STATE_STORE == "cache":
+        _stash_cached_state(request, state, state_id)
+        return state_id
+    states = get_states(request)
+    gc_states(states)
     states[state_id] = (state, time.time())
     request.session[STATES_SESSION_KEY] = states
     return state_id
 
 
 def unstash_state(request, state_id: str) -> Optional[Dict[str, Any]]:
+    if app_settings.STATE_STORE == "cache":
+        return _unstash_cached_state(request, state_id)
     state: Optional[Dict[str, Any]] = None
     states = get_states(request)
     state_ts = states.get(state_id)
@@ -62,8 +76,91 @@ def unstash_state(request, state_id: str) -> Optional[Dict[str, Any]]:
 
 
 def unstash_last_state(request) -> Optional[Dict[str, Any]]:
+    if app_settings.STATE_STORE == "cache":
+        browser_id = _get_browser_id(request)
+        if not browser_id:
+            return None
+        state_id = cache.get(_last_state_cache_key(browser_id))
+        if not state_id:
+            return None
+        return _unstash_cached_state(request, state_id)
     states = get_states(request)
     state_id, state = get_oldest_state(states, rev=True)
     if state_id:
         unstash_state(request, state_id)
     return state
+
+
+def _state_cache_key(state_id: str) -> str:
+    return f"allauth:socialaccount:state:{state_id}"
+
+
+def _last_state_cache_key(browser_id: str) -> str:
+    return f"allauth:socialaccount:laststate:{browser_id}"
+
+
+def _get_signer() -> Signer:
+    return Signer(salt="allauth.socialaccount.states")
+
+
+def _get_browser_id(request) -> Optional[str]:
+    """
+    States stored in the cache are bound to the browser by means of a
+    (signed) random ID stored in a cookie.
+    """
+    browser_id = getattr(request.allauth, "states_browser_id", None)
+    if browser_id is None:
+        value = request.COOKIES.get(STATES_COOKIE_NAME)
+        if value:
+            try:
+                browser_id = _get_signer().unsign(value)
+            except BadSignature:
+                pass
+    return browser_id
+
+
+def _stash_cached_state(request, state: Dict[str, Any], state_id: str) -> None:
+    browser_id = _get_browser_id(request) or get_random_string(BROWSER_ID_LENGTH)
+    # Picked up by `process_response()`, (re)setting the cookie.
+    request.allauth.states_browser_id = browser_id
+    timeout = app_settings.STATE_TIMEOUT
+    cache.set_many(
+        {
+            _state_cache_key(state_id): (browser_id, state),
+            _last_state_cache_key(browser_id): state_id,
+        },
+        timeout,
+    )
+
+
+def _unstash_cached_state(request, state_id: str) -> Optional[Dict[str, Any]]:
+    browser_id = _get_browser_id(request)
+    if not browser_id:
+        return None
+    cache_key = _state_cache_key(state_id)
+    stored = cache.get(cache_key)
+    if stored is None or stored[0] != browser_id:
+        return None
+    cache.delete(cache_key)
+    return stored[1]
+
+
+def process_response(request, response) -> None:
+    """
+    Sets the cookie binding the states stored in the cache to the browser.
+    """
+    browser_id = request.allauth.states_browser_id
+    patch_vary_headers(response, ("Cookie",))
+    kwargs = {}
+    samesite = getattr(settings, "SESSION_COOKIE_SAMESITE", None)
+    if samesite:
+        kwargs["samesite"] = samesite
+    response.set_cookie(
+        STATES_COOKIE_NAME,
+        _get_signer().sign(browser_id),
+        max_age=app_settings.STATE_TIMEOUT,
+        domain=settings.SESSION_COOKIE_DOMAIN,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        **kwargs,
+    )
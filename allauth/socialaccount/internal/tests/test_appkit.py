@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+from django.contrib.sites.models import Site
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+
+from allauth.socialaccount.adapter import get_adapter
+from allauth.socialaccount.internal import appkit
+from allauth.socialaccount.models import SocialApp
+
+
+@pytest.fixture
+def app(db, settings):
+    settings.SOCIALACCOUNT_PROVIDERS = {}
+    settings.SOCIALACCOUNT_APPS_INDEX_TIMEOUT = 60
+    app = SocialApp.objects.create(
+        provider="github", name="GitHub", client_id="app123id", secret="dummy"
+    )
+    app.sites.add(Site.objects.get_current())
+    return app
+
+
+def _count_app_queries(queries):
+    return len([q for q in queries if "socialaccount_socialapp" in q["sql"]])
+
+
+def test_list_apps_cached(rf, enable_cache, app, django_assert_num_queries):
+    request = rf.get("/")
+    assert [a.pk for a in get_adapter().list_apps(request)] == [app.pk]
+    with django_assert_num_queries(0):
+        apps = get_adapter().list_apps(request, provider="github")
+    assert [a.pk for a in apps] == [app.pk]
+    assert get_adapter().list_apps(request, client_id="other") == []
+    # Apps are handed out as copies.
+    apps[0].settings["mutated"] = True
+    assert get_adapter().list_apps(request)[0].settings == {}
+
+
+def test_list_apps_invalidated(rf, enable_cache, app):
+    request = rf.get("/")
+    assert get_adapter().list_apps(request)[0].name == "GitHub"
+    app.name = "GitHub Enterprise"
+    app.save()
+    assert get_adapter().list_apps(request)[0].name == "GitHub Enterprise"
+    app.sites.clear()
+    assert get_adapter().list_apps(request) == []
+    assert [a.pk for a in get_adapter().list_apps(None)] == [app.pk]
+    app.delete()
+    assert get_adapter().list_apps(None) == []
+
+
+def test_login_page_steady_state(client, enable_cache, app):
+    client.get(reverse("account_login"))
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse("account_login"))
+    assert resp.status_code == 200
+    assert _count_app_queries(ctx.captured_queries) == 0
+
+
+def test_list_apps_not_cached_by_default(
+    rf, enable_cache, app, settings, django_assert_num_queries
+):
+    settings.SOCIALACCOUNT_APPS_INDEX_TIMEOUT = None
+    request = rf.get("/")
+    get_adapter().list_apps(request)
+    with django_assert_num_queries(1):
+        get_adapter().list_apps(None)
+
+
+def test_list_apps_expired(rf, enable_cache, app):
+    assert get_adapter().list_apps(None)[0].secret == "dummy"
+    # Not signalled, e.g. a change made by another process that does not share
+    # the cache.
+    SocialApp.objects.filter(pk=app.pk).update(secret="rotated")
+    assert get_adapter().list_apps(None)[0].secret == "dummy"
+    now = appkit.time.monotonic()
+    with patch.object(appkit.time, "monotonic", return_value=now + 61):
+        assert get_adapter().list_apps(None)[0].secret == "rotated"
@@ -0,0 +1,246 @@
+import requests
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from allauth.socialaccount.adapter import (
+    DefaultSocialAccountAdapter,
+    get_adapter,
+)
+from allauth.socialaccount.internal import httpkit
+from allauth.socialaccount.internal.httpkit import PooledSession
+from allauth.tests import MockedResponse, SyncThread, mocked_response
+
+
+def test_unpooled_session(settings):
+    settings.SOCIALACCOUNT_REQUESTS_POOL = None
+    adapter = get_adapter()
+    assert adapter.get_requests_session() is not adapter.get_requests_session()
+
+
+def test_pooled_session_is_shared(settings):
+    settings.SOCIALACCOUNT_REQUESTS_POOL = {"POOL_MAXSIZE": 20}
+    session = get_adapter().get_requests_session()
+    assert isinstance(session, PooledSession)
+    assert session is get_adapter().get_requests_session()
+    assert session.get_adapter("https://example.com")._pool_maxsize == 20
+
+    settings.SOCIALACCOUNT_REQUESTS_TIMEOUT = 7
+    other_session = get_adapter().get_requests_session()
+    assert other_session is not session
+    assert other_session.timeout == 7
+
+
+def test_pooled_session_per_provider_timeout(settings, db):
+    settings.SOCIALACCOUNT_REQUESTS_POOL = {}
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "github": {
+            "REQUESTS_TIMEOUT": 2,
+            "APPS": [{"client_id": "app123id", "secret": "dummy"}],
+        }
+    }
+    adapter = get_adapter()
+    provider = adapter.get_provider(None, "github")
+    session = adapter.get_requests_session(provider=provider)
+    assert session.timeout == 2
+    assert session is not adapter.get_requests_session()
+
+    with patch.object(
+        requests.Session, "request", return_value=MockedResponse(200, {})
+    ) as request:
+        session.get("https://api.github.com/user")
+    assert request.call_args.kwargs["timeout"] == 2
+
+
+def test_provider_timeout_oauth2(rf, settings, db):
+    from allauth.socialaccount.models import SocialToken
+    from allauth.socialaccount.providers.github.views import (
+        GitHubOAuth2Adapter,
+    )
+
+    settings.SOCIALACCOUNT_QUERY_EMAIL = True
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "github": {
+            "REQUESTS_TIMEOUT": 2,
+            "APPS": [{"client_id": "app123id", "secret": "dummy"}],
+        }
+    }
+    request = rf.get("/")
+    adapter = GitHubOAuth2Adapter(request)
+    app = adapter.get_provider().app
+    client = adapter.get_client(request, app)
+    with patch.object(
+        requests.Session,
+        "request",
+        side_effect=[
+            MockedResponse(200, {"access_token": "token"}),
+            MockedResponse(200, {"id": 1, "login": "john"}),
+            MockedResponse(200, "[]"),
+        ],
+    ) as session_request:
+        client.get_access_token("code")
+        adapter.complete_login(request, app, SocialToken(token="token"))
+    # Token, profile and emails.
+    assert [call.kwargs["timeout"] for call in session_request.call_args_list] == [
+        2,
+        2,
+        2,
+    ]
+
+
+class LegacySessionAdapter(DefaultSocialAccountAdapter):
+    def get_requests_session(self):
+        session = requests.Session()
+        session.headers["X-Legacy"] = "1"
+        return session
+
+
+def test_legacy_get_requests_session_override(rf, settings, db):
+    from allauth.socialaccount.models import SocialToken
+    from allauth.socialaccount.providers.github.views import (
+        GitHubOAuth2Adapter,
+    )
+
+    settings.SOCIALACCOUNT_ADAPTER = (
+        "allauth.socialaccount.internal.tests.test_httpkit.LegacySessionAdapter"
+    )
+    settings.SOCIALACCOUNT_QUERY_EMAIL = False
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "github": {"APPS": [{"client_id": "app123id", "secret": "dummy"}]}
+    }
+    request = rf.get("/")
+    adapter = GitHubOAuth2Adapter(request)
+    app = adapter.get_provider().app
+    client = adapter.get_client(request, app)
+    with patch.object(
+        requests.Session,
+        "request",
+        autospec=True,
+        side_effect=[
+            MockedResponse(200, {"access_token": "token"}),
+            MockedResponse(200, {"id": 1, "login": "john"}),
+        ],
+    ) as session_request:
+        client.get_access_token("code")
+        adapter.complete_login(request, app, SocialToken(token="token"))
+    assert [
+        call.args[0].headers["X-Legacy"] for call in session_request.call_args_list
+    ] == ["1", "1"]
+
+
+def test_pooled_session_does_not_store_cookies(settings):
+    settings.SOCIALACCOUNT_REQUESTS_POOL = {}
+    session = get_adapter().get_requests_session()
+    session.cookies.set("sessionid", "secret", domain="example.com")
+    assert len(session.cookies) == 0
+
+
+@pytest.mark.parametrize(
+    "headers,timeout",
+    [
+        ({}, 300),
+        ({"Cache-Control": "public, max-age=3600"}, 3600),
+        ({"cache-control": "max-age=3600", "Age": "600"}, 3000),
+        ({"Cache-Control": "no-cache"}, 300),
+        ({"Cache-Control": "max-age=31536000"}, 86400),
+        (
+            {
+                "Date": "Wed, 21 Oct 2015 07:28:00 GMT",
+                "Expires": "Wed, 21 Oct 2015 09:28:00 GMT",
+            },
+            7200,
+        ),
+    ],
+)
+def test_get_cache_timeout(headers, timeout):
+    assert httpkit.get_cache_timeout(headers) == timeout
+
+
+def test_document_cache(enable_cache):
+    documents = httpkit.DocumentCache("test")
+    url = "https://example.com/.well-known/openid-configuration"
+    with mocked_response(
+        MockedResponse(200, {"v": 1}, {"Cache-Control": "max-age=600"})
+    ):
+        assert documents.get(url) == {"v": 1}
+    # Served from the in-process cache.
+    assert documents.get(url) == {"v": 1}
+    # Served from the Django cache.
+    documents.clear()
+    assert documents.get(url) == {"v": 1}
+
+    # Expired: the stale copy is served, while refreshing in the background.
+    with patch.object(httpkit.time, "time", return_value=time.time() + 601):
+        with patch.object(httpkit.threading, "Thread", SyncThread):
+            with mocked_response(MockedResponse(200, {"v": 2})):
+                assert documents.get(url) == {"v": 1}
+        assert documents.get(url) == {"v": 2}
+
+
+class ErrorResponse(MockedResponse):
+    def raise_for_status(self):
+        raise requests.HTTPError(response=self)
+
+
+def test_document_cache_serves_stale_on_error(enable_cache):
+    documents = httpkit.DocumentCache("test")
+    url = "https://example.com/.well-known/openid-configuration"
+    with mocked_response(MockedResponse(200, {"v": 1})):
+        assert documents.get(url) == {"v": 1}
+    with patch.object(httpkit.time, "time", return_value=time.time() + 301):
+        with patch.object(httpkit.threading, "Thread", SyncThread):
+            with mocked_response(ErrorResponse(503, "")):
+                assert documents.get(url) == {"v": 1}
+        assert documents.get_document(url).expires_at > httpkit.time.time()
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_fetch_concurrently(settings, max_workers):
+    settings.SOCIALACCOUNT_REQUESTS_MAX_WORKERS = max_workers
+    if max_workers:
+        # Both calls need to be in flight at the same time to pass the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+    else:
+        barrier = None
+
+    def call(value):
+        if barrier:
+            barrier.wait()
+        return value
+
+    assert httpkit.fetch_concurrently({"a": lambda: call(1), "b": lambda: call(2)}) == {
+        "a": 1,
+        "b": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_arequest_httpx(settings):
+    httpx = pytest.importorskip("httpx")
+    settings.SOCIALACCOUNT_REQUESTS_TIMEOUT = 7
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request)
+        if request.url.path == "/old":
+            return httpx.Response(302, headers={"Location": "/new"})
+        return httpx.Response(200, json={"ok": True})
+
+    with patch.object(
+        httpx, "AsyncHTTPTransport", lambda **kwargs: httpx.MockTransport(handler)
+    ):
+        resp = await httpkit.arequest(
+            "POST",
+            "https://example.com/old",
+            auth=requests.auth.HTTPBasicAuth("id", "secret"),
+        )
+    assert resp.status_code == 200
+    assert resp.json() == {"ok": True}
+    assert [str(request.url) for request in requests_seen] == [
+        "https://example.com/old",
+        "https://example.com/new",
+    ]
+    assert requests_seen[0].headers["Authorization"].startswith("Basic ")
+    assert requests_seen[0].extensions["timeout"]["read"] == 7
@@ -1,10 +1,17 @@
+import time
 from datetime import timedelta
+from unittest.mock import Mock, patch
 
 from django.utils import timezone
 
-from allauth.socialaccount.internal.jwtkit import verify_and_decode
+import jwt
+import pytest
+
+from allauth.socialaccount.internal import jwtkit
+from allauth.socialaccount.internal.jwtkit import fetch_key, verify_and_decode
 from allauth.socialaccount.providers.apple.client import jwt_encode
 from allauth.socialaccount.providers.oauth2.client import OAuth2Error
+from allauth.tests import MockedResponse, mocked_response
 
 
 def test_verify_and_decode(enable_cache):
@@ -34,3 +41,55 @@ def test_verify_and_decode(enable_cache):
             assert attempt == 0
         except OAuth2Error:
             assert attempt == 1
+
+
+def test_fetch_key_caches_parsed_keys(enable_cache):
+    credential = jwt.encode({}, "secret", headers={"kid": "k1"})
+    lookup = Mock(side_effect=lambda keys_data, kid: keys_data.get(kid))
+    with mocked_response(MockedResponse(200, {"k1": "key1"})):
+        assert fetch_key(credential, "https://example.com/keys", lookup) == (
+            "HS256",
+            "key1",
+        )
+    # Steady state: no requests, no parsing.
+    with patch("requests.Session.get") as get:
+        for attempt in range(3):
+            assert fetch_key(credential, "https://example.com/keys", lookup)
+    get.assert_not_called()
+    assert lookup.call_count == 1
+
+
+def test_fetch_key_refetches_on_kid_miss(enable_cache):
+    keys_url = "https://example.com/keys"
+    old_credential = jwt.encode({}, "secret", headers={"kid": "k1"})
+    new_credential = jwt.encode({}, "secret", headers={"kid": "k2"})
+
+    def lookup(keys_data, kid):
+        return keys_data.get(kid)
+
+    with mocked_response(MockedResponse(200, {"k1": "key1"})):
+        fetch_key(old_credential, keys_url, lookup)
+    # Fetched just now, so a miss does not trigger a refetch.
+    with pytest.raises(OAuth2Error):
+        fetch_key(new_credential, keys_url, lookup)
+
+    later = time.time() + jwtkit.KID_MISS_REFETCH_INTERVAL
+    with patch.object(jwtkit.time, "time", return_value=later):
+        with mocked_response(MockedResponse(200, {"k2": "key2"})):
+            assert fetch_key(new_credential, keys_url, lookup) == ("HS256", "key2")
+        # Rotated out, but the key set was just refetched.
+        with pytest.raises(OAuth2Error):
+            fetch_key(old_credential, keys_url, lookup)
+
+
+def test_fetch_key_does_not_cache_misses(enable_cache):
+    keys_url = "https://example.com/keys"
+    lookup = Mock(side_effect=lambda keys_data, kid: keys_data.get(kid))
+    with mocked_response(MockedResponse(200, {"k1": "key1"})):
+        assert fetch_key(jwt.encode({}, "s", headers={"kid": "k1"}), keys_url, lookup)
+    for i in range(3):
+        with pytest.raises(OAuth2Error):
+            fetch_key(
+                jwt.encode({}, "s", headers={"kid": f"bogus{i}"}), keys_url, lookup
+            )
+    assert list(jwtkit._parsed_keys[keys_url][1]) == ["k1"]
@@ -1,4 +1,11 @@
 import time
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
 
 from allauth.socialaccount.internal import statekit
 
@@ -55,3 +62,42 @@ def test_stashing(rf):
     assert state == {"foo": "bar"}
     state = statekit.unstash_state(request, state_id)
     assert state is None
+
+
+def test_cached_stashing(rf, settings, enable_cache):
+    settings.SOCIALACCOUNT_STATE_STORE = "cache"
+    request = rf.get("/")
+    request.allauth = SimpleNamespace()
+    state_id = statekit.stash_state(request, {"foo": "bar"})
+    statekit.stash_state(request, {"foo2": "bar2"})
+    response = HttpResponse()
+    statekit.process_response(request, response)
+    cookie = response.cookies[statekit.STATES_COOKIE_NAME]
+
+    # Other browsers cannot get to the state.
+    other_request = rf.get("/")
+    other_request.allauth = SimpleNamespace()
+    assert statekit.unstash_state(other_request, state_id) is None
+
+    request = rf.get("/")
+    request.allauth = SimpleNamespace()
+    request.COOKIES[statekit.STATES_COOKIE_NAME] = cookie.value
+    assert statekit.unstash_last_state(request) == {"foo2": "bar2"}
+    assert statekit.unstash_state(request, state_id) == {"foo": "bar"}
+    assert statekit.unstash_state(request, state_id) is None
+
+
+def test_cached_state_login(client, db, settings, enable_cache):
+    settings.SOCIALACCOUNT_STATE_STORE = "cache"
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "github": {"APPS": [{"client_id": "app123id", "secret": "dummy"}]}
+    }
+    resp = client.post(reverse("github_login"))
+    assert resp.status_code == 302
+    # Starting a social login no longer requires a session.
+    assert not Session.objects.exists()
+    state_id = parse_qs(urlparse(resp["location"]).query)["state"][0]
+    request = RequestFactory().get("/")
+    request.allauth = SimpleNamespace()
+    request.COOKIES.update({k: v.value for k, v in client.cookies.items()})
+    assert statekit.unstash_state(request, state_id)["process"] == "login"
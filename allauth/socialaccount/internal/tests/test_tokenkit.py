@@ -0,0 +1,136 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+import pytest
+
+from allauth.socialaccount.internal import tokenkit
+from allauth.socialaccount.models import SocialAccount, SocialApp, SocialToken
+from allauth.tests import MockedResponse, mocked_response
+
+
+@pytest.fixture
+def github_tokens(db, user, settings):
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "github": {"APPS": [{"client_id": "app123id", "secret": "dummy"}]}
+    }
+    account = SocialAccount.objects.create(user=user, provider="github", uid="123")
+    now = timezone.now()
+    return [
+        SocialToken.objects.create(
+            account=account,
+            token=f"access{i}",
+            token_secret=f"refresh{i}" if i != 3 else "",
+            expires_at=now + timedelta(minutes=i * 30),
+        )
+        for i in range(4)
+    ]
+
+
+def token_endpoint(method, url, data=None, **kwargs):
+    refresh_token = data["refresh_token"]
+    assert data["grant_type"] == "refresh_token"
+    assert data["client_id"] == "app123id"
+    token = {"access_token": "new-" + refresh_token, "expires_in": 3600}
+    if refresh_token == "refresh1":
+        token["refresh_token"] = "rotated"
+    return MockedResponse(200, token)
+
+
+def test_iter_expiring_tokens(github_tokens):
+    tokens = tokenkit.iter_expiring_tokens(timedelta(minutes=45), batch_size=1)
+    # Tokens without a refresh token are skipped.
+    assert [t.pk for t in tokens] == [github_tokens[0].pk, github_tokens[1].pk]
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_refresh_expiring_tokens(github_tokens, max_workers):
+    with mocked_response(callback=token_endpoint):
+        result = tokenkit.refresh_expiring_tokens(
+            timedelta(hours=1), max_workers=max_workers, batch_size=1
+        )
+    assert (result.refreshed, result.failed, result.skipped) == (3, 0, 0)
+    tokens = {t.pk: t for t in SocialToken.objects.all()}
+    first = tokens[github_tokens[0].pk]
+    assert (first.token, first.token_secret) == ("new-refresh0", "refresh0")
+    assert first.expires_at > timezone.now() + timedelta(minutes=59)
+    second = tokens[github_tokens[1].pk]
+    assert (second.token, second.token_secret) == ("new-refresh1", "rotated")
+    assert tokens[github_tokens[3].pk].token == "access3"
+
+
+def test_refresh_failure(github_tokens):
+    with mocked_response(MockedResponse(400, {"error": "invalid_grant"})):
+        result = tokenkit.refresh_expiring_tokens(timedelta(minutes=15))
+    assert (result.refreshed, result.failed) == (0, 1)
+    assert SocialToken.objects.get(pk=github_tokens[0].pk).token == "access0"
+
+
+def test_throttle():
+    throttle = tokenkit.Throttle("10/s")
+    with patch.object(tokenkit.time, "monotonic", return_value=100.0):
+        with patch.object(tokenkit.time, "sleep") as sleep:
+            for _ in range(3):
+                throttle.wait()
+    assert [call.args[0] for call in sleep.call_args_list] == [
+        pytest.approx(0.1),
+        pytest.approx(0.2),
+    ]
+
+
+def test_throttle_shared_by_apps(db, user, settings):
+    settings.SOCIALACCOUNT_PROVIDERS = {"github": {"TOKEN_REFRESH_RATE": "10/s"}}
+    account = SocialAccount.objects.create(user=user, provider="github", uid="123")
+    for i in range(2):
+        app = SocialApp.objects.create(
+            provider="github", name=f"app{i}", client_id=f"app{i}", secret="dummy"
+        )
+        SocialToken.objects.create(
+            account=account,
+            app=app,
+            token="access",
+            token_secret="refresh",
+            expires_at=timezone.now(),
+        )
+    with patch.object(tokenkit.Throttle, "wait", autospec=True) as wait:
+        with mocked_response(
+            callback=lambda *args, **kwargs: MockedResponse(
+                200, {"access_token": "new", "expires_in": 3600}
+            )
+        ):
+            result = tokenkit.refresh_expiring_tokens(timedelta(minutes=1))
+    assert result.refreshed == 2
+    throttles = {id(call.args[0]) for call in wait.call_args_list}
+    assert len(throttles) == 1
+
+
+def test_refresh_tokens_command(github_tokens):
+    stdout = io.StringIO()
+    with mocked_response(callback=token_endpoint):
+        call_command(
+            "socialaccount_refreshtokens",
+            "--within=900",
+            "--provider=github",
+            stdout=stdout,
+        )
+    assert stdout.getvalue().startswith("Refreshed: 1, failed: 0")
+
+
+@pytest.mark.parametrize(
+    "args,settings_rate,error",
+    [
+        (["--workers=0"], None, "--workers must be at least 1"),
+        (["--batch-size=0"], None, "--batch-size must be at least 1"),
+        ([], "0/s", "Invalid token refresh rate: '0/s'"),
+    ],
+)
+def test_refresh_tokens_command_invalid(
+    github_tokens, settings, args, settings_rate, error
+):
+    if settings_rate:
+        settings.SOCIALACCOUNT_PROVIDERS["github"]["TOKEN_REFRESH_RATE"] = settings_rate
+    with pytest.raises(CommandError, match=error):
+        call_command("socialaccount_refreshtokens", *args)
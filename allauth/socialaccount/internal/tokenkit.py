@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from allauth.core.internal.ratelimit import parse_rate
+from allauth.socialaccount.adapter import get_adapter
+from allauth.socialaccount.models import SocialToken
+
+
+logger = logging.getLogger(__name__)
+
+
+class Throttle:
+    """
+    Spaces out calls, across threads, so that they stay within the given rate
+    (e.g. ``"10/s"``).
+    """
+
+    def __init__(self, rate: str):
+        try:
+            rate_ = parse_rate(rate)
+        except ValueError:
+            rate_ = None
+        if rate_ is None or rate_.amount <= 0 or rate_.duration <= 0:
+            raise ImproperlyConfigured(f"Invalid token refresh rate: {rate!r}")
+        self.interval = rate_.duration / rate_.amount
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next)
+            self._next = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+@dataclass
+class TokenRefresher:
+    """
+    Refreshes the tokens of one app. Everything that requires the database
+    is looked up front, so that refreshing itself can happen off-thread.
+    """
+
+    adapter: Any
+    app: Any
+    client: Any
+    throttle: Optional[Throttle] = None
+
+    def refresh(self, token: SocialToken) -> SocialToken:
+        if self.throttle:
+            self.throttle.wait()
+        return self.adapter.refresh_token(self.app, token, client=self.client)
+
+
+@dataclass
+class TokenRefreshResult:
+    refreshed: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+def iter_expiring_tokens(
+    within: timedelta, *, provider: Optional[str] = None, batch_size: int = 500
+) -> Iterator[SocialToken]:
+    """
+    Streams the tokens that can be refreshed and expire within the given
+    window, paginating by primary key.
+    """
+    qs = (
+        SocialToken.objects.filter(expires_at__lte=timezone.now() + within)
+        .exclude(token_secret="")
+        .select_related("account", "app")
+        .order_by("pk")
+    )
+    if provider:
+        qs = qs.filter(account__provider=provider)
+    last_pk = None
+    while True:
+        page = qs if last_pk is None else qs.filter(pk__gt=last_pk)
+        tokens = list(page[:batch_size])
+        yield from tokens
+        if len(tokens) < batch_size:
+            return
+        last_pk = tokens[-1].pk
+
+
+def get_token_refresher(token: SocialToken) -> Optional[TokenRefresher]:
+    """
+    Returns the refresher for the given token, or ``None`` in case the
+    provider does not support refreshing tokens.
+    """
+    from allauth.socialaccount.providers.oauth2.provider import OAuth2Provider
+
+    if token.app:
+        provider = token.app.get_provider(None)
+    else:
+        provider = get_adapter().get_provider(None, token.account.provider)
+    if not isinstance(provider, OAuth2Provider):
+        return None
+    adapter = provider.get_oauth2_adapter(None)
+    rate = provider.get_settings().get("TOKEN_REFRESH_RATE")
+    return TokenRefresher(
+        adapter=adapter,
+        app=provider.app,
+        client=adapter.get_client(None, provider.app),
+        throttle=Throttle(rate) if rate else None,
+    )
+
+
+def _refresh(
+    refresher: TokenRefresher, token: SocialToken
+) -> Tuple[SocialToken, Optional[Exception]]:
+    try:
+        return refresher.refresh(token), None
+    except Exception as e:
+        return token, e
+
+
+def refresh_expiring_tokens(
+    within: timedelta,
+    *,
+    provider: Optional[str] = None,
+    max_workers: int = 4,
+    batch_size: int = 500,
+) -> TokenRefreshResult:
+    """
+    Refreshes the tokens expiring within the given window, using a bounded
+    pool of threads. Refreshing is throttled per provider in case a
+    ``"TOKEN_REFRESH_RATE"`` is configured in its settings. The rate is shared
+    by all apps of the provider. The refreshed tokens are written back in
+    batches.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    result = TokenRefreshResult()
+    refreshers: Dict[Tuple[str, Optional[int]], Optional[TokenRefresher]] = {}
+    throttles: Dict[str, Throttle] = {}
+    refreshed: List[SocialToken] = []
+
+    def collect(futures) -> None:
+        for future in futures:
+            token, error = future.result()
+            if error is None:
+                refreshed.append(token)
+                result.refreshed += 1
+            else:
+                logger.warning(
+                    "Error refreshing token %s: %s", token.pk, error, exc_info=error
+                )
+                result.failed += 1
+        if len(refreshed) >= batch_size:
+            _save_tokens(refreshed)
+            refreshed.clear()
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="allauth-refresh"
+    ) as executor:
+        pending = set()
+        for token in iter_expiring_tokens(
+            within, provider=provider, batch_size=batch_size
+        ):
+            key = (token.account.provider, token.app_id)
+            if key not in refreshers:
+                try:
+                    refreshers[key] = get_token_refresher(token)
+                except ImproperlyConfigured:
+                    raise
+                except Exception:
+                    logger.warning(
+                        "Unable to refresh tokens of %s", key[0], exc_info=True
+                    )
+                    refreshers[key] = None
+                refresher = refreshers[key]
+                if refresher and refresher.throttle:
+                    refresher.throttle = throttles.setdefault(
+                        key[0], refresher.throttle
+                    )
+            refresher = refreshers[key]
+            if refresher is None:
+                result.skipped += 1
+                continue
+            pending.add(executor.submit(_refresh, refresher, token))
+            # Keep the number of tokens in flight bounded.
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(wait(pending).done)
+    _save_tokens(refreshed)
+    return result
+
+
+def _save_tokens(tokens: List[SocialToken]) -> None:
+    if tokens:
+        SocialToken.objects.bulk_update(tokens, ["token", "token_secret", "expires_at"])
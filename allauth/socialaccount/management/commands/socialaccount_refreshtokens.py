@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from allauth.socialaccount.internal import tokenkit
+
+
+class Command(BaseCommand):
+    help = "Refreshes the OAuth 2.0 access tokens that are about to expire."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--within",
+            type=int,
+            default=60 * 60,
+            help="Refresh tokens expiring within this amount of seconds.",
+        )
+        parser.add_argument("--provider", help="Only refresh tokens of this provider.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="The number of tokens refreshed concurrently.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of tokens fetched, and saved, at once.",
+        )
+
+    def handle(self, *args, **options):
+        for option in ["workers", "batch_size"]:
+            if options[option] < 1:
+                raise CommandError(
+                    "--{} must be at least 1".format(option.replace("_", "-"))
+                )
+        try:
+            result = tokenkit.refresh_expiring_tokens(
+                timedelta(seconds=options["within"]),
+                provider=options["provider"],
+                max_workers=options["workers"],
+                batch_size=options["batch_size"],
+            )
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            f"Refreshed: {result.refreshed}, failed: {result.failed},"
+            f" skipped: {result.skipped}"
+        )
@@ -5,14 +5,14 @@ from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.exceptions import ImproperlyConfigured, PermissionDenied
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.translation import gettext_lazy as _
 
 import allauth.app_settings
 from allauth import app_settings as allauth_settings
 from allauth.account.models import EmailAddress
 from allauth.account.utils import (
-    filter_users_by_email,
+    filter_users_by_emails,
     get_next_redirect_url,
     setup_user_email,
 )
@@ -329,14 +329,17 @@ class SocialLogin:
     def _lookup_by_socialaccount(self) -> bool:
         assert not self.is_existing  # nosec
         try:
-            a = SocialAccount.objects.get(
+            a = SocialAccount.objects.select_related("user").get(
                 provider=self.account.provider, uid=self.account.uid
             )
-            # Update account
-            a.extra_data = self.account.extra_data
+            # Update account, only writing what changed.
+            update_fields = ["last_login"]
+            if a.extra_data != self.account.extra_data:
+                a.extra_data = self.account.extra_data
+                update_fields.append("extra_data")
             self.account = a
             self.user = self.account.user
-            a.save()
+            a.save(update_fields=update_fields)
             signals.social_account_updated.send(
                 sender=SocialLogin, request=context.request, sociallogin=self
             )
@@ -354,30 +357,41 @@ class SocialLogin:
         if app and not app.pk:
             # If the app is not stored in the db, leave the FK empty.
             app = None
+        fields = {"token": self.token.token, "expires_at": self.token.expires_at}
+        if self.token.token_secret:
+            # only update the refresh token if we got one
+            # many oauth2 providers do not resend the refresh token
+            fields["token_secret"] = self.token.token_secret
+        self.token.account = self.account
+        self.token.app = app
+        # A single UPDATE in the common case of a repeat login, only inserting
+        # the token in case there is none yet.
+        tokens = SocialToken.objects.filter(account=self.account, app=app)
+        if tokens.update(**fields):
+            return
         try:
-            t = SocialToken.objects.get(account=self.account, app=app)
-            t.token = self.token.token
-            if self.token.token_secret:
-                # only update the refresh token if we got one
-                # many oauth2 providers do not resend the refresh token
-                t.token_secret = self.token.token_secret
-            t.expires_at = self.token.expires_at
-            t.save()
-            self.token = t
-        except SocialToken.DoesNotExist:
-            self.token.account = self.account
-            self.token.app = app
-            self.token.save()
+            with transaction.atomic():
+                self.token.save()
+        except IntegrityError:
+            # Stored concurrently.
+            tokens.update(**fields)
 
     def _lookup_by_email(self) -> None:
         logger.info("In allauth/socialaccount/models.py - lookup - _lookup_by_email")
         emails = [e.email for e in self.email_addresses if e.verified]
         logger.info("In allauth/socialaccount/models.py - lookup - _lookup_by_email - emails: %s", emails)
+        adapter = get_adapter()
+        candidate_emails = []
         for email in emails:
-            if not get_adapter().can_authenticate_by_email(self, email):
+            if not adapter.can_authenticate_by_email(self, email):
                 logger.info("Skipping email %s", email)
                 continue
-            users = filter_users_by_email(email, prefer_verified=True)
+            candidate_emails.append(email)
+        if not candidate_emails:
+            return
+        users_by_email = filter_users_by_emails(candidate_emails, prefer_verified=True)
+        for email in candidate_emails:
+            users = users_by_email[email]
             if users:
                 logger.info("Found users: %s", list(set(users)))
                 self.user = users[0]
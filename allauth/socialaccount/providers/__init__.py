@@ -1,31 +1,93 @@
+import functools
 import importlib
+import json
 from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from django.apps import apps
 from django.conf import settings
+from django.urls import URLPattern, URLResolver
+from django.urls.resolvers import RoutePattern
 
 from allauth.utils import import_attribute
 
 
+INDEX_PATH = Path(__file__).parent / "index.json"
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """
+    Describes a provider class without requiring it to be imported.
+    """
+
+    id: str
+    name: str
+    class_path: str
+    package: str
+    slug: str
+    uses_apps: bool = True
+    supports_redirect: bool = False
+    supports_token_authentication: bool = False
+    # Set to "oauth" or "oauth2" for providers that use the stock URL patterns
+    # and views of that protocol, allowing for the views to be imported lazily.
+    urls: Optional[str] = None
+
+    @classmethod
+    def from_class(cls, provider_class, urls=None):
+        return cls(
+            id=provider_class.id,
+            name=provider_class.name,
+            class_path=f"{provider_class.__module__}.{provider_class.__qualname__}",
+            package=provider_class.get_package(),
+            slug=provider_class.get_slug(),
+            uses_apps=provider_class.uses_apps,
+            supports_redirect=provider_class.supports_redirect,
+            supports_token_authentication=provider_class.supports_token_authentication,
+            urls=urls,
+        )
+
+
 class ProviderRegistry:
     def __init__(self):
         self.provider_map = OrderedDict()
+        self.spec_map = OrderedDict()
         self.loaded = False
 
     def get_class_list(self):
         self.load()
-        return list(self.provider_map.values())
+        return [self.get_class(id) for id in self.spec_map.keys()]
+
+    def get_spec_list(self):
+        """
+        Returns the specs of all providers, without importing them (in case
+        ``SOCIALACCOUNT_LAZY_PROVIDERS`` is turned on).
+        """
+        self.load()
+        return list(self.spec_map.values())
 
     def register(self, cls):
         self.provider_map[cls.id] = cls
+        spec = ProviderSpec.from_class(cls)
+        urls = _get_indexed_urls().get(spec.class_path)
+        if urls:
+            spec = replace(spec, urls=urls)
+        self.spec_map[cls.id] = spec
 
     def get_class(self, id):
-        return self.provider_map.get(id)
+        cls = self.provider_map.get(id)
+        if cls is None:
+            spec = self.spec_map.get(id)
+            if spec is not None:
+                cls = self.provider_map[id] = import_attribute(spec.class_path)
+        return cls
 
     def as_choices(self):
         self.load()
-        for provider_cls in self.provider_map.values():
-            yield (provider_cls.id, provider_cls.name)
+        for spec in self.spec_map.values():
+            yield (spec.id, spec.name)
 
     def load(self):
         # TODO: Providers register with the provider registry when
@@ -35,7 +97,21 @@ class ProviderRegistry:
         # mechanism is way to magical and depends on the import order et al, so
         # all of this really needs to be revisited.
         if not self.loaded:
+            from allauth.socialaccount import app_settings
+
+            provider_settings = getattr(settings, "SOCIALACCOUNT_PROVIDERS", {})
+            index = {}
+            if app_settings.LAZY_PROVIDERS:
+                index = _read_index()
             for app_config in apps.get_app_configs():
+                specs = index.get(app_config.name)
+                if specs is not None and not any(
+                    provider_settings.get(spec["id"], {}).get("provider_class")
+                    for spec in specs
+                ):
+                    for spec in specs:
+                        self.spec_map[spec["id"]] = ProviderSpec(**spec)
+                    continue
                 try:
                     module_name = app_config.name + ".provider"
                     provider_module = importlib.import_module(module_name)
@@ -43,7 +119,6 @@ class ProviderRegistry:
                     if e.name != module_name:
                         raise
                 else:
-                    provider_settings = getattr(settings, "SOCIALACCOUNT_PROVIDERS", {})
                     for cls in getattr(provider_module, "provider_classes", []):
                         provider_class = provider_settings.get(cls.id, {}).get(
                             "provider_class"
@@ -54,4 +129,216 @@ class ProviderRegistry:
             self.loaded = True
 
 
+@functools.lru_cache(maxsize=None)
+def _read_index() -> Dict[str, List[dict]]:
+    return json.loads(INDEX_PATH.read_text())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_indexed_urls() -> Dict[str, Optional[str]]:
+    return {
+        spec["class_path"]: spec["urls"]
+        for specs in _read_index().values()
+        for spec in specs
+    }
+
+
+def build_index():
+    """
+    Builds the index of the bundled providers, as used by the lazy registry.
+    """
+    import pkgutil
+
+    import allauth.socialaccount.providers as package
+
+    index = {}
+    for module_info in pkgutil.iter_modules(package.__path__):
+        app_name = f"{package.__name__}.{module_info.name}"
+        module_name = f"{app_name}.provider"
+        try:
+            provider_module = importlib.import_module(module_name)
+        except ImportError as e:
+            if e.name != module_name:
+                raise
+            continue
+        classes = list(getattr(provider_module, "provider_classes", []))
+        # Some providers register themselves, rather than by means of
+        # `provider_classes`.
+        classes += [
+            cls
+            for cls in registry.provider_map.values()
+            if cls.__module__ == module_name and cls not in classes
+        ]
+        if classes:
+            urls = _get_stock_urls(app_name, classes[0]) if len(classes) == 1 else None
+            index[app_name] = [
+                asdict(ProviderSpec.from_class(cls, urls=urls)) for cls in classes
+            ]
+    return index
+
+
+def _get_stock_urls(app_name, provider_class) -> Optional[str]:
+    from allauth.socialaccount.providers.oauth import (
+        urls as oauth_urls,
+        views as oauth_views,
+    )
+    from allauth.socialaccount.providers.oauth2 import (
+        urls as oauth2_urls,
+        views as oauth2_views,
+    )
+
+    def describe(urlpatterns):
+        return [
+            (
+                str(p.pattern),
+                getattr(p, "name", None),
+                getattr(p, "callback", None),
+                describe(p.url_patterns) if hasattr(p, "url_patterns") else None,
+            )
+            for p in urlpatterns
+        ]
+
+    def view_classes(urlpatterns):
+        ret = set()
+        for p in urlpatterns:
+            if hasattr(p, "url_patterns"):
+                ret |= view_classes(p.url_patterns)
+            elif getattr(p.callback, "csrf_exempt", False):
+                ret.add(None)
+            else:
+                ret.add(getattr(p.callback, "view_class", None))
+        return ret
+
+    try:
+        urlpatterns = importlib.import_module(app_name + ".urls").urlpatterns
+    except ImportError:
+        return None
+    stock = {
+        "oauth": (
+            oauth_urls,
+            {oauth_views.OAuthLoginView, oauth_views.OAuthCallbackView},
+        ),
+        "oauth2": (
+            oauth2_urls,
+            {oauth2_views.OAuth2LoginView, oauth2_views.OAuth2CallbackView},
+        ),
+    }
+    for urls, (urls_module, stock_views) in stock.items():
+        try:
+            default_urlpatterns = urls_module.default_urlpatterns(provider_class)
+        except (ImportError, AttributeError):
+            # Not using the views of this protocol.
+            continue
+        if (
+            describe(urlpatterns) == describe(default_urlpatterns)
+            and view_classes(urlpatterns) == stock_views
+        ):
+            return urls
+    return None
+
+
+def lazy_urlpatterns(spec: ProviderSpec):
+    """
+    The stock URL patterns of the provider, importing its views only once
+    they are actually used.
+    """
+    from django.urls import include, path
+
+    from allauth.account.internal.decorators import login_not_required
+
+    def lazy_view(view_path):
+        view = None
+
+        @login_not_required
+        def wrapper(request, *args, **kwargs):
+            nonlocal view
+            if view is None:
+                view = import_attribute(view_path)
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    views = f"{spec.package}.views.{spec.urls}"
+    urlpatterns = [
+        path("login/", lazy_view(views + "_login"), name=spec.id + "_login"),
+        path(
+            "login/callback/",
+            lazy_view(views + "_callback"),
+            name=spec.id + "_callback",
+        ),
+    ]
+    return [path(spec.slug + "/", include(urlpatterns))]
+
+
+class DispatchPattern(RoutePattern):
+    """
+    Matches ``<slug>/<route>`` for the given provider slugs only, looking up
+    the slug in a set rather than having a pattern per provider.
+    """
+
+    def __init__(self, route, slugs):
+        super().__init__("<str:slug>/" + route, is_endpoint=True)
+        self.slugs = frozenset(slugs)
+
+    def match(self, path):
+        match = super().match(path)
+        if match is None or match[2]["slug"] not in self.slugs:
+            return None
+        return match
+
+
+class ReverseOnlyPattern(RoutePattern):
+    """
+    Never matches, so that the URL patterns it contains are only used for
+    reversing URLs.
+    """
+
+    def match(self, path):
+        return None
+
+
+def dispatching_urlpatterns(specs: List[ProviderSpec]):
+    """
+    Routes the stock login and callback views of the given providers by means
+    of a single pattern each, so that resolving does not depend on the number
+    of providers. The per provider patterns are kept, for reversing only.
+    """
+    from allauth.account.internal.decorators import login_not_required
+
+    if not specs:
+        return []
+    view_paths = {
+        (spec.slug, action): f"{spec.package}.views.{spec.urls}_{action}"
+        for spec in specs
+        for action in ("login", "callback")
+    }
+    views = {}
+
+    @login_not_required
+    def dispatch(request, slug, action):
+        key = (slug, action)
+        view = views.get(key)
+        if view is None:
+            view = views[key] = import_attribute(view_paths[key])
+        return view(request)
+
+    slugs = [spec.slug for spec in specs]
+    return [
+        URLPattern(DispatchPattern("login/", slugs), dispatch, {"action": "login"}),
+        URLPattern(
+            DispatchPattern("login/callback/", slugs),
+            dispatch,
+            {"action": "callback"},
+        ),
+        URLResolver(
+            ReverseOnlyPattern(""),
+            [p for spec in specs for p in lazy_urlpatterns(spec)],
+        ),
+    ]
+
+
+def write_index():
+    INDEX_PATH.write_text(json.dumps(build_index(), indent=2) + "\n")
+
+
 registry = ProviderRegistry()
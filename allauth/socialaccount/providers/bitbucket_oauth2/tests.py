@@ -1,11 +1,12 @@
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 
-from allauth.socialaccount.models import SocialAccount
+from allauth.socialaccount.models import SocialAccount, SocialToken
 from allauth.socialaccount.tests import OAuth2TestsMixin
 from allauth.tests import MockedResponse
 
 from .provider import BitbucketOAuth2Provider
+from .views import BitbucketOAuth2Adapter
 
 
 @override_settings(SOCIALACCOUNT_QUERY_EMAIL=True, SOCIALACCOUNT_STORE_TOKENS=True)
@@ -105,3 +106,24 @@ class BitbucketOAuth2Tests(OAuth2TestsMixin, TestCase):
             account.get_avatar_url(),
             "https://bitbucket-assetroot.s3.amazonaws.com/c/photos/2013/Nov/25/tutorials-avatar-1563784409-6_avatar.png",  # noqa
         )
+
+    def test_email_request_failing(self):
+        self.login(
+            [
+                MockedResponse(200, self.response_data),
+                MockedResponse(403, '{"type": "error"}'),
+            ]
+        )
+        socialaccount = SocialAccount.objects.get(uid="tutorials")
+        self.assertEqual(socialaccount.user.email, "")
+
+    def test_get_email_overridden(self):
+        class CustomAdapter(BitbucketOAuth2Adapter):
+            def get_email(self, token):
+                return "john@example.com"
+
+        adapter = CustomAdapter(RequestFactory().get("/"))
+        profile_requests = adapter.get_profile_requests(
+            None, None, SocialToken(token="testac")
+        )
+        self.assertEqual(profile_requests["email"](), "john@example.com")
@@ -1,9 +1,11 @@
+import functools
+
 from allauth.socialaccount import app_settings
-from allauth.socialaccount.adapter import get_adapter
 from allauth.socialaccount.providers.oauth2.views import (
     OAuth2Adapter,
     OAuth2CallbackView,
     OAuth2LoginView,
+    ProfileRequest,
 )
 
 
@@ -14,26 +16,34 @@ class BitbucketOAuth2Adapter(OAuth2Adapter):
     profile_url = "https://api.bitbucket.org/2.0/user"
     emails_url = "https://api.bitbucket.org/2.0/user/emails"
 
-    def complete_login(self, request, app, token, **kwargs):
-        resp = (
-            get_adapter()
-            .get_requests_session()
-            .get(self.profile_url, params={"access_token": token.token})
-        )
-        extra_data = resp.json()
+    def get_profile_requests(self, request, app, token):
+        params = {"access_token": token.token}
+        profile_requests = {"profile": ProfileRequest(self.profile_url, params=params)}
         if app_settings.QUERY_EMAIL:
-            if email := self.get_email(token):
-                extra_data["email"] = email
-        return self.get_provider().sociallogin_from_response(request, extra_data)
+            if type(self).get_email is not BitbucketOAuth2Adapter.get_email:
+                profile_requests["email"] = functools.partial(self.get_email, token)
+            else:
+                profile_requests["email"] = self.get_email_request(token)
+        return profile_requests
+
+    def get_email_request(self, token) -> ProfileRequest:
+        # Not essential, failing to fetch the email address does not fail the
+        # login.
+        return ProfileRequest(
+            self.emails_url,
+            params={"access_token": token.token},
+            parse=self.parse_email,
+            required=False,
+        )
 
     def get_email(self, token) -> str:
         """Fetches email address from email API endpoint"""
-        resp = (
-            get_adapter()
-            .get_requests_session()
-            .get(self.emails_url, params={"access_token": token.token})
-        )
-        emails = resp.json().get("values", [])
+        provider = self.get_provider()
+        return self.get_email_request(token).perform(provider=provider) or ""
+
+    def parse_email(self, data) -> str:
+        """Picks the (primary) email address from the email API response"""
+        emails = data.get("values", [])
         email = ""
         try:
             email = emails[0].get("email")
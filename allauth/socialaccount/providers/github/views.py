@@ -1,11 +1,12 @@
+import functools
 from typing import Optional
 
 from allauth.socialaccount import app_settings
-from allauth.socialaccount.adapter import get_adapter
 from allauth.socialaccount.providers.oauth2.views import (
     OAuth2Adapter,
     OAuth2CallbackView,
     OAuth2LoginView,
+    ProfileRequest,
 )
 
 
@@ -25,27 +26,24 @@ class GitHubOAuth2Adapter(OAuth2Adapter):
     profile_url = "{0}/user".format(api_url)
     emails_url = "{0}/user/emails".format(api_url)
 
-    def complete_login(self, request, app, token, **kwargs):
+    def get_profile_requests(self, request, app, token):
         headers = {"Authorization": "token {}".format(token.token)}
-        resp = (
-            get_adapter().get_requests_session().get(self.profile_url, headers=headers)
-        )
-        resp.raise_for_status()
-        extra_data = resp.json()
+        profile_requests = {
+            "profile": ProfileRequest(self.profile_url, headers=headers)
+        }
         if app_settings.QUERY_EMAIL:
-            if emails := self.get_emails(headers):
-                extra_data["emails"] = emails
-        return self.get_provider().sociallogin_from_response(request, extra_data)
+            if type(self).get_emails is not GitHubOAuth2Adapter.get_emails:
+                profile_requests["emails"] = functools.partial(self.get_emails, headers)
+            else:
+                profile_requests["emails"] = self.get_emails_request(headers)
+        return profile_requests
 
-    def get_emails(self, headers) -> Optional[list]:
-        resp = (
-            get_adapter().get_requests_session().get(self.emails_url, headers=headers)
-        )
+    def get_emails_request(self, headers) -> ProfileRequest:
         # https://api.github.com/user/emails -- 404 is documented to occur.
-        if resp.status_code == 404:
-            return None
-        resp.raise_for_status()
-        return resp.json()
+        return ProfileRequest(self.emails_url, headers=headers, empty_statuses=(404,))
+
+    def get_emails(self, headers) -> Optional[list]:
+        return self.get_emails_request(headers).perform(provider=self.get_provider())
 
 
 oauth2_login = OAuth2LoginView.adapter_view(GitHubOAuth2Adapter)
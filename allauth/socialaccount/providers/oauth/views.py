@@ -66,6 +66,7 @@ class OAuthView:
             self.adapter = adapter(request)
             return self.dispatch(request, *args, **kwargs)
 
+        view.view_class = cls
         return view
 
 
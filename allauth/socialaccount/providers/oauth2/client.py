@@ -3,7 +3,9 @@ from urllib.parse import parse_qsl
 
 from django.utils.http import urlencode
 
-from allauth.socialaccount.adapter import get_adapter
+from asgiref.sync import sync_to_async
+
+from allauth.socialaccount.internal import httpkit
 
 
 class OAuth2Error(Exception):
@@ -12,6 +14,9 @@ class OAuth2Error(Exception):
 
 class OAuth2Client:
     client_id_parameter = "client_id"
+    # The provider on whose behalf requests are performed, if known, so that
+    # its ``"REQUESTS_TIMEOUT"`` setting is respected.
+    provider = None
 
     def __init__(
         self,
@@ -50,21 +55,34 @@ class OAuth2Client:
         return "%s?%s" % (authorization_url, urlencode(params))
 
     def get_access_token(self, code, pkce_code_verifier=None, extra_data=None):
+        method, url, kwargs = self._get_access_token_request(
+            code, pkce_code_verifier=pkce_code_verifier, extra_data=extra_data
+        )
+        # TODO: Proper exception handling
+        resp = httpkit.get_requests_session(self.provider).request(
+            method, url, **kwargs
+        )
+        return self._parse_access_token_response(resp)
+
+    async def aget_access_token(self, code, pkce_code_verifier=None, extra_data=None):
+        if type(self).get_access_token is not OAuth2Client.get_access_token:
+            # The client has been customized, stick to that (in a thread).
+            return await sync_to_async(self.get_access_token)(
+                code, pkce_code_verifier=pkce_code_verifier, extra_data=extra_data
+            )
+        method, url, kwargs = self._get_access_token_request(
+            code, pkce_code_verifier=pkce_code_verifier, extra_data=extra_data
+        )
+        resp = await httpkit.arequest(method, url, provider=self.provider, **kwargs)
+        return self._parse_access_token_response(resp)
+
+    def _get_access_token_request(self, code, pkce_code_verifier, extra_data):
         data = {
             "redirect_uri": self.callback_url,
             "grant_type": "authorization_code",
             "code": code,
         }
-        if self.basic_auth:
-            auth = requests.auth.HTTPBasicAuth(self.consumer_key, self.consumer_secret)
-        else:
-            auth = None
-            data.update(
-                {
-                    self.client_id_parameter: self.consumer_key,
-                    "client_secret": self.consumer_secret,
-                }
-            )
+        auth = self._authenticate(data)
         if extra_data:
             data.update(extra_data)
         params = None
@@ -75,20 +93,49 @@ class OAuth2Client:
             data = None
         if data and pkce_code_verifier:
             data["code_verifier"] = pkce_code_verifier
-        # TODO: Proper exception handling
-        resp = (
-            get_adapter()
-            .get_requests_session()
-            .request(
-                self.access_token_method,
-                url,
-                params=params,
-                data=data,
-                headers=self.headers,
-                auth=auth,
-            )
+        return (
+            self.access_token_method,
+            url,
+            {
+                "params": params,
+                "data": data,
+                "headers": self.headers,
+                "auth": auth,
+            },
+        )
+
+    def refresh_access_token(self, refresh_token, url=None):
+        """
+        Obtains a new access token by means of the refresh token grant. The
+        token endpoint can be overridden by passing the ``url``.
+        """
+        data = {"grant_type": "refresh_token", "refresh_token": refresh_token}
+        auth = self._authenticate(data)
+        resp = httpkit.get_requests_session(self.provider).request(
+            "POST",
+            url or self.access_token_url,
+            data=data,
+            headers=self.headers,
+            auth=auth,
+        )
+        return self._parse_access_token_response(resp)
+
+    def _authenticate(self, data):
+        """
+        Authenticates the client, either by returning the basic auth to use, or,
+        by adding the client credentials to the (token request) data.
+        """
+        if self.basic_auth:
+            return requests.auth.HTTPBasicAuth(self.consumer_key, self.consumer_secret)
+        data.update(
+            {
+                self.client_id_parameter: self.consumer_key,
+                "client_secret": self.consumer_secret,
+            }
         )
+        return None
 
+    def _parse_access_token_response(self, resp):
         access_token = None
         if resp.status_code in [200, 201]:
             # Weibo sends json via 'text/plain;charset=UTF-8'
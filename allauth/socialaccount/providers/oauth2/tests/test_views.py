@@ -1,9 +1,16 @@
-from django.urls import reverse
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from django.urls import resolve, reverse
 
 import pytest
+from asgiref.sync import iscoroutinefunction
 from pytest_django.asserts import assertTemplateUsed
 
 from allauth.socialaccount.adapter import get_adapter
+from allauth.socialaccount.internal import httpkit
+from allauth.socialaccount.models import SocialAccount
+from allauth.tests import MockedResponse, mocked_response
 
 
 @pytest.mark.parametrize(
@@ -66,3 +73,24 @@ def test_config_from_provider_config(
     assert provider.get_scope() == ["some-scope"]
     assert provider.get_auth_params() == {"auth": "param"}
     assert ("code_verifier" in provider.get_pkce_params().keys()) == pkce_enabled
+
+
+def test_async_callback(client, settings, settings_impacting_urls, db):
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "github": {"APPS": [{"client_id": "client_id", "secret": "secret"}]}
+    }
+    settings.SOCIALACCOUNT_QUERY_EMAIL = False
+    with settings_impacting_urls(SOCIALACCOUNT_ASYNC_VIEWS=True):
+        callback_url = reverse("github_callback")
+        assert iscoroutinefunction(resolve(callback_url).func)
+        resp = client.post(reverse("github_login"))
+        state = parse_qs(urlparse(resp["location"]).query)["state"][0]
+        # Stick to requests, even if httpx happens to be installed.
+        with patch.object(httpkit, "httpx", None):
+            with mocked_response(
+                MockedResponse(200, {"access_token": "testac"}),
+                MockedResponse(200, {"id": 1, "login": "john", "email": None}),
+            ):
+                resp = client.get(callback_url, {"code": "test", "state": state})
+    assert resp.status_code == 302
+    assert SocialAccount.objects.get(provider="github").uid == "1"
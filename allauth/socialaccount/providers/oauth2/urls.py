@@ -1,11 +1,14 @@
 from django.urls import include, path
 
+from allauth.socialaccount import app_settings
 from allauth.utils import import_attribute
 
 
 def default_urlpatterns(provider):
     login_view = import_attribute(provider.get_package() + ".views.oauth2_login")
     callback_view = import_attribute(provider.get_package() + ".views.oauth2_callback")
+    if app_settings.ASYNC_VIEWS:
+        callback_view = _get_async_callback_view(callback_view)
 
     urlpatterns = [
         path("login/", login_view, name=provider.id + "_login"),
@@ -13,3 +16,15 @@ def default_urlpatterns(provider):
     ]
 
     return [path(provider.get_slug() + "/", include(urlpatterns))]
+
+
+def _get_async_callback_view(callback_view):
+    from allauth.socialaccount.providers.oauth2.views import (
+        AsyncOAuth2CallbackView,
+        OAuth2CallbackView,
+    )
+
+    # Only the stock callback view can be swapped, custom views are left as is.
+    if getattr(callback_view, "view_class", None) is OAuth2CallbackView:
+        callback_view = AsyncOAuth2CallbackView.adapter_view(callback_view.adapter)
+    return callback_view
@@ -1,6 +1,8 @@
+import asyncio
+import functools
+from dataclasses import dataclass
 from datetime import timedelta
-from requests import RequestException
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 from django.conf import settings
 from django.core.exceptions import PermissionDenied
@@ -8,6 +10,8 @@ from django.shortcuts import render
 from django.urls import reverse
 from django.utils import timezone
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
 from allauth.account import app_settings as account_settings
 from allauth.account.internal.decorators import login_not_required
 from allauth.core.exceptions import ImmediateHttpResponse
@@ -17,7 +21,7 @@ from allauth.socialaccount.helpers import (
     complete_social_login,
     render_authentication_error,
 )
-from allauth.socialaccount.internal import statekit
+from allauth.socialaccount.internal import httpkit, statekit
 from allauth.socialaccount.models import SocialToken
 from allauth.socialaccount.providers.base import ProviderException
 from allauth.socialaccount.providers.base.constants import AuthError
@@ -29,6 +33,50 @@ from allauth.socialaccount.providers.oauth2.client import (
 from allauth.utils import build_absolute_uri, get_request_param
 
 
+@dataclass(frozen=True)
+class ProfileRequest:
+    """
+    An upstream request that is part of fetching the profile, see
+    ``OAuth2Adapter.get_profile_requests()``.
+    """
+
+    url: str
+    headers: Optional[Dict[str, str]] = None
+    params: Optional[Dict[str, str]] = None
+    # Response status codes that are to be treated as "no data".
+    empty_statuses: Tuple[int, ...] = ()
+    # If not required, any error status is treated as "no data".
+    required: bool = True
+    # Post-processes the JSON response.
+    parse: Optional[Callable[[Any], Any]] = None
+
+    def perform(self, provider=None):
+        session = httpkit.get_requests_session(provider)
+        resp = session.get(self.url, headers=self.headers, params=self.params)
+        return self.handle_response(resp)
+
+    async def aperform(self, provider=None):
+        resp = await httpkit.arequest(
+            "GET",
+            self.url,
+            provider=provider,
+            headers=self.headers,
+            params=self.params,
+        )
+        return self.handle_response(resp)
+
+    def handle_response(self, resp):
+        if resp.status_code in self.empty_statuses:
+            return None
+        if not self.required and resp.status_code >= 400:
+            return None
+        resp.raise_for_status()
+        data = resp.json()
+        if self.parse:
+            data = self.parse(data)
+        return data
+
+
 class OAuth2Adapter:
     expires_in_key = "expires_in"
     client_class = OAuth2Client
@@ -39,6 +87,8 @@ class OAuth2Adapter:
     scope_delimiter = " "
     basic_auth = False
     headers: Optional[Dict[str, str]] = None
+    # Defaults to the ``access_token_url``.
+    refresh_token_url: Optional[str] = None
 
     def __init__(self, request):
         self.request = request
@@ -53,8 +103,68 @@ class OAuth2Adapter:
         """
         Returns a SocialLogin instance
         """
+        provider = self.get_provider()
+        profile_requests = self.get_profile_requests(request, app, token)
+        results = httpkit.fetch_concurrently(
+            {
+                name: (
+                    functools.partial(req.perform, provider=provider)
+                    if isinstance(req, ProfileRequest)
+                    else req
+                )
+                for name, req in profile_requests.items()
+            }
+        )
+        return self._sociallogin_from_profile(request, provider, results)
+
+    async def acomplete_login(self, request, app, token: SocialToken, **kwargs):
+        """
+        Async variant of ``complete_login()``, used by the async callback view.
+        Profile requests are performed concurrently, without blocking. In case
+        ``complete_login()`` is overridden, it is run in a thread instead.
+        """
+        if type(self).complete_login is not OAuth2Adapter.complete_login:
+            return await sync_to_async(self.complete_login)(
+                request, app, token, **kwargs
+            )
+        provider = await sync_to_async(self.get_provider)()
+        profile_requests = self.get_profile_requests(request, app, token)
+        values = await asyncio.gather(
+            *[
+                (
+                    req.aperform(provider=provider)
+                    if isinstance(req, ProfileRequest)
+                    else sync_to_async(req)()
+                )
+                for req in profile_requests.values()
+            ]
+        )
+        results = dict(zip(profile_requests.keys(), values))
+        return await sync_to_async(self._sociallogin_from_profile)(
+            request, provider, results
+        )
+
+    def get_profile_requests(
+        self, request, app, token: SocialToken
+    ) -> Dict[str, Union[ProfileRequest, Callable[[], Any]]]:
+        """
+        Declares the requests needed to fetch the profile, as used by the
+        default ``complete_login()``. The ``"profile"`` request results in the
+        ``extra_data``. Any other requests (e.g. for fetching the email
+        addresses) must be independent of it: all requests are performed
+        concurrently. Their results, if any, are added to the ``extra_data``
+        by name. Instead of a ``ProfileRequest``, a callable can be passed,
+        which is run in a thread by the async callback view.
+        """
         raise NotImplementedError
 
+    def _sociallogin_from_profile(self, request, provider, results: Dict[str, Any]):
+        extra_data = results.pop("profile")
+        for name, value in results.items():
+            if value:
+                extra_data[name] = value
+        return provider.sociallogin_from_response(request, extra_data)
+
     def get_callback_url(self, request, app):
         callback_url = reverse(self.provider_id + "_callback")
         protocol = self.redirect_uri_protocol
@@ -68,12 +178,48 @@ class OAuth2Adapter:
             token.expires_at = timezone.now() + timedelta(seconds=int(expires_in))
         return token
 
+    def refresh_token(self, app, token: SocialToken, client=None) -> SocialToken:
+        """
+        Refreshes the access token by means of the refresh token (stored as
+        ``token.token_secret``). The token is updated in place, but not saved.
+        Providers deviating from the standard refresh token grant can override
+        this.
+        """
+        if not token.token_secret:
+            raise OAuth2Error("No refresh token available")
+        if client is None:
+            client = self.get_client(self.request, app)
+        data = client.refresh_access_token(
+            token.token_secret, url=self.refresh_token_url or self.access_token_url
+        )
+        refreshed = self.parse_token(data)
+        token.token = refreshed.token
+        if refreshed.token_secret:
+            # Not all providers rotate the refresh token.
+            token.token_secret = refreshed.token_secret
+        token.expires_at = refreshed.expires_at
+        return token
+
     def get_access_token_data(self, request, app, client, pkce_code_verifier=None):
         code = get_request_param(self.request, "code")
         data = client.get_access_token(code, pkce_code_verifier=pkce_code_verifier)
         self.did_fetch_access_token = True
         return data
 
+    async def aget_access_token_data(
+        self, request, app, client, pkce_code_verifier=None
+    ):
+        if type(self).get_access_token_data is not OAuth2Adapter.get_access_token_data:
+            return await sync_to_async(self.get_access_token_data)(
+                request, app, client, pkce_code_verifier=pkce_code_verifier
+            )
+        code = get_request_param(self.request, "code")
+        data = await client.aget_access_token(
+            code, pkce_code_verifier=pkce_code_verifier
+        )
+        self.did_fetch_access_token = True
+        return data
+
     def get_client(self, request, app):
         callback_url = self.get_callback_url(request, app)
         client = self.client_class(
@@ -87,25 +233,44 @@ class OAuth2Adapter:
             headers=self.headers,
             basic_auth=self.basic_auth,
         )
+        client.provider = app.get_provider(request)
         return client
 
 
 class OAuth2View:
     @classmethod
     def adapter_view(cls, adapter):
-        @login_not_required
-        def view(request, *args, **kwargs):
+        def setup(request):
             self = cls()
             self.request = request
             if not isinstance(adapter, OAuth2Adapter):
                 self.adapter = adapter(request)
             else:
                 self.adapter = adapter
-            try:
-                return self.dispatch(request, *args, **kwargs)
-            except ImmediateHttpResponse as e:
-                return e.response
+            return self
+
+        if iscoroutinefunction(cls.dispatch):
+
+            @login_not_required
+            async def view(request, *args, **kwargs):
+                try:
+                    self = await sync_to_async(setup)(request)
+                    return await self.dispatch(request, *args, **kwargs)
+                except ImmediateHttpResponse as e:
+                    return e.response
+
+        else:
 
+            @login_not_required
+            def view(request, *args, **kwargs):
+                try:
+                    self = setup(request)
+                    return self.dispatch(request, *args, **kwargs)
+                except ImmediateHttpResponse as e:
+                    return e.response
+
+        view.adapter = adapter
+        view.view_class = cls
         return view
 
 
@@ -120,22 +285,9 @@ class OAuth2CallbackView(OAuth2View):
         state, resp = self._get_state(request, provider)
         if resp:
             return resp
-        if "error" in request.GET or "code" not in request.GET:
-            # Distinguish cancel from error
-            auth_error = request.GET.get("error", None)
-            if auth_error == self.adapter.login_cancelled_error:
-                error = AuthError.CANCELLED
-            else:
-                error = AuthError.UNKNOWN
-            return render_authentication_error(
-                request,
-                provider,
-                error=error,
-                extra_context={
-                    "state": state,
-                    "callback_view": self,
-                },
-            )
+        resp = self._get_error_response(request, provider, state)
+        if resp:
+            return resp
         app = provider.app
         client = self.adapter.get_client(self.request, app)
 
@@ -155,13 +307,32 @@ class OAuth2CallbackView(OAuth2View):
         except (
             PermissionDenied,
             OAuth2Error,
-            RequestException,
             ProviderException,
+            *httpkit.REQUEST_EXCEPTIONS,
         ) as e:
             return render_authentication_error(
                 request, provider, exception=e, extra_context={"state": state}
             )
 
+    def _get_error_response(self, request, provider, state):
+        if "error" in request.GET or "code" not in request.GET:
+            # Distinguish cancel from error
+            auth_error = request.GET.get("error", None)
+            if auth_error == self.adapter.login_cancelled_error:
+                error = AuthError.CANCELLED
+            else:
+                error = AuthError.UNKNOWN
+            return render_authentication_error(
+                request,
+                provider,
+                error=error,
+                extra_context={
+                    "state": state,
+                    "callback_view": self,
+                },
+            )
+        return None
+
     def _redirect_strict_samesite(self, request, provider):
         if (
             "_redir" in request.GET
@@ -203,3 +374,46 @@ class OAuth2CallbackView(OAuth2View):
                 },
             )
         return state, None
+
+
+class AsyncOAuth2CallbackView(OAuth2CallbackView):
+    """
+    Async variant of the callback view, for ASGI deployments. Exchanging the
+    authorization code and fetching the profile do not tie up a thread, while
+    the database work is run in threads as usual.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        provider = await sync_to_async(self.adapter.get_provider)()
+        state, resp = await sync_to_async(self._get_state)(request, provider)
+        if resp:
+            return resp
+        resp = await sync_to_async(self._get_error_response)(request, provider, state)
+        if resp:
+            return resp
+        app = provider.app
+        client = await sync_to_async(self.adapter.get_client)(self.request, app)
+
+        try:
+            access_token = await self.adapter.aget_access_token_data(
+                request, app, client, pkce_code_verifier=state.get("pkce_code_verifier")
+            )
+            # Some providers verify ID tokens here, involving I/O.
+            token = await sync_to_async(self.adapter.parse_token)(access_token)
+            if app.pk:
+                token.app = app
+            login = await self.adapter.acomplete_login(
+                request, app, token, response=access_token
+            )
+            login.token = token
+            login.state = state
+            return await sync_to_async(complete_social_login)(request, login)
+        except (
+            PermissionDenied,
+            OAuth2Error,
+            ProviderException,
+            *httpkit.REQUEST_EXCEPTIONS,
+        ) as e:
+            return await sync_to_async(render_authentication_error)(
+                request, provider, exception=e, extra_context={"state": state}
+            )
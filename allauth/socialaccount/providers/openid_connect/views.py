@@ -2,7 +2,8 @@ from django.http import Http404
 from django.urls import reverse
 
 from allauth.account.internal.decorators import login_not_required
-from allauth.socialaccount.adapter import get_adapter
+from allauth.socialaccount.internal import httpkit
+from allauth.socialaccount.internal.httpkit import openid_configurations
 from allauth.socialaccount.models import SocialApp, SocialToken
 from allauth.socialaccount.providers.oauth2.views import (
     OAuth2Adapter,
@@ -20,10 +21,10 @@ class OpenIDConnectOAuth2Adapter(OAuth2Adapter):
     @property
     def openid_config(self):
         if not hasattr(self, "_openid_config"):
-            server_url = self.get_provider().server_url
-            resp = get_adapter().get_requests_session().get(server_url)
-            resp.raise_for_status()
-            self._openid_config = resp.json()
+            provider = self.get_provider()
+            self._openid_config = openid_configurations.get(
+                provider.server_url, provider=provider
+            )
         return self._openid_config
 
     @property
@@ -48,10 +49,8 @@ class OpenIDConnectOAuth2Adapter(OAuth2Adapter):
         return self.openid_config["userinfo_endpoint"]
 
     def complete_login(self, request, app, token: SocialToken, **kwargs):
-        response = (
-            get_adapter()
-            .get_requests_session()
-            .get(self.profile_url, headers={"Authorization": "Bearer " + token.token})
+        response = httpkit.get_requests_session(self.get_provider()).get(
+            self.profile_url, headers={"Authorization": "Bearer " + token.token}
         )
         response.raise_for_status()
         extra_data = response.json()
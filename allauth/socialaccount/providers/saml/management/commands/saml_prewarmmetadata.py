@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from allauth.socialaccount.adapter import get_adapter
+from allauth.socialaccount.providers.saml.provider import SAMLProvider
+from allauth.socialaccount.providers.saml.utils import refresh_metadata
+
+
+class Command(BaseCommand):
+    help = "Fetches and caches the IdP metadata of all SAML apps."
+
+    def handle(self, *args, **options):
+        failed = 0
+        for app in get_adapter().list_apps(None, provider=SAMLProvider.id):
+            idp_config = (app.settings or {}).get("idp") or {}
+            if not idp_config.get("metadata_url"):
+                continue
+            try:
+                refresh_metadata(idp_config)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{app.client_id}: {e}")
+            else:
+                self.stdout.write(f"{app.client_id}: {idp_config['metadata_url']}")
+        if failed:
+            raise CommandError(f"Failed to fetch the metadata of {failed} app(s)")
@@ -1,7 +1,12 @@
+import copy
+import io
+import time
 from unittest.mock import Mock, patch
 from urllib.parse import parse_qs, urlparse
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
 from django.urls import reverse, reverse_lazy
 from django.utils.http import urlencode
 
@@ -13,7 +18,17 @@ from allauth.socialaccount.adapter import get_adapter
 from allauth.socialaccount.internal import statekit
 from allauth.socialaccount.models import SocialAccount
 from allauth.socialaccount.providers.base.constants import AuthProcess
-from allauth.socialaccount.providers.saml.utils import build_saml_config
+from allauth.socialaccount.providers.saml import utils
+from allauth.socialaccount.providers.saml.utils import (
+    build_saml_config,
+    get_saml_settings,
+)
+from allauth.tests import SyncThread
+
+
+PARSE_REMOTE = (
+    "onelogin.saml2.idp_metadata_parser.OneLogin_Saml2_IdPMetadataParser.parse_remote"
+)
 
 
 @pytest.mark.parametrize(
@@ -269,3 +284,134 @@ def test_extract_attributes(db, data, result, uid, settings):
     )
     assert provider._extract(onelogin_data) == result
     assert provider.extract_uid(onelogin_data) == uid
+
+
+def test_get_saml_settings_cached(rf):
+    provider_config = {
+        "idp": {
+            "entity_id": "dummy",
+            "sso_url": "https://idp.org/sso/",
+            "x509cert": "cert",
+        }
+    }
+    request = rf.get("/", HTTP_HOST="example.com")
+    saml_settings = get_saml_settings(request, provider_config, "org")
+    assert (
+        get_saml_settings(rf.get("/", HTTP_HOST="example.com"), provider_config, "org")
+        is saml_settings
+    )
+    assert get_saml_settings(request, provider_config, "other") is not saml_settings
+    assert (
+        get_saml_settings(
+            rf.get("/", secure=True, HTTP_HOST="example.com"), provider_config, "org"
+        )
+        is not saml_settings
+    )
+    # Database backed apps hand out an equal copy of the configuration.
+    assert (
+        get_saml_settings(request, copy.deepcopy(provider_config), "org")
+        is saml_settings
+    )
+    # Changing the configuration invalidates the settings.
+    provider_config = copy.deepcopy(provider_config)
+    provider_config["idp"]["x509cert"] = "new-cert"
+    new_settings = get_saml_settings(request, provider_config, "org")
+    assert new_settings is not saml_settings
+    assert new_settings.get_idp_cert().find("new-cert") > 0
+
+
+def test_get_saml_settings_cleared_on_setting_changed(rf, settings):
+    provider_config = {
+        "idp": {
+            "entity_id": "dummy",
+            "sso_url": "https://idp.org/sso/",
+            "x509cert": "cert",
+        }
+    }
+    request = rf.get("/", HTTP_HOST="example.com")
+    saml_settings = get_saml_settings(request, provider_config, "org")
+    settings.SOCIALACCOUNT_PROVIDERS = {}
+    assert get_saml_settings(request, provider_config, "org") is not saml_settings
+
+
+IDP_CONFIG = {
+    "entity_id": "dummy",
+    "metadata_url": "https://idp.org/metadata/",
+    "metadata_cache_timeout": 600,
+    "metadata_refresh_ahead": 60,
+}
+
+
+def test_metadata_refreshed_in_background(enable_cache):
+    with patch(PARSE_REMOTE, return_value={"idp": {"v": 1}}) as parse_mock:
+        assert utils.fetch_metadata_url_config(IDP_CONFIG) == {"idp": {"v": 1}}
+        assert utils.fetch_metadata_url_config(IDP_CONFIG) == {"idp": {"v": 1}}
+    assert parse_mock.call_count == 1
+
+    # Ahead of expiry, the cached metadata is served while being refreshed.
+    with patch.object(utils.time, "time", return_value=time.time() + 541):
+        with patch.object(utils.threading, "Thread", SyncThread):
+            with patch(PARSE_REMOTE, return_value={"idp": {"v": 2}}):
+                assert utils.fetch_metadata_url_config(IDP_CONFIG) == {"idp": {"v": 1}}
+    assert utils.fetch_metadata_url_config(IDP_CONFIG) == {"idp": {"v": 2}}
+
+
+def test_metadata_served_stale_on_error(enable_cache):
+    with patch(PARSE_REMOTE, return_value={"idp": {"v": 1}}):
+        utils.fetch_metadata_url_config(IDP_CONFIG)
+    with patch.object(utils.time, "time", return_value=time.time() + 601):
+        with patch.object(utils.threading, "Thread", SyncThread):
+            with patch(PARSE_REMOTE, side_effect=OSError) as parse_mock:
+                for _ in range(2):
+                    assert utils.fetch_metadata_url_config(IDP_CONFIG) == {
+                        "idp": {"v": 1}
+                    }
+    # Backing off, instead of retrying on each request.
+    assert parse_mock.call_count == 1
+
+
+def test_metadata_fetched_once(enable_cache):
+    cache_key = utils.get_metadata_cache_key(IDP_CONFIG)
+    # Another process is fetching the metadata.
+    cache.add(cache_key + ".lock", True)
+
+    def sleep(seconds):
+        cache.set(cache_key, ({"idp": {"v": 1}}, time.time() + 600))
+
+    with patch.object(utils.time, "sleep", side_effect=sleep):
+        with patch(PARSE_REMOTE) as parse_mock:
+            assert utils.fetch_metadata_url_config(IDP_CONFIG) == {"idp": {"v": 1}}
+    parse_mock.assert_not_called()
+
+
+def test_get_saml_settings_rebuilt_on_metadata_refresh(rf, enable_cache):
+    def store_metadata(cert):
+        idp = {
+            "entityId": "dummy",
+            "x509cert": cert,
+            "singleSignOnService": {"url": "https://idp.org/sso/"},
+        }
+        cache.set(
+            utils.get_metadata_cache_key(IDP_CONFIG),
+            ({"idp": idp}, time.time() + 600),
+        )
+
+    provider_config = {"idp": IDP_CONFIG}
+    request = rf.get("/", HTTP_HOST="example.com")
+    store_metadata("cert")
+    saml_settings = get_saml_settings(request, provider_config, "org")
+    assert get_saml_settings(request, provider_config, "org") is saml_settings
+    store_metadata("new-cert")
+    new_settings = get_saml_settings(request, provider_config, "org")
+    assert new_settings is not saml_settings
+    assert new_settings.get_idp_cert().find("new-cert") > 0
+
+
+def test_prewarm_metadata_command(enable_cache, settings, db):
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "saml": {"APPS": [{"client_id": "org", "settings": {"idp": IDP_CONFIG}}]}
+    }
+    with patch(PARSE_REMOTE, return_value={"idp": {"v": 1}}) as parse_mock:
+        call_command("saml_prewarmmetadata", stdout=io.StringIO())
+        assert utils.fetch_metadata_url_config(IDP_CONFIG) == {"idp": {"v": 1}}
+    assert parse_mock.call_count == 1
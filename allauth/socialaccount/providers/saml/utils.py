@@ -1,12 +1,18 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.http import Http404
 from django.urls import reverse
 from django.utils.http import urlencode
 
-from onelogin.saml2.auth import OneLogin_Saml2_Auth
+from onelogin.saml2.auth import OneLogin_Saml2_Auth, OneLogin_Saml2_Settings
 from onelogin.saml2.constants import OneLogin_Saml2_Constants
 from onelogin.saml2.idp_metadata_parser import OneLogin_Saml2_IdPMetadataParser
 
@@ -15,6 +21,9 @@ from allauth.socialaccount.models import SocialApp
 from allauth.socialaccount.providers.saml.provider import SAMLProvider
 
 
+logger = logging.getLogger(__name__)
+
+
 def get_app_or_404(request, organization_slug):
     adapter = get_adapter()
     try:
@@ -73,25 +82,120 @@ def build_sp_config(request, provider_config, org):
     return sp_config
 
 
-def fetch_metadata_url_config(idp_config):
+# How long to wait for another process fetching the metadata.
+METADATA_POLL_INTERVAL = 0.1
+# How long to wait before retrying to refresh the metadata, after failing.
+METADATA_RETRY_INTERVAL = 60
+
+_refreshing: Set[str] = set()
+_refreshing_lock = threading.Lock()
+
+
+def get_metadata_cache_key(idp_config) -> str:
     metadata_url = idp_config["metadata_url"]
     entity_id = idp_config["entity_id"]
-    cache_key = f"saml.metadata.{metadata_url}.{entity_id}"
-    saml_config = cache.get(cache_key)
-    if saml_config is None:
-        saml_config = OneLogin_Saml2_IdPMetadataParser.parse_remote(
-            metadata_url,
-            entity_id=entity_id,
-            timeout=idp_config.get("metadata_request_timeout", 10),
-        )
-        cache.set(
-            cache_key,
-            saml_config,
-            idp_config.get("metadata_cache_timeout", 60 * 60 * 4),
-        )
+    return f"saml.metadata.{metadata_url}.{entity_id}"
+
+
+def fetch_metadata_url_config(idp_config):
+    """
+    Returns the (cached) IdP metadata. Once the metadata is due to be
+    refreshed (``metadata_refresh_ahead`` seconds before it expires), the last
+    known metadata is served while one process refreshes it in the
+    background. If no metadata is cached at all, only one process fetches it,
+    while the others wait for the result.
+    """
+    cache_key = get_metadata_cache_key(idp_config)
+    stored = cache.get(cache_key)
+    if stored is None:
+        return _fetch_metadata(idp_config)
+    if isinstance(stored, tuple):
+        saml_config, expires_at = stored
+    else:
+        # Stored by a previous version, without expiry.
+        saml_config, expires_at = stored, 0
+    refresh_ahead = idp_config.get("metadata_refresh_ahead", 0)
+    if time.time() >= expires_at - refresh_ahead:
+        _refresh_metadata_in_background(idp_config)
+    return saml_config
+
+
+def refresh_metadata(idp_config):
+    """
+    Fetches the IdP metadata, and caches it.
+    """
+    saml_config = OneLogin_Saml2_IdPMetadataParser.parse_remote(
+        idp_config["metadata_url"],
+        entity_id=idp_config["entity_id"],
+        timeout=idp_config.get("metadata_request_timeout", 10),
+    )
+    cache_timeout = idp_config.get("metadata_cache_timeout", 60 * 60 * 4)
+    # Keep expired metadata around for a while, for when refreshing fails.
+    stale_timeout = idp_config.get("metadata_stale_timeout", 60 * 60 * 24)
+    cache.set(
+        get_metadata_cache_key(idp_config),
+        (saml_config, time.time() + cache_timeout),
+        cache_timeout + stale_timeout,
+    )
     return saml_config
 
 
+def _fetch_metadata(idp_config):
+    cache_key = get_metadata_cache_key(idp_config)
+    lock_key = cache_key + ".lock"
+    timeout = idp_config.get("metadata_request_timeout", 10)
+    if cache.add(lock_key, True, timeout * 2):
+        try:
+            return refresh_metadata(idp_config)
+        finally:
+            cache.delete(lock_key)
+    # Another process is fetching the metadata already.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(METADATA_POLL_INTERVAL)
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return stored[0] if isinstance(stored, tuple) else stored
+    return refresh_metadata(idp_config)
+
+
+def _refresh_metadata_in_background(idp_config) -> None:
+    cache_key = get_metadata_cache_key(idp_config)
+    lock_key = cache_key + ".lock"
+    timeout = idp_config.get("metadata_request_timeout", 10)
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        # Single flight across processes as well.
+        if not cache.add(lock_key, True, timeout * 2):
+            return
+        _refreshing.add(cache_key)
+    thread = threading.Thread(
+        target=_background_refresh,
+        args=(idp_config, cache_key, lock_key),
+        daemon=True,
+    )
+    thread.start()
+
+
+def _background_refresh(idp_config, cache_key: str, lock_key: str) -> None:
+    try:
+        refresh_metadata(idp_config)
+    except Exception:
+        logger.warning(
+            "Error refreshing SAML metadata %s, serving stale copy",
+            idp_config["metadata_url"],
+            exc_info=True,
+        )
+        # Back off before retrying.
+        cache.set(lock_key, True, METADATA_RETRY_INTERVAL)
+    else:
+        cache.delete(lock_key)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(cache_key)
+
+
 def build_saml_config(request, provider_config, org):
     avd = provider_config.get("advanced", {})
     security_config = {
@@ -149,6 +253,46 @@ def build_saml_config(request, provider_config, org):
     return saml_config
 
 
+# Bounds the number of settings kept, as the host is part of the key.
+SAML_SETTINGS_CACHE_SIZE = 1024
+
+_saml_settings: Dict[tuple, Tuple[dict, Optional[dict], OneLogin_Saml2_Settings]] = {}
+
+
+@receiver(setting_changed)
+def _clear_saml_settings(**kwargs) -> None:
+    _saml_settings.clear()
+
+
+def get_saml_settings(request, provider_config, org, sp_validation_only=False):
+    """
+    Returns the validated ``OneLogin_Saml2_Settings``. Constructing these
+    (validating the configuration, formatting the certificates) is costly,
+    hence, they are kept per organization and host. The settings are rebuilt
+    whenever the app settings change, or, the IdP metadata got refreshed.
+    """
+    idp = provider_config.get("idp") or {}
+    metadata = fetch_metadata_url_config(idp) if idp.get("metadata_url") else None
+    key = (org, request.scheme, request.get_host(), sp_validation_only)
+    cached = _saml_settings.get(key)
+    if cached is not None:
+        cached_config, cached_metadata, saml_settings = cached
+        # Settings backed apps hand out the same configuration each time,
+        # database backed apps hand out an equal copy.
+        if (
+            cached_config is provider_config or cached_config == provider_config
+        ) and cached_metadata == metadata:
+            return saml_settings
+    config = build_saml_config(request, provider_config, org)
+    saml_settings = OneLogin_Saml2_Settings(
+        settings=config, sp_validation_only=sp_validation_only
+    )
+    if len(_saml_settings) >= SAML_SETTINGS_CACHE_SIZE:
+        _saml_settings.clear()
+    _saml_settings[key] = (provider_config, metadata, saml_settings)
+    return saml_settings
+
+
 def encode_relay_state(state):
     params = {"state": state}
     return urlencode(params)
@@ -170,6 +314,8 @@ def decode_relay_state(relay_state):
 
 def build_auth(request, provider):
     req = prepare_django_request(request)
-    config = build_saml_config(request, provider.app.settings, provider.app.client_id)
-    auth = OneLogin_Saml2_Auth(req, config)
+    saml_settings = get_saml_settings(
+        request, provider.app.settings, provider.app.client_id
+    )
+    auth = OneLogin_Saml2_Auth(req, saml_settings)
     return auth
@@ -1,8 +1,14 @@
+from types import SimpleNamespace
 from urllib.parse import parse_qs, urlparse
 
 from django.contrib.sites.models import Site
+from django.core.exceptions import MultipleObjectsReturned
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+import pytest
+
 from allauth.socialaccount.adapter import (
     DefaultSocialAccountAdapter,
     get_adapter,
@@ -53,3 +59,49 @@ def test_list_settings_based_apps(db, settings):
     app = apps[0]
     assert not app.pk
     assert app.client_id == "org-slug"
+
+
+def test_providers_memoized_per_request(rf, db, settings):
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "github": {"APPS": [{"client_id": "app123id", "secret": "dummy"}]},
+        "openid_connect": {
+            "APPS": [
+                {"provider_id": "unittest-server", "client_id": "a"},
+                {"provider_id": "other-server", "client_id": "b"},
+            ]
+        },
+    }
+    request = rf.get("/")
+    request.allauth = SimpleNamespace()
+    adapter = get_adapter()
+    providers = adapter.list_providers(request)
+    github = adapter.get_provider(request, "github")
+    assert github in providers
+    assert adapter.get_provider(request, "unittest-server") in providers
+    assert adapter.get_provider(request, "github") is github
+    # Ambiguous, not resolved from the list.
+    with pytest.raises(MultipleObjectsReturned):
+        adapter.get_provider(request, "openid_connect")
+    # A new request starts afresh.
+    other_request = rf.get("/")
+    other_request.allauth = SimpleNamespace()
+    assert adapter.get_provider(other_request, "github") is not github
+
+
+def test_login_page_provider_queries(client, db, settings):
+    settings.SOCIALACCOUNT_PROVIDERS = {}
+    for provider in ["github", "gitlab", "google"]:
+        app = SocialApp.objects.create(
+            provider=provider, name=provider, client_id="id", secret="secret"
+        )
+        app.sites.add(Site.objects.get_current())
+    client.get(reverse("account_login"))
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse("account_login"))
+    assert resp.status_code == 200
+    # Previously, the apps were queried once for the provider list, and once
+    # per provider login URL.
+    app_queries = [
+        q for q in ctx.captured_queries if "socialaccount_socialapp" in q["sql"]
+    ]
+    assert len(app_queries) == 1
@@ -3,12 +3,15 @@ from unittest.mock import ANY, patch
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 import pytest
 from pytest_django.asserts import assertTemplateUsed
 
 from allauth.account.authentication import AUTHENTICATION_METHODS_SESSION_KEY
+from allauth.account.models import EmailAddress
 from allauth.core import context
 from allauth.socialaccount.helpers import complete_social_login
 from allauth.socialaccount.models import SocialAccount, SocialToken
@@ -149,3 +152,65 @@ def test_record_authentication(
         ).exists()
         == store_tokens
     )
+
+
+def test_lookup_writes_changes_only(db, sociallogin_factory, user, settings):
+    settings.SOCIALACCOUNT_STORE_TOKENS = True
+    account = SocialAccount.objects.create(
+        user=user, uid="123", provider="unittest-server", extra_data={"a": 1}
+    )
+    SocialToken.objects.create(account=account, token="123", token_secret="456")
+
+    def lookup(extra_data, token):
+        sociallogin = sociallogin_factory(provider="unittest-server", uid="123")
+        sociallogin.account.extra_data = extra_data
+        sociallogin.token = SocialToken(token=token)
+        with CaptureQueriesContext(connection) as ctx:
+            sociallogin.lookup()
+        assert sociallogin.user.pk == user.pk
+        token_queries = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if "socialaccount_socialtoken" in q["sql"]
+        ]
+        # The token is written using a single UPDATE.
+        assert len(token_queries) == 1
+        assert token_queries[0].startswith("UPDATE")
+        return [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+
+    account_update, _ = lookup({"a": 1}, "123")
+    assert "last_login" in account_update and "extra_data" not in account_update
+
+    account_update, token_update = lookup({"a": 2}, "789")
+    assert "extra_data" in account_update
+    assert '"token" =' in token_update and "token_secret" not in token_update
+    token = SocialToken.objects.get()
+    assert (token.token, token.token_secret) == ("789", "456")
+    assert SocialAccount.objects.get().extra_data == {"a": 2}
+
+
+def test_lookup_stores_new_token(db, sociallogin_factory, user, settings):
+    settings.SOCIALACCOUNT_STORE_TOKENS = True
+    SocialAccount.objects.create(user=user, uid="123", provider="unittest-server")
+    sociallogin = sociallogin_factory(provider="unittest-server", uid="123")
+    sociallogin.token = SocialToken(token="123", token_secret="456")
+    sociallogin.lookup()
+    token = SocialToken.objects.get()
+    assert (token.token, token.token_secret) == ("123", "456")
+    assert token.pk == sociallogin.token.pk
+
+
+def test_lookup_by_email_batched(db, sociallogin_factory, user_factory, settings):
+    settings.SOCIALACCOUNT_EMAIL_AUTHENTICATION = True
+    user = user_factory(email="last@example.com", email_verified=True)
+    sociallogin = sociallogin_factory(provider="unittest-server", uid="unknown")
+    sociallogin.email_addresses = [
+        EmailAddress(email=f"other{i}@example.com", verified=True) for i in range(5)
+    ] + [EmailAddress(email="last@example.com", verified=True)]
+    with CaptureQueriesContext(connection) as ctx:
+        sociallogin.lookup()
+    assert sociallogin.user.pk == user.pk
+    email_queries = [
+        q for q in ctx.captured_queries if "account_emailaddress" in q["sql"]
+    ]
+    assert len(email_queries) == 1
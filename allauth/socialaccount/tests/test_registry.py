@@ -1,8 +1,15 @@
+import json
+from unittest.mock import patch
+
 from django.apps import AppConfig, apps
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.urls import Resolver404, resolve, reverse
+
+import pytest
 
 from allauth.socialaccount import providers
+from allauth.socialaccount.providers.github.provider import GitHubProvider
 
 
 class CustomFacebookAppConfig(AppConfig):
@@ -10,6 +17,10 @@ class CustomFacebookAppConfig(AppConfig):
     label = "allauth_facebook"
 
 
+class CustomGitHubProvider(GitHubProvider):
+    pass
+
+
 class ProviderRegistryTests(TestCase):
     @override_settings(
         INSTALLED_APPS=[
@@ -58,3 +69,73 @@ class ProviderRegistryTests(TestCase):
         app_config = app_config_list[0]
         self.assertEqual("allauth.socialaccount.providers.facebook", app_config.name)
         self.assertEqual("allauth_facebook", app_config.label)
+
+
+def test_index_up_to_date():
+    assert providers.build_index() == json.loads(
+        providers.INDEX_PATH.read_text()
+    ), "Provider index out of date, run: make provider-index"
+
+
+def test_lazy_registry(settings):
+    settings.SOCIALACCOUNT_LAZY_PROVIDERS = True
+    settings.SOCIALACCOUNT_PROVIDERS = {
+        "github": {
+            "provider_class": "allauth.socialaccount.tests.test_registry.CustomGitHubProvider"
+        }
+    }
+    with override_settings(
+        INSTALLED_APPS=[
+            "allauth.socialaccount.providers.facebook",
+            "allauth.socialaccount.providers.github",
+        ]
+    ):
+        registry = providers.ProviderRegistry()
+        specs = registry.get_spec_list()
+    assert [spec.id for spec in specs] == ["facebook", "github"]
+    facebook = specs[0]
+    assert facebook.name == "Facebook"
+    assert facebook.supports_token_authentication
+    # Not imported until used.
+    assert "facebook" not in registry.provider_map
+    assert list(registry.as_choices()) == [
+        ("facebook", "Facebook"),
+        ("github", "GitHub"),
+    ]
+    assert (
+        registry.get_class("facebook") is providers.facebook.provider.FacebookProvider
+    )
+    # Providers with a custom class are loaded as usual.
+    assert registry.provider_map["github"] is CustomGitHubProvider
+
+
+def test_lazy_urlpatterns(rf):
+    index = json.loads(providers.INDEX_PATH.read_text())
+    spec = providers.ProviderSpec(**index["allauth.socialaccount.providers.github"][0])
+    assert spec.urls == "oauth2"
+    (resolver,) = providers.lazy_urlpatterns(spec)
+    assert str(resolver.pattern) == "github/"
+    login, callback = resolver.url_patterns
+    assert (login.name, callback.name) == ("github_login", "github_callback")
+    request = rf.get("/")
+    with patch("allauth.socialaccount.providers.github.views.oauth2_callback") as view:
+        callback.callback(request)
+    view.assert_called_once_with(request)
+
+
+def test_dispatch_urls(settings_impacting_urls, rf):
+    with settings_impacting_urls(SOCIALACCOUNT_DISPATCH_URLS=True):
+        assert reverse("github_login") == "/accounts/github/login/"
+        assert reverse("twitter_callback") == "/accounts/twitter/login/callback/"
+        match = resolve("/accounts/github/login/callback/")
+        assert match.kwargs == {"slug": "github", "action": "callback"}
+        request = rf.get("/")
+        with patch(
+            "allauth.socialaccount.providers.github.views.oauth2_callback"
+        ) as view:
+            match.func(request, **match.kwargs)
+        view.assert_called_once_with(request)
+        # Providers not using the stock views are routed as usual.
+        assert resolve("/accounts/apple/login/callback/").url_name == "apple_callback"
+        with pytest.raises(Resolver404):
+            resolve("/accounts/unknown/login/")
@@ -30,6 +30,20 @@ class MockedResponse:
         return self.content.decode("utf8")
 
 
+class SyncThread:
+    """
+    Stands in for ``threading.Thread``, running the target right away when
+    started, so that background work can be tested deterministically.
+    """
+
+    def __init__(self, target, args, daemon):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.target(*self.args)
+
+
 class mocked_response:
     def __init__(self, *responses, callback=None):
         self.callback = callback
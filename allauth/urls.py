@@ -11,17 +11,32 @@ from . import app_settings
 
 def build_provider_urlpatterns() -> List[Union[URLPattern, URLResolver]]:
     # Provider urlpatterns, as separate attribute (for reusability).
+    from allauth.socialaccount import app_settings as socialaccount_settings
+
     provider_urlpatterns: List[Union[URLPattern, URLResolver]] = []
-    provider_classes = providers.registry.get_class_list()
+    provider_specs = providers.registry.get_spec_list()
 
     # We need to move the OpenID Connect provider to the end. The reason is that
     # matches URLs that the builtin providers also match.
     #
     # NOTE: Only needed if OPENID_CONNECT_URL_PREFIX is blank.
-    provider_classes = [
-        cls for cls in provider_classes if cls.id != "openid_connect"
-    ] + [cls for cls in provider_classes if cls.id == "openid_connect"]
-    for provider_class in provider_classes:
+    provider_specs = [
+        spec for spec in provider_specs if spec.id != "openid_connect"
+    ] + [spec for spec in provider_specs if spec.id == "openid_connect"]
+    if socialaccount_settings.DISPATCH_URLS and not socialaccount_settings.ASYNC_VIEWS:
+        provider_urlpatterns += providers.dispatching_urlpatterns(
+            [spec for spec in provider_specs if spec.urls]
+        )
+        provider_specs = [spec for spec in provider_specs if not spec.urls]
+    for spec in provider_specs:
+        if (
+            spec.urls
+            and socialaccount_settings.LAZY_PROVIDERS
+            and not socialaccount_settings.ASYNC_VIEWS
+        ):
+            provider_urlpatterns += providers.lazy_urlpatterns(spec)
+            continue
+        provider_class = providers.registry.get_class(spec.id)
         prov_mod = import_module(provider_class.get_package() + ".urls")
         prov_urlpatterns = getattr(prov_mod, "urlpatterns", None)
         if prov_urlpatterns:
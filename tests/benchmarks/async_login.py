@@ -0,0 +1,181 @@
+"""
+Measures the throughput of the login view under ASGI, with and without
+``ACCOUNT_ASYNC_VIEWS``, by running concurrent logins against uvicorn:
+
+    python -m tests.benchmarks.async_login [--requests N] [--concurrency N]
+        [--hasher HASHER]
+
+Requires ``uvicorn`` and ``httpx`` to be installed, and Django 5.1 or later. Each round serves the
+project from a fresh (temporary) SQLite database file, with rate limits
+turned off so that all logins are let through.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+
+SETTINGS = """\
+from tests.regular.settings import *  # noqa
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+DATABASES["default"]["NAME"] = {database!r}
+# Wait for, instead of failing on, concurrent writes.
+DATABASES["default"]["OPTIONS"] = {{"timeout": 60, "transaction_mode": "IMMEDIATE"}}
+PASSWORD_HASHERS = [{hasher!r}]
+ACCOUNT_RATE_LIMITS = False
+ACCOUNT_LOGIN_METHODS = {{"username"}}
+MFA_PASSKEY_SIGNUP_ENABLED = False
+ACCOUNT_ASYNC_VIEWS = {async_views!r}
+"""
+
+USERNAME = "john"
+PASSWORD = "benchmark-password"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare(tmp: str, async_views: bool, hasher: str) -> dict:
+    module = "benchmark_settings_{}".format("async" if async_views else "sync")
+    with open(os.path.join(tmp, module + ".py"), "w") as f:
+        f.write(
+            SETTINGS.format(
+                database=os.path.join(tmp, module + ".sqlite3"),
+                async_views=async_views,
+                hasher=hasher,
+            )
+        )
+    env = dict(os.environ)
+    env["DJANGO_SETTINGS_MODULE"] = module
+    env["PYTHONPATH"] = os.pathsep.join([tmp, os.getcwd()])
+    subprocess.run(
+        [sys.executable, "-m", "django", "migrate", "--verbosity=0"],
+        env=env,
+        check=True,
+    )
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "django",
+            "shell",
+            "-c",
+            "from django.contrib.auth import get_user_model; "
+            "get_user_model().objects.create_user({!r}, password={!r})".format(
+                USERNAME, PASSWORD
+            ),
+        ],
+        env=env,
+        check=True,
+    )
+    return env
+
+
+async def login(base_url: str) -> None:
+    import httpx
+
+    # Logins queue up behind the password hashing, do not time out on that.
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        resp = await client.get("/accounts/login/")
+        resp.raise_for_status()
+        resp = await client.post(
+            "/accounts/login/",
+            data={
+                "login": USERNAME,
+                "password": PASSWORD,
+                "csrfmiddlewaretoken": client.cookies["csrftoken"],
+            },
+        )
+        assert resp.status_code == 302, resp.status_code
+
+
+async def run(base_url: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited() -> None:
+        async with semaphore:
+            await login(base_url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[limited() for _ in range(requests)])
+    return requests / (time.perf_counter() - start)
+
+
+async def wait_for_server(base_url: str, timeout: float = 30) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                await client.get("/accounts/login/")
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+def benchmark(tmp: str, async_views: bool, args) -> float:
+    env = prepare(tmp, async_views, args.hasher)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "--factory",
+            "django.core.asgi:get_asgi_application",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_for_server(base_url))
+        # Warm up.
+        asyncio.run(run(base_url, args.concurrency, args.concurrency))
+        return asyncio.run(run(base_url, args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    # A cheap hasher (e.g. MD5PasswordHasher) leaves the overhead of the view
+    # itself, instead of the cost of hashing.
+    parser.add_argument(
+        "--hasher", default="django.contrib.auth.hashers.PBKDF2PasswordHasher"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for async_views in [False, True]:
+            rps = benchmark(tmp, async_views, args)
+            print(
+                "{:<6} logins/s: {:8.1f}".format(
+                    "async" if async_views else "sync", rps
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Measures looking up users by email address against a large ``EmailAddress``
+table, reporting the number of queries and the latency per call:
+
+    python -m tests.benchmarks.filter_users_by_email [--rows N] [--calls N]
+
+The table is populated in a (temporary) SQLite database file, which can be
+kept around for subsequent runs by passing ``--database``. As the email field
+of the stock user model is not indexed, pass ``--index-user-email`` to measure
+with an index in place, as a custom user model would typically have.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def setup(database: str) -> None:
+    os.environ["DJANGO_SETTINGS_MODULE"] = "tests.regular.settings"
+    import tests.regular.settings as settings
+
+    settings.DATABASES["default"]["NAME"] = database
+    settings.DEBUG = False
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0, skip_checks=True)
+
+
+def populate(rows: int, batch_size: int = 50000) -> None:
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from allauth.account.models import EmailAddress
+
+    User = get_user_model()
+    existing = EmailAddress.objects.count()
+    for start in range(existing, rows, batch_size):
+        end = min(rows, start + batch_size)
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                [
+                    User(username=f"user{i}", email=f"user{i}@example.com")
+                    for i in range(start, end)
+                ]
+            )
+            EmailAddress.objects.bulk_create(
+                [
+                    EmailAddress(
+                        user=user,
+                        email=user.email,
+                        verified=i % 2 == 0,
+                        primary=True,
+                    )
+                    for i, user in enumerate(users, start)
+                ]
+            )
+        print(f"\rPopulated {end}/{rows} rows", end="", flush=True)
+    print()
+
+
+def index_user_email() -> None:
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS benchmark_user_email ON auth_user (email)"
+        )
+
+
+def measure(func, args_list) -> dict:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    queries = []
+    for args in args_list:
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func(*args)
+            timings.append(time.perf_counter() - start)
+        queries.append(len(ctx.captured_queries))
+    return {
+        "queries": statistics.mean(queries),
+        "median": statistics.median(timings),
+        "p95": sorted(timings)[int(len(timings) * 0.95)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--database")
+    parser.add_argument("--index-user-email", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(args.database or os.path.join(tmp, "db.sqlite3"))
+        populate(args.rows)
+        if args.index_user_email:
+            index_user_email()
+
+        from allauth.account.utils import (
+            filter_users_by_email,
+            filter_users_by_emails,
+        )
+
+        def email(hit: bool) -> str:
+            i = random.randrange(args.rows) if hit else args.rows + 1
+            return f"User{i}@example.com"
+
+        benchmarks = {
+            "single (hit)": (
+                lambda e: filter_users_by_email(e, prefer_verified=True),
+                [(email(True),) for _ in range(args.calls)],
+            ),
+            "single (miss)": (
+                lambda e: filter_users_by_email(e, prefer_verified=True),
+                [(email(False),) for _ in range(args.calls)],
+            ),
+            f"bulk ({args.batch})": (
+                lambda es: filter_users_by_emails(es, prefer_verified=True),
+                [
+                    ([email(True) for _ in range(args.batch)],)
+                    for _ in range(max(1, args.calls // args.batch))
+                ],
+            ),
+        }
+        for label, (func, args_list) in benchmarks.items():
+            result = measure(func, args_list)
+            print(
+                "{:<14} queries/call: {:4.1f}  median: {:7.3f}ms  p95: {:7.3f}ms".format(
+                    label,
+                    result["queries"],
+                    result["median"] * 1000,
+                    result["p95"] * 1000,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures the startup cost of the provider registry, with all bundled
+providers installed. Each measurement is taken in a fresh interpreter:
+
+    python -m tests.benchmarks.provider_registry [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess  # nosec
+import sys
+
+
+MEASURE = """
+import json, sys, time
+import tests.regular.settings as settings
+settings.SOCIALACCOUNT_LAZY_PROVIDERS = {lazy}
+settings.DEBUG = False
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+
+from django.core.management import call_command
+from django.test import Client
+call_command("migrate", verbosity=0, skip_checks=True)
+start = time.perf_counter()
+resp = Client().get("/accounts/login/")
+assert resp.status_code == 200, resp.status_code
+first_request = time.perf_counter() - start
+print(json.dumps({{"setup": setup, "first_request": first_request}}))
+"""
+
+
+def measure(lazy: bool) -> dict:
+    output = subprocess.check_output(  # nosec
+        [sys.executable, "-c", MEASURE.format(lazy=lazy)],
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "tests.regular.settings"},
+        text=True,
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    for lazy in [False, True]:
+        runs = [measure(lazy) for _ in range(args.runs)]
+        print(
+            "{:<6} setup: {:7.1f}ms  first request: {:7.1f}ms".format(
+                "lazy" if lazy else "eager",
+                statistics.median(run["setup"] for run in runs) * 1000,
+                statistics.median(run["first_request"] for run in runs) * 1000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()